@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: frontmatter parsing for task files.
+
+Compares the original parser (DOTALL regex + yaml.safe_load) with the fast
+path in frontmatter.py, both for full parses and metadata-only reads.
+
+Usage:
+    python evals/benchmarks/bench_frontmatter.py
+    python evals/benchmarks/bench_frontmatter.py --sizes 1000 10000 --repeat 3
+"""
+
+import argparse
+import re
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+# synthetic puts the task-manager server on sys.path
+from synthetic import generate_task_store
+
+from frontmatter import _CSafeLoader, parse_yaml_frontmatter, read_frontmatter
+
+
+def legacy_parse(file_path: Path) -> tuple[dict, str]:
+    """The parser the server used before the fast path"""
+    with open(file_path, "r") as f:
+        content = f.read()
+    match = re.match(r"^---\s*\n(.*?)\n---\s*\n(.*)$", content, re.DOTALL)
+    if not match:
+        return {}, content
+    frontmatter_str, body = match.groups()
+    return yaml.safe_load(frontmatter_str) or {}, body.strip()
+
+
+PARSERS = {
+    "legacy (regex + safe_load)": legacy_parse,
+    "parse_yaml_frontmatter": parse_yaml_frontmatter,
+    "read_frontmatter (no body)": read_frontmatter,
+}
+
+
+def best_of(fn, files: list[Path], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for path in files:
+            fn(path)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark task frontmatter parsing")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"libyaml available: {_CSafeLoader is not None}\n")
+    print(f"{'files':>7}  {'parser':<28} {'total':>9} {'per file':>10} {'speedup':>8}")
+
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            files = sorted(generate_task_store(Path(tmp) / "tasks", size).glob("*.md"))
+
+            # Sanity check: every parser agrees on the metadata
+            for path in files[:100]:
+                assert parse_yaml_frontmatter(path) == legacy_parse(path)
+                assert read_frontmatter(path) == legacy_parse(path)[0]
+
+            baseline = None
+            for name, fn in PARSERS.items():
+                elapsed = best_of(fn, files, args.repeat)
+                baseline = baseline or elapsed
+                print(f"{size:>7}  {name:<28} {elapsed * 1000:>7.1f}ms "
+                      f"{elapsed / size * 1e6:>8.1f}us {baseline / elapsed:>7.1f}x")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cold scans of a task store, serial vs. parallel parsing.
+
+Times TaskStore.rescan() over a store with no catalog (every file parsed) for
+each scan mode and worker count, and checks that every mode builds the same
+task records as the serial scan. Pools are warmed up before timing, as they
+are in a running server.
+
+Usage:
+    python evals/benchmarks/bench_scan.py
+    python evals/benchmarks/bench_scan.py --sizes 10000 50000 --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+# synthetic puts the task-manager server on sys.path
+from synthetic import generate_task_store
+
+from frontmatter import _CSafeLoader
+from task_store import TaskStore
+
+
+def snapshot(store: TaskStore) -> list[tuple]:
+    return [
+        (t.file, t.title, t.priority, t.status, t.category, t.keywords, t.due, t.created, t.updated)
+        for t in store.all()
+    ]
+
+
+def best_scan(store: TaskStore, repeat: int) -> float:
+    store.rescan()  # warm up the pool and the page cache
+    best = float("inf")
+    for _ in range(repeat):
+        store.clear()
+        start = time.perf_counter()
+        store.rescan()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    default_workers = sorted({1, 2, 4, cpus} - {w for w in (2, 4) if w > cpus})
+
+    parser = argparse.ArgumentParser(description="Benchmark serial vs. parallel task scans")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000])
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"CPUs: {cpus}, libyaml available: {_CSafeLoader is not None}\n")
+    print(f"{'files':>7}  {'mode':<10} {'workers':>7} {'scan':>9} {'speedup':>8}")
+
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            tasks_dir = generate_task_store(Path(tmp) / "tasks", size)
+
+            serial = TaskStore(tasks_dir)
+            baseline = best_scan(serial, args.repeat)
+            expected = snapshot(serial)
+            print(f"{size:>7}  {'serial':<10} {1:>7} {baseline * 1000:>7.0f}ms {1.0:>7.2f}x")
+
+            for mode in ("threads", "processes"):
+                for workers in args.workers:
+                    store = TaskStore(tasks_dir)
+                    store.configure_scan(mode, workers)
+                    try:
+                        elapsed = best_scan(store, args.repeat)
+                        assert snapshot(store) == expected, f"{mode} scan differs from serial"
+                    finally:
+                        store.configure_scan("serial")
+                    print(f"{size:>7}  {mode:<10} {workers:>7} {elapsed * 1000:>7.0f}ms "
+                          f"{baseline / elapsed:>7.2f}x")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Benchmark: latency and peak memory of every task-manager tool.
+
+For each store size, generates a synthetic project (tasks/, transcripts in
+knowledge/ and BACKLOG.md) and calls every tool through server.call_tool, as
+an MCP client would. Each case runs in a fresh process that loads the store
+first, so its peak RSS covers a server holding that store and serving those
+calls, not what earlier cases left behind. Cases that change the project run on a copy of it.
+
+Results are compared with a stored baseline (baselines/tools.json). With
+--check the run fails when a case's p50 or p95 latency or its peak RSS
+exceeds the baseline by more than the tolerance; --save-baseline replaces the
+baseline with this run. Baselines are machine-specific: save one on the
+machine that runs the check.
+
+Usage:
+    python evals/benchmarks/bench_tools.py
+    python evals/benchmarks/bench_tools.py --sizes 100 1000 10000 50000
+    python evals/benchmarks/bench_tools.py --save-baseline
+    python evals/benchmarks/bench_tools.py --check --tolerance 0.5
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Optional
+
+# synthetic puts the task-manager server on sys.path
+from synthetic import PROJECT_ROOT, SUBJECTS, generate_backlog, generate_task_store, generate_transcripts
+
+import server
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_BASELINE = Path(__file__).parent / "baselines" / "tools.json"
+
+# Store size / transcripts in the generated knowledge/
+TASKS_PER_TRANSCRIPT = 10
+
+# Differences below these are noise, whatever the ratio
+MIN_LATENCY_DELTA_MS = 2.0
+MIN_RSS_DELTA_MB = 10.0
+
+
+@dataclass
+class Context:
+    """What a case needs to build its arguments"""
+
+    project: Path
+    size: int
+    titles: list[str]
+    backlog_items: int
+
+
+@dataclass
+class Case:
+    tool: str
+    variant: str
+    # (context, iteration) -> tool arguments
+    arguments: Callable[[Context, int], dict]
+    # Changes tasks/ or BACKLOG.md, so runs on a copy of the project
+    mutates: bool = False
+    # Untimed preparation before every call
+    setup: Optional[Callable[[Context, int], None]] = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.tool} [{self.variant}]"
+
+
+def task_file(ctx: Context, i: int) -> str:
+    # Spread calls over the store instead of hitting one file
+    return f"task-{(i * 7919) % ctx.size:06d}.md"
+
+
+def fresh_backlog(ctx: Context, i: int) -> None:
+    generate_backlog(ctx.project / "BACKLOG.md", ctx.backlog_items, ctx.titles, seed=i)
+
+
+CASES = [
+    Case("list_tasks", "markdown", lambda ctx, i: {}),
+    Case("list_tasks", "json page", lambda ctx, i: {"format": "json", "limit": 50, "sort_by": "priority"}),
+    Case("list_tasks", "filtered", lambda ctx, i: {"priority": "P1", "status": "n"}),
+    Case("get_task", "default", lambda ctx, i: {"filename": task_file(ctx, i)}),
+    Case("search_tasks", "default", lambda ctx, i: {"query": ctx.titles[i % len(ctx.titles)].split()[-2]}),
+    Case("search_tasks", "filtered", lambda ctx, i: {"query": "progress note", "status": "s", "format": "json"}),
+    Case("search_knowledge", "default", lambda ctx, i: {"query": SUBJECTS[i % len(SUBJECTS)]}),
+    Case("search_knowledge", "filtered", lambda ctx, i: {
+        "query": "pricing", "path": "knowledge/transcripts",
+        "since": (date.today() - timedelta(days=30)).isoformat(), "format": "json",
+    }),
+    Case("semantic_search", "default", lambda ctx, i: {
+        "query": f"customers asking about {SUBJECTS[i % len(SUBJECTS)]}",
+    }),
+    Case("semantic_search", "filtered", lambda ctx, i: {
+        "query": "pricing feedback from interviews", "path": "knowledge/transcripts", "format": "json",
+    }),
+    Case("get_document_outline", "default", lambda ctx, i: {"path": "knowledge/transcripts"}),
+    Case("get_document_outline", "filtered", lambda ctx, i: {
+        "path": "knowledge/transcripts", "since": (date.today() - timedelta(days=30)).isoformat(),
+        "format": "json", "fields": ["path", "action_items"],
+    }),
+    Case("create_task", "default", lambda ctx, i: {
+        "title": f"Benchmark task {i}", "priority": "P3", "body": "Created by bench_tools.py",
+        "keywords": ["metrics"],
+    }, mutates=True),
+    Case("update_task_status", "default", lambda ctx, i: {
+        "filename": task_file(ctx, i), "status": "nsbd"[i % 4],
+    }, mutates=True),
+    Case("update_task_priority", "default", lambda ctx, i: {
+        "filename": task_file(ctx, i), "priority": "P3",
+    }, mutates=True),
+    Case("bulk_update_tasks", "default", lambda ctx, i: {
+        "updates": [
+            {"filename": task_file(ctx, i * 30 + k), "status": "nsbd"[(i + k) % 4], "priority": "P3"}
+            for k in range(30)
+        ],
+    }, mutates=True),
+    Case("get_task_summary", "markdown", lambda ctx, i: {}),
+    Case("get_task_summary", "json", lambda ctx, i: {"format": "json"}),
+    Case("find_stale_tasks", "default", lambda ctx, i: {}),
+    Case("find_overdue_tasks", "default", lambda ctx, i: {}),
+    Case("prune_completed_tasks", "dry run", lambda ctx, i: {"dry_run": True}),
+    Case("check_duplicates", "default", lambda ctx, i: {
+        "title": ctx.titles[i % len(ctx.titles)], "keywords": ["auth", "api"], "category": "technical",
+    }),
+    Case("process_backlog", "preview full", lambda ctx, i: {"force_full": True}),
+    Case("process_backlog", "preview incremental", lambda ctx, i: {}),
+    Case("process_backlog", "auto create", lambda ctx, i: {"auto_create": True},
+         mutates=True, setup=fresh_backlog),
+    Case("clear_backlog", "archive", lambda ctx, i: {"archive": True}, mutates=True, setup=fresh_backlog),
+]
+
+
+def peak_rss_mb() -> Optional[float]:
+    # On Linux ru_maxrss survives fork and exec, so a child would report the
+    # parent's peak; VmHWM starts over with the new process image
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    # Bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024)
+
+
+def percentile(values: list[float], pct: int) -> float:
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+
+def run_case(project: Path, size: int, backlog_items: int, case_index: int, repeat: int) -> dict:
+    """Run one case in this (fresh) process and return its measurements"""
+    case = CASES[case_index]
+    server.PROJECT_ROOT = project
+    server.TASKS_DIR = project / "tasks"
+    server.CONFIG_FILE = project / "config.yaml"
+
+    # Server startup: load the store, as the first tool call would
+    titles = [t.title for t in server.get_all_tasks()]
+    ctx = Context(project, size, titles, backlog_items)
+
+    # The first call also pays for lazy imports and index builds; it is
+    # reported on its own and left out of the percentiles
+    latencies = []
+    for i in range(repeat + 1):
+        if case.setup is not None:
+            case.setup(ctx, i)
+        arguments = case.arguments(ctx, i)
+        start = time.perf_counter()
+        result = asyncio.run(server.call_tool(case.tool, arguments))
+        latencies.append((time.perf_counter() - start) * 1000)
+        if i == 0 and result[0].text.startswith("Error"):
+            raise RuntimeError(f"{case.name} failed: {result[0].text}")
+
+    first, latencies = latencies[0], latencies[1:]
+    return {
+        "first_ms": round(first, 3),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "peak_rss_mb": None if (rss := peak_rss_mb()) is None else round(rss, 1),
+    }
+
+
+def build_project(root: Path, size: int, backlog_items: int) -> Path:
+    """Generate tasks/, knowledge/, BACKLOG.md and config.yaml for one store size"""
+    project = root / f"project-{size}"
+    generate_task_store(project / "tasks", size)
+    (project / "knowledge" / "notes").mkdir(parents=True)
+    generate_transcripts(project / "knowledge" / "transcripts", max(10, size // TASKS_PER_TRANSCRIPT))
+    shutil.copy(PROJECT_ROOT / "config.yaml", project / "config.yaml")
+
+    server.TASKS_DIR = project / "tasks"
+    titles = [t.title for t in server.get_all_tasks()]
+    generate_backlog(project / "BACKLOG.md", backlog_items, titles)
+    return project
+
+
+def copy_project(template: Path, dest: Path) -> Path:
+    """
+    Copy a project for a case that changes it.
+
+    Task files are hard-linked: the server only ever replaces them by rename,
+    so the template is untouched, and the links keep the inode the catalog
+    signature includes, so the copy loads warm like the template does.
+    Everything else (catalog, BACKLOG.md) is written in place and is copied.
+    """
+    tasks_dir = template / "tasks"
+
+    def copy(src: str, dst: str) -> None:
+        if Path(src).parent == tasks_dir and src.endswith(".md"):
+            os.link(src, dst)
+        else:
+            shutil.copy2(src, dst)
+
+    return Path(shutil.copytree(template, dest, copy_function=copy))
+
+
+def compare(result: dict, base: Optional[dict], tolerance: float, rss_tolerance: float) -> list[str]:
+    """Describe every metric of result that regressed past base"""
+    if base is None:
+        return []
+    regressions = []
+    for metric, tol, min_delta in (
+        ("p50_ms", tolerance, MIN_LATENCY_DELTA_MS),
+        ("p95_ms", tolerance, MIN_LATENCY_DELTA_MS),
+        ("peak_rss_mb", rss_tolerance, MIN_RSS_DELTA_MB),
+    ):
+        value, expected = result.get(metric), base.get(metric)
+        if value is None or expected is None:
+            continue
+        if value > expected * (1 + tol) and value - expected > min_delta:
+            regressions.append(f"{metric} {value:g} > baseline {expected:g} (+{tol:.0%})")
+    return regressions
+
+
+def check_coverage() -> None:
+    """Every tool the server lists must have a benchmark case"""
+    tools = {tool.name for tool in asyncio.run(server.list_tools())}
+    missing = tools - {case.tool for case in CASES}
+    if missing:
+        sys.exit(f"No benchmark case for: {', '.join(sorted(missing))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every task-manager tool")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=20, help="timed calls per case after the first (at least 2)")
+    parser.add_argument("--backlog-items", type=int, default=200)
+    parser.add_argument("--tools", nargs="+", help="only run cases for these tools")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--check", action="store_true", help="exit 1 if a case regressed past the baseline")
+    parser.add_argument("--save-baseline", action="store_true", help="write this run to --baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed latency increase (0.5 = +50%%)")
+    parser.add_argument("--rss-tolerance", type=float, default=0.25, help="allowed peak RSS increase")
+    args = parser.parse_args()
+    if args.repeat < 2:
+        parser.error("--repeat must be at least 2")
+
+    check_coverage()
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {"results": {}}
+    cases = [i for i, case in enumerate(CASES) if not args.tools or case.tool in args.tools]
+    results: dict[str, dict[str, dict]] = {}
+    regressions = []
+
+    print(f"CPUs: {os.cpu_count()}, repeat: {args.repeat}, backlog items: {args.backlog_items}\n")
+    print(f"{'tasks':>6}  {'case':<40} {'first':>9} {'p50':>9} {'p95':>9} {'peak RSS':>9}  vs baseline p50")
+
+    # A fresh process per case, so peak RSS is per case
+    pool_context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            template = build_project(Path(tmp), size, args.backlog_items)
+            size_results = results[str(size)] = {}
+            for index in cases:
+                case = CASES[index]
+                project = template
+                if case.mutates:
+                    project = copy_project(template, Path(tmp) / "work")
+                try:
+                    with ProcessPoolExecutor(1, mp_context=pool_context) as pool:
+                        result = pool.submit(
+                            run_case, project, size, args.backlog_items, index, args.repeat
+                        ).result()
+                finally:
+                    if case.mutates:
+                        shutil.rmtree(project)
+
+                size_results[case.name] = result
+                base = baseline["results"].get(str(size), {}).get(case.name)
+                failed = compare(result, base, args.tolerance, args.rss_tolerance)
+                regressions += [f"{size} tasks, {case.name}: {r}" for r in failed]
+
+                versus = f"{result['p50_ms'] / base['p50_ms']:.2f}x" if base and base["p50_ms"] else "-"
+                rss = "-" if result["peak_rss_mb"] is None else f"{result['peak_rss_mb']:.0f}MB"
+                print(f"{size:>6}  {case.name:<40} {result['first_ms']:>7.1f}ms "
+                      f"{result['p50_ms']:>7.1f}ms {result['p95_ms']:>7.1f}ms "
+                      f"{rss:>9}  {versus}{'  REGRESSED' if failed else ''}")
+            shutil.rmtree(template)
+            print()
+
+    if args.save_baseline:
+        # Keep sizes and cases this run skipped
+        for size, size_results in results.items():
+            baseline["results"].setdefault(size, {}).update(size_results)
+        baseline["machine"] = {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+        }
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline saved to {args.baseline}")
+
+    if regressions:
+        print("Regressions:\n  " + "\n  ".join(regressions))
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Synthetic data for task-manager benchmarks.
+
+Generates task stores in the format write_task_file emits, with a
+deterministic mix of priorities, statuses, categories, dates and body sizes,
+BACKLOG.md files mixing the item kinds process_backlog tells apart, and
+dated meeting transcripts for knowledge/.
+"""
+
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Sequence
+
+# benchmarks/ -> evals/ -> project root
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "tools" / "mcp-servers" / "task-manager"))
+
+from server import generate_task_content
+from task_store import TaskBatch
+
+CATEGORIES = ["technical", "outreach", "research", "writing", "admin", "strategy", "stakeholder", "discovery"]
+VERBS = ["Fix", "Update", "Write", "Review", "Email", "Research", "Schedule", "Implement", "Draft", "Analyze"]
+SUBJECTS = [
+    "authentication flow", "pricing page", "onboarding email", "API rate limits",
+    "Q3 roadmap", "customer interviews", "billing dashboard", "search relevance",
+    "mobile checkout", "release notes", "churn analysis", "SSO integration",
+    "team offsite", "data export", "notification settings", "admin console",
+]
+KEYWORDS = ["auth", "api", "billing", "mobile", "search", "email", "roadmap", "metrics", "ux", "security"]
+PEOPLE = ["Sarah", "Priya", "Marcus", "Lena", "Tomás", "Wei"]
+
+# Files written per journaled batch; keeps large stores from costing an fsync per file
+WRITE_BATCH_SIZE = 1000
+
+
+def generate_task_store(tasks_dir: Path, count: int, seed: int = 42) -> Path:
+    """Write `count` synthetic task files into tasks_dir"""
+    rng = random.Random(seed)
+    now = datetime.now()
+    tasks_dir.mkdir(parents=True, exist_ok=True)
+
+    batch = TaskBatch(tasks_dir)
+    for i in range(count):
+        title = f"{rng.choice(VERBS)} {rng.choice(SUBJECTS)} {i}"
+        category = rng.choice(CATEGORIES)
+        created = now - timedelta(days=rng.randint(0, 365), minutes=rng.randint(0, 1440))
+        updated = created + timedelta(days=rng.randint(0, 30))
+        frontmatter = {
+            "title": title,
+            "priority": rng.choice(["P0", "P1", "P2", "P2", "P3", "P3"]),
+            "status": rng.choice(["n", "n", "s", "b", "d"]),
+            "category": category,
+            "keywords": rng.sample(KEYWORDS, rng.randint(0, 4)),
+            "created_date": created.isoformat(),
+            "updated_date": min(updated, now).isoformat(),
+        }
+        if rng.random() < 0.4:
+            frontmatter["due_date"] = (now + timedelta(days=rng.randint(-30, 60))).strftime("%Y-%m-%d")
+
+        body = generate_task_content(title, category, f"Context for {title}.")
+        # A long tail of tasks accumulate long progress logs
+        body += "".join(
+            f"- {(created + timedelta(days=d)).strftime('%Y-%m-%d')}: Progress note {d}\n"
+            for d in range(int(rng.paretovariate(1.5) * 3))
+        )
+        batch.write(tasks_dir / f"task-{i:06d}.md", frontmatter, body)
+        if len(batch) >= WRITE_BATCH_SIZE:
+            batch.commit()
+    batch.commit()
+
+    return tasks_dir
+
+
+def _backlog_item(rng: random.Random, i: int, existing_titles: Sequence[str]) -> list[str]:
+    """Markdown lines for one BACKLOG.md item"""
+    kind = rng.random()
+    subject = rng.choice(SUBJECTS)
+    person = rng.choice(PEOPLE)
+
+    if kind < 0.40:
+        # Plain task, sometimes urgent
+        lines = [f"## {rng.choice(VERBS)} {subject} for {person}"]
+        if rng.random() < 0.3:
+            lines.append(f"Customers report the {subject} is failing; needs to be fixed before Friday.")
+        else:
+            lines.append(f"Follow up on the {subject} changes we discussed.")
+        return lines
+    if kind < 0.55 and existing_titles:
+        # Restates an existing task
+        return [f"## {rng.choice(existing_titles)}", "Came up again in planning."]
+    if kind < 0.65:
+        # Too vague to act on
+        return [f"## Maybe look at the thing with {subject}", "Not sure yet."]
+    if kind < 0.75:
+        return [f"## Explore {subject} strategy", f"Users requesting better {subject}; could be an opportunity."]
+    if kind < 0.85:
+        return [f"## Article on {subject}", f"Found article: https://example.com/{i}/{subject.replace(' ', '-')}"]
+    if kind < 0.95:
+        # Meeting notes with action items as sub-bullets
+        lines = [f"## Standup notes {i}", "Meeting notes from today:"]
+        lines += [f"- {person} to {rng.choice(VERBS).lower()} {rng.choice(SUBJECTS)}" for _ in range(rng.randint(2, 6))]
+        return lines
+    # Bare bullet item, only parsed as an item before the first heading
+    return [f"- {rng.choice(VERBS)} {subject} follow-up {i}"]
+
+
+def generate_backlog(path: Path, count: int, existing_titles: Sequence[str] = (), seed: int = 7) -> Path:
+    """
+    Write a BACKLOG.md with `count` items.
+
+    Roughly 40% are tasks, 15% restate one of existing_titles (when given),
+    and the rest are vague items, initiatives, references and meeting notes.
+    """
+    rng = random.Random(seed)
+    items = [_backlog_item(rng, i, existing_titles) for i in range(count)]
+    # Bullets only count as items before the first heading
+    items.sort(key=lambda lines: not lines[0].startswith("- "))
+    path.write_text("# Backlog\n\n" + "".join("\n".join(lines) + "\n\n" for lines in items))
+    return path
+
+
+TRANSCRIPT_KINDS = ["interview", "standup", "planning", "1on1", "customer-call"]
+
+
+def generate_transcripts(transcripts_dir: Path, count: int, seed: int = 11) -> Path:
+    """
+    Write `count` transcripts named YYYY-MM-DD-<kind>-<person>-<n>.md, dated
+    over the past year, each a heading and 10-40 speaker turns.
+    """
+    rng = random.Random(seed)
+    today = datetime.now().date()
+    transcripts_dir.mkdir(parents=True, exist_ok=True)
+    for i in range(count):
+        day = today - timedelta(days=rng.randint(0, 365))
+        kind = rng.choice(TRANSCRIPT_KINDS)
+        person = rng.choice(PEOPLE)
+        turns = []
+        for _ in range(rng.randint(10, 40)):
+            speaker = rng.choice(PEOPLE)
+            subject, other = rng.sample(SUBJECTS, 2)
+            turns.append(
+                f"**{speaker}:** On the {subject}, we should {rng.choice(VERBS).lower()} it before "
+                f"the {other} work lands. {rng.choice(KEYWORDS).capitalize()} came up again."
+            )
+        content = f"# {kind.replace('-', ' ').title()} with {person}\n\n" + "\n\n".join(turns) + "\n"
+        (transcripts_dir / f"{day.isoformat()}-{kind}-{person.lower()}-{i}.md").write_text(content)
+    return transcripts_dir
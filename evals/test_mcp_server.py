@@ -12,11 +12,19 @@ Tests the task-manager MCP server tools work correctly:
 Run with: pytest evals/test_mcp_server.py -v
 """
 
+import asyncio
+import json
+import os
+import random
+import re
+import sqlite3
 import sys
-from datetime import datetime
+import time
+from datetime import date, datetime, timedelta
 from pathlib import Path
 
 import pytest
+import yaml
 
 # Add tools/mcp-servers/task-manager to path for imports
 # tests/ -> evals/ -> project root
@@ -34,6 +42,16 @@ from server import (
 )
 
 import server
+from knowledge_search import KNOWLEDGE_INDEX_FILENAME, KnowledgeIndex
+from semantic_index import SEMANTIC_INDEX_FILENAME, SemanticIndex, embed
+from similarity_cache import TitleRatioCache, pair_key, title_key
+from task_search import SEARCH_INDEX_FILENAME, TaskSearchIndex
+from task_store import get_task_store
+
+
+def call_tool(name: str, arguments: dict) -> str:
+    """Invoke a server tool handler and return its text output."""
+    return asyncio.run(server.call_tool(name, arguments))[0].text
 
 
 @pytest.fixture
@@ -199,6 +217,99 @@ class TestPriorityCaps:
         assert p0_count >= caps["P0"]
 
 
+class TestBulkUpdateTasks:
+    """Test bulk_update_tasks."""
+
+    @pytest.fixture
+    def tasks(self, mock_project_dirs: Path, create_task_file) -> Path:
+        for i in range(3):
+            create_task_file(f"p0-{i}.md", {"title": f"P0 {i}", "priority": "P0", "status": "n"}, f"Body {i}")
+        create_task_file("p1.md", {"title": "P1", "priority": "P1", "status": "s", "due_date": "2026-05-01"}, "")
+        create_task_file("p2.md", {"title": "P2", "priority": "P2", "status": "b"}, "")
+        return mock_project_dirs / "tasks"
+
+    def bulk(self, *updates: dict, **arguments) -> str:
+        return call_tool("bulk_update_tasks", {"updates": list(updates), **arguments})
+
+    def test_updates_tasks_in_one_batch(self, tasks, monkeypatch):
+        import task_store
+
+        commits = []
+        real_commit = task_store.commit_batch
+        monkeypatch.setattr(task_store, "commit_batch", lambda *args: commits.append(args) or real_commit(*args))
+        text = self.bulk(
+            {"filename": "p1.md", "status": "d", "due_date": None},
+            {"filename": "p2.md", "priority": "P3", "due_date": "2026-06-30"},
+            {"filename": "p0-0.md", "status": "n"},
+        )
+        assert text == (
+            "Updated 2 of 3 tasks\n\n"
+            "- p1.md: status from s to d, due_date from 2026-05-01 to unset\n"
+            "- p2.md: priority from P2 to P3, due_date from unset to 2026-06-30\n"
+            "- p0-0.md: unchanged\n"
+        )
+        assert len(commits) == 1
+        assert [filename for filename, _ in commits[0][1]] == ["p1.md", "p2.md"]
+
+        p1 = get_task_by_file("p1.md")
+        assert (p1["status"], p1["due_date"]) == ("d", None)
+        p2 = get_task_by_file("p2.md")
+        assert (p2["priority"], str(p2["due_date"]), p2["status"]) == ("P3", "2026-06-30", "b")
+        assert get_task_by_file("p0-0.md")["updated_date"] is None
+        assert (tasks / "p0-0.md").read_text().endswith("Body 0\n")
+
+    def test_caps_checked_against_final_state(self, tasks):
+        """P0 is full (cap 3), but a swap keeps it at the cap."""
+        text = self.bulk({"filename": "p1.md", "priority": "P0"}, {"filename": "p0-0.md", "priority": "P1"})
+        assert text.startswith("Updated 2 of 2 tasks")
+        assert get_task_by_file("p1.md")["priority"] == "P0"
+
+        result = json.loads(self.bulk(
+            {"filename": "p0-0.md", "priority": "P0"},
+            {"filename": "p2.md", "priority": "P0"},
+            {"filename": "p0-1.md", "status": "s"},
+            format="json",
+        ))
+        assert result == {"updated": 0, "results": [
+            {"filename": "p0-0.md", "updated": False,
+             "error": "P0 cap (3) would be exceeded: 5 P0 tasks after these updates"},
+            {"filename": "p2.md", "updated": False,
+             "error": "P0 cap (3) would be exceeded: 5 P0 tasks after these updates"},
+            {"filename": "p0-1.md", "updated": False, "error": None},
+        ]}
+        assert get_task_by_file("p0-1.md")["status"] == "n"
+
+    def test_invalid_entry_rejects_whole_batch(self, tasks):
+        before = {path.name: path.read_text() for path in tasks.glob("*.md")}
+        text = self.bulk(
+            {"filename": "p2.md", "status": "d"},
+            {"filename": "missing.md", "status": "d"},
+            {"filename": "p1.md", "status": "x"},
+            {"filename": "p0-0.md"},
+            {"filename": "p0-1.md", "title": "Renamed"},
+            {"filename": "p2.md", "priority": "P3"},
+            {"filename": "p0-2.md", "due_date": "Friday"},
+            {"status": "d"},
+        )
+        assert text == (
+            "No tasks updated: 7 of 8 updates cannot be applied\n\n"
+            "- missing.md: Task not found: missing.md\n"
+            "- p1.md: Invalid status: x (use n, s, b, d)\n"
+            "- p0-0.md: No changes given\n"
+            "- p0-1.md: Unknown fields: title. Available: status, priority, due_date\n"
+            "- p2.md: Listed more than once\n"
+            "- p0-2.md: Invalid due_date: Friday (use YYYY-MM-DD or null)\n"
+            "- update 8: Missing filename\n"
+        )
+        assert {path.name: path.read_text() for path in tasks.glob("*.md")} == before
+
+    def test_invalid_arguments(self, tasks):
+        message = "updates must be a non-empty list of {filename, status, priority, due_date} objects"
+        assert call_tool("bulk_update_tasks", {"updates": []}) == message
+        assert call_tool("bulk_update_tasks", {"updates": "p1.md"}) == message
+        assert call_tool("bulk_update_tasks", {}) == message
+
+
 class TestAutoCategorization:
     """Test auto-categorization based on keywords."""
 
@@ -290,6 +401,631 @@ class TestSimilarityCalculation:
         assert similarity_with_kw > similarity_without_kw
 
 
+class TestDuplicateCandidates:
+    """The similarity index must find exactly what a full scan finds."""
+
+    TITLES = [
+        "Fix auth bug", "Fix authentication bug", "Fix auth bugs", "fix AUTH bug",
+        "Write blog post", "Write a blog post", "Review API design", "Review API designs",
+        "Email Sarah about launch", "Schedule launch meeting", "Auth", "", "Fix",
+        "Research onboarding drop-off", "Research onboarding drop off",
+    ]
+
+    @pytest.fixture
+    def existing(self, mock_project_dirs: Path, create_task_file):
+        for i, title in enumerate(self.TITLES):
+            create_task_file(f"task-{i:02d}.md", {
+                "title": title, "priority": "P2", "status": "n",
+                "category": "technical" if i % 2 else "writing",
+                "keywords": ["auth"] if "auth" in title.lower() else [],
+            })
+        return get_all_tasks()
+
+    @pytest.mark.parametrize("threshold", [0.0, 0.3, 0.45, 0.55, 0.6, 0.8, 1.0])
+    @pytest.mark.parametrize("check_keywords", [True, False])
+    def test_matches_full_scan(self, existing, threshold, check_keywords):
+        """Shortlisting never changes which tasks reach the threshold."""
+        config = {"deduplication": {
+            "similarity_threshold": threshold,
+            "check_keywords": check_keywords,
+            "check_categories": True,
+        }}
+        proposed = [
+            {"title": title, "keywords": keywords, "category": category}
+            for title in self.TITLES + ["Fix the auth bug", "blog"]
+            for keywords in ([], ["auth"])
+            for category in ("technical", "writing")
+        ]
+
+        indexed = server.find_similar_tasks(proposed, config)
+        for task, matches in zip(proposed, indexed):
+            expected = [
+                (t.file, similarity)
+                for t in existing
+                if (similarity := calculate_similarity(task, t, config)) >= threshold
+            ]
+            assert [(t.file, similarity) for t, similarity in matches] == expected
+
+    @pytest.mark.parametrize("threshold", [None, 0.3, 0.6])
+    def test_score_matrix_matches_pairwise(self, existing, threshold):
+        """Batch scores equal calculate_similarity; pruned entries are below the threshold."""
+        config = {"deduplication": {
+            "similarity_threshold": 0.6, "check_keywords": True, "check_categories": True,
+        }}
+        proposed = [
+            {"title": "Fix auth bug", "keywords": ["auth", "bug"], "category": "technical"},
+            {"title": "write blog", "keywords": [], "category": "writing"},
+            {"title": "", "keywords": ["AUTH"], "category": ""},
+        ]
+
+        matrix = server.score_matrix(proposed, existing, config, threshold)
+        for item, row in zip(proposed, matrix):
+            for task, score in zip(existing, row):
+                expected = calculate_similarity(item, task, config)
+                if score is None:
+                    assert threshold is not None and expected < threshold
+                else:
+                    assert score == expected
+
+    def test_index_follows_edits(self, existing, create_task_file):
+        """Renamed titles are matched under their new title only."""
+        config = {"deduplication": {
+            "similarity_threshold": 0.6, "check_keywords": True, "check_categories": False,
+        }}
+        create_task_file("task-04.md", {"title": "Plan offsite", "priority": "P2", "status": "n"})
+
+        old, new = server.find_similar_tasks(
+            [{"title": "Write blog post"}, {"title": "Plan offsite"}], config
+        )
+        assert [t.file for t, _ in old] == []
+        assert [t.file for t, _ in new] == ["task-04.md"]
+
+    def test_cached_ratios_match_uncached(self, existing):
+        """A second run is served from the ratio cache with identical scores."""
+        config = {"deduplication": {
+            "similarity_threshold": 0.3, "check_keywords": True, "check_categories": True,
+        }}
+        proposed = [{"title": title, "keywords": ["auth"], "category": "technical"} for title in self.TITLES]
+        uncached = server.score_matrix(proposed, existing, config)
+        ratios = TitleRatioCache()
+
+        first = server.score_matrix(proposed, existing, config, ratios=ratios)
+        assert first == uncached and ratios.misses > 0
+        hits, misses = ratios.hits, ratios.misses
+        second = server.score_matrix(proposed, existing, config, ratios=ratios)
+        assert second == uncached
+        assert ratios.misses == misses and ratios.hits > hits
+
+    def test_renamed_title_misses_cache(self, existing, create_task_file):
+        """A title change is scored afresh, never from the old title's entry."""
+        config = {"deduplication": {
+            "similarity_threshold": 0.6, "check_keywords": False, "check_categories": False,
+        }}
+        server.find_similar_tasks([{"title": "Write blog post"}], config)
+        create_task_file("task-04.md", {"title": "Plan offsite", "priority": "P2", "status": "n"})
+
+        [matches] = server.find_similar_tasks([{"title": "Write blog post"}], config)
+        assert "task-04.md" not in [t.file for t, _ in matches]
+        [matches] = server.find_similar_tasks([{"title": "Plan offsite"}], config)
+        assert [t.file for t, _ in matches] == ["task-04.md"]
+
+    def test_cache_file_round_trip(self, tmp_path):
+        """Saved ratios are loaded by a new cache; the LRU bound is kept."""
+        def key(title):
+            return pair_key(title_key(title), title_key("b"))
+
+        path = tmp_path / ".similarity-cache"
+        cache = TitleRatioCache(path, max_entries=3)
+        for i in range(5):
+            cache.put(key(f"a{i}"), i / 10)
+        assert len(cache) == 3
+        cache.save()
+
+        loaded = TitleRatioCache(path)
+        assert loaded.get(key("a0")) is None
+        assert loaded.get(key("a4")) == 0.4
+        assert len(loaded) == 3
+
+        smaller = TitleRatioCache(path, max_entries=2)
+        assert smaller.get(key("a2")) is None
+        assert smaller.get(key("a3")) == 0.3
+
+    @pytest.mark.parametrize("content", [b"", b"garbage", b"PMSC1L" + (5).to_bytes(8, "little")])
+    def test_bad_cache_file_starts_empty(self, tmp_path, content):
+        path = tmp_path / ".similarity-cache"
+        path.write_bytes(content)
+        cache = TitleRatioCache(path)
+        assert cache.get(pair_key(title_key("a"), title_key("b"))) is None
+        assert len(cache) == 0
+
+
+class TestSearchTasks:
+    """Test full-text search over task titles, keywords and bodies."""
+
+    @pytest.fixture
+    def tasks(self, mock_project_dirs: Path, create_task_file):
+        create_task_file("login-bug.md", {
+            "title": "Fix login bug", "priority": "P0", "status": "s",
+            "category": "technical", "keywords": ["auth"],
+        }, "Users are logged out after the SSO redirect.")
+        create_task_file("pricing.md", {
+            "title": "Update pricing page", "priority": "P2", "status": "n",
+            "category": "writing", "keywords": ["billing"],
+        }, "Mention the login changes in the FAQ.")
+        create_task_file("interviews.md", {
+            "title": "Schedule customer interviews", "priority": "P1", "status": "d",
+            "category": "research", "keywords": ["discovery"],
+        }, "Ask about billing and login friction.")
+        return mock_project_dirs
+
+    def search(self, **arguments) -> dict:
+        return json.loads(call_tool("search_tasks", {**arguments, "format": "json"}))
+
+    def test_title_matches_rank_first(self, tasks):
+        payload = self.search(query="login")
+        assert payload["count"] == 3
+        assert [t["file"] for t in payload["tasks"]][0] == "login-bug.md"
+        scores = [t["score"] for t in payload["tasks"]]
+        assert scores == sorted(scores, reverse=True)
+
+    def test_every_word_must_match(self, tasks):
+        assert self.search(query="billing")["count"] == 2
+        assert [t["file"] for t in self.search(query="billing friction")["tasks"]] == ["interviews.md"]
+
+    def test_stemming(self, tasks):
+        assert [t["file"] for t in self.search(query="bugs")["tasks"]] == ["login-bug.md"]
+        assert [t["file"] for t in self.search(query="redirecting")["tasks"]] == ["login-bug.md"]
+
+    def test_keywords_are_searched(self, tasks):
+        assert [t["file"] for t in self.search(query="discovery")["tasks"]] == ["interviews.md"]
+
+    def test_filters_apply_before_limit(self, tasks):
+        payload = self.search(query="login", status="d", limit=1)
+        assert payload["count"] == 1
+        assert [t["file"] for t in payload["tasks"]] == ["interviews.md"]
+        assert self.search(query="login", priority="P2", category="writing")["count"] == 1
+
+    def test_filters_match_whole_values(self, tasks, create_task_file):
+        """A filter is an equality test, not a phrase match on the value."""
+        create_task_file("user-study.md", {
+            "title": "Plan login study", "status": "n", "category": "user research",
+        }, "")
+        create_task_file("user-call.md", {"title": "Login follow-up call", "status": "n", "category": "user"}, "")
+        create_task_file("loose.md", {"title": "Login cleanup", "status": "n"}, "")
+
+        assert [t["file"] for t in self.search(query="login", category="user")["tasks"]] == ["user-call.md"]
+        assert [t["file"] for t in self.search(query="login", category="user research")["tasks"]] == ["user-study.md"]
+        assert [t["file"] for t in self.search(query="login", category="")["tasks"]] == ["loose.md"]
+        assert self.search(query="login", category="research status")["count"] == 0
+
+    def test_snippet_highlights_matches(self, tasks):
+        [hit] = self.search(query="SSO", fields=["file", "snippet"])["tasks"]
+        assert hit == {"file": "login-bug.md", "snippet": "Users are logged out after the **SSO** redirect."}
+
+    def test_index_follows_edits_and_deletes(self, tasks, create_task_file):
+        assert self.search(query="FAQ")["count"] == 1
+        create_task_file("pricing.md", {
+            "title": "Update pricing page", "priority": "P2", "status": "n",
+        }, "Rewrite the enterprise tier copy.")
+        (tasks / "tasks" / "interviews.md").unlink()
+
+        assert self.search(query="FAQ")["count"] == 0
+        assert [t["file"] for t in self.search(query="enterprise")["tasks"]] == ["pricing.md"]
+        assert [t["file"] for t in self.search(query="login")["tasks"]] == ["login-bug.md"]
+
+    def test_index_is_persistent(self, tasks):
+        """A new process reuses the index file and re-reads nothing."""
+        self.search(query="login")
+        index = TaskSearchIndex(tasks / "tasks" / SEARCH_INDEX_FILENAME)
+        try:
+            assert index.sync(get_task_store(tasks / "tasks")) == 0
+            assert index.search("redirect")[0] == 1
+        finally:
+            index.close()
+
+    def test_corrupt_index_is_rebuilt(self, tasks):
+        path = tasks / "tasks" / SEARCH_INDEX_FILENAME
+        path.write_bytes(b"not a database")
+        index = TaskSearchIndex(path)
+        try:
+            assert index.sync(get_task_store(tasks / "tasks")) == 3
+            assert index.search("login")[0] == 3
+        finally:
+            index.close()
+
+    def test_markdown_output(self, tasks):
+        text = call_tool("search_tasks", {"query": "login", "limit": 2})
+        assert text.startswith('Found 3 tasks matching "login" (showing the best 2):')
+        assert "- **Fix login bug** (login-bug.md)" in text
+        assert "Priority: P0 | Status: s | Category: technical" in text
+
+    @pytest.mark.parametrize("query", ['login" OR "pricing', "NEAR(login", "title:login", "-login"])
+    def test_query_syntax_is_literal(self, tasks, query):
+        """FTS5 operators in the query are not interpreted."""
+        assert "Search failed" not in call_tool("search_tasks", {"query": query})
+
+    def test_invalid_arguments(self, tasks):
+        assert "at least one word" in call_tool("search_tasks", {"query": " ?! "})
+        assert "positive integer" in call_tool("search_tasks", {"query": "login", "limit": 0})
+        assert "Unknown fields" in call_tool("search_tasks", {
+            "query": "login", "format": "json", "fields": ["body"],
+        })
+        assert call_tool("search_tasks", {"query": "nothing-like-this"}).startswith("No tasks match")
+
+
+class TestSearchKnowledge:
+    """Test full-text search over knowledge/ and tasks/."""
+
+    @pytest.fixture
+    def project(self, mock_project_dirs: Path, create_task_file):
+        transcripts = mock_project_dirs / "knowledge" / "transcripts"
+        transcripts.mkdir()
+        (transcripts / "2026-03-02-interview-acme.md").write_text(
+            "# Interview with Acme\n\n"
+            "Intro and small talk about the weather.\n\n"
+            "They churned from the old plan because\nonboarding took two weeks.\n\n"
+            "Pricing felt fair once onboarding was done.\n"
+        )
+        (transcripts / "2026-01-15-standup.md").write_text(
+            "Onboarding checklist is still blocked on legal.\n"
+        )
+        (mock_project_dirs / "knowledge" / "notes" / "ideas.md").write_text(
+            "---\ntitle: Product ideas\ndate: 2026-02-10\n---\n\nSelf-serve onboarding wizard.\n"
+        )
+        create_task_file("onboarding-email.md", {
+            "title": "Draft onboarding email", "priority": "P2", "status": "n",
+            "updated_date": "2026-03-10T09:00:00",
+        }, "Follow up on the Acme interview.")
+        return mock_project_dirs
+
+    def search(self, **arguments) -> dict:
+        return json.loads(call_tool("search_knowledge", {**arguments, "format": "json"}))
+
+    def paths(self, **arguments) -> list[str]:
+        return [hit["path"] for hit in self.search(**arguments)["results"]]
+
+    def test_searches_knowledge_and_tasks(self, project):
+        payload = self.search(query="onboarding")
+        assert payload["count"] == 4
+        assert set(self.paths(query="onboarding")) == {
+            "knowledge/transcripts/2026-03-02-interview-acme.md",
+            "knowledge/transcripts/2026-01-15-standup.md",
+            "knowledge/notes/ideas.md",
+            "tasks/onboarding-email.md",
+        }
+        assert self.paths(query="acme interview")[0] == "knowledge/transcripts/2026-03-02-interview-acme.md"
+
+    def test_path_filter(self, project):
+        assert sorted(self.paths(query="onboarding", path="knowledge/transcripts/")) == [
+            "knowledge/transcripts/2026-01-15-standup.md",
+            "knowledge/transcripts/2026-03-02-interview-acme.md",
+        ]
+        assert self.paths(query="onboarding", path="tasks/onboarding-email.md") == ["tasks/onboarding-email.md"]
+        assert self.search(query="onboarding", path="knowledge/trans")["count"] == 0
+
+    def test_date_filters(self, project):
+        """Dates come from the file name, else the frontmatter."""
+        assert sorted(self.paths(query="onboarding", since="2026-02-10", until="2026-03-02")) == [
+            "knowledge/notes/ideas.md",
+            "knowledge/transcripts/2026-03-02-interview-acme.md",
+        ]
+        assert self.paths(query="onboarding", since="2026-03-05") == ["tasks/onboarding-email.md"]
+
+    def test_paragraph_snippet_and_line(self, project):
+        [hit] = self.search(query="churned onboarding", path="knowledge/transcripts")["results"]
+        assert hit["title"] == "Interview with Acme"
+        assert hit["date"] == "2026-03-02"
+        assert hit["line"] == 5
+        assert hit["snippet"] == "They **churned** from the old plan because **onboarding** took two weeks."
+
+    def test_line_counts_frontmatter(self, project):
+        [hit] = self.search(query="wizard")["results"]
+        assert (hit["path"], hit["title"], hit["line"]) == ("knowledge/notes/ideas.md", "Product ideas", 6)
+
+    def test_index_follows_edits_and_deletes(self, project):
+        assert self.search(query="legal")["count"] == 1
+        (project / "knowledge" / "transcripts" / "2026-01-15-standup.md").unlink()
+        (project / "knowledge" / "notes" / "ideas.md").write_text("Legal review of the wizard.\n")
+        assert self.paths(query="legal") == ["knowledge/notes/ideas.md"]
+        assert self.search(query="onboarding")["count"] == 2
+
+    def test_index_is_persistent(self, project):
+        self.search(query="onboarding")
+        index = KnowledgeIndex(project / KNOWLEDGE_INDEX_FILENAME, project)
+        try:
+            assert index.sync(get_task_store(project / "tasks")) == 0
+            assert index.search("churned")[0] == 1
+        finally:
+            index.close()
+
+    def test_markdown_output(self, project):
+        text = call_tool("search_knowledge", {"query": "onboarding", "limit": 1})
+        assert text.startswith('Found 4 files matching "onboarding" (showing the best 1):')
+        assert call_tool("search_knowledge", {"query": "weather"}).startswith(
+            "Found 1 files matching \"weather\":\n\n"
+            "- **Interview with Acme** (knowledge/transcripts/2026-03-02-interview-acme.md:3, 2026-03-02)\n"
+            "  > Intro and small talk about the **weather**."
+        )
+
+    def test_invalid_arguments(self, project):
+        assert "at least one word" in call_tool("search_knowledge", {"query": "--"})
+        assert "YYYY-MM-DD" in call_tool("search_knowledge", {"query": "acme", "since": "last week"})
+        assert "positive integer" in call_tool("search_knowledge", {"query": "acme", "limit": 0})
+        assert call_tool("search_knowledge", {"query": "nothing-like-this"}).startswith("No files match")
+
+
+class TestSemanticSearch:
+    """Test similarity search over knowledge/ and tasks/."""
+
+    @pytest.fixture
+    def project(self, mock_project_dirs: Path, create_task_file):
+        transcripts = mock_project_dirs / "knowledge" / "transcripts"
+        transcripts.mkdir()
+        filler = "\n\n".join(f"Status update {i} on the quarterly planning spreadsheet." for i in range(30))
+        (transcripts / "2026-03-02-interview-acme.md").write_text(
+            f"# Interview with Acme\n\n{filler}\n\n"
+            "Several customers cancelled their subscriptions during onboarding.\n"
+        )
+        (transcripts / "2026-03-04-pricing-review.md").write_text(
+            "# Pricing review\n\nThe enterprise tier price goes up in April.\n"
+        )
+        create_task_file("sso-bug.md", {
+            "title": "Fix SSO login redirect", "priority": "P1", "status": "s",
+        }, "Users land on a blank page after signing in.")
+        return mock_project_dirs
+
+    def search(self, **arguments) -> list[dict]:
+        return json.loads(call_tool("semantic_search", {**arguments, "format": "json"}))["results"]
+
+    def test_partial_matches_are_found(self, project):
+        """Not every query word has to appear, and word forms overlap."""
+        [best, *_] = self.search(query="customer cancellations while onboarding")
+        assert best["path"] == "knowledge/transcripts/2026-03-02-interview-acme.md"
+        assert best["title"] == "Interview with Acme"
+        assert self.search(query="signin redirects")[0]["path"] == "tasks/sso-bug.md"
+
+    def test_best_chunk_line_and_snippet(self, project):
+        [best, *_] = self.search(query="cancelled subscriptions")
+        lines = (project / best["path"]).read_text().splitlines()
+        assert lines[best["line"] - 1] == "Several customers cancelled their subscriptions during onboarding."
+        assert best["snippet"] == "Several customers cancelled their subscriptions during onboarding."
+
+    def test_path_filter(self, project):
+        assert [hit["path"] for hit in self.search(query="page price", path="tasks")] == ["tasks/sso-bug.md"]
+
+    def test_unrelated_files_are_left_out(self, project):
+        assert [hit["path"] for hit in self.search(query="enterprise tier")] == [
+            "knowledge/transcripts/2026-03-04-pricing-review.md",
+        ]
+
+    def test_index_follows_edits_and_deletes(self, project):
+        review = project / "knowledge" / "transcripts" / "2026-03-04-pricing-review.md"
+        review.write_text("# Pricing review\n\nDiscounts for nonprofits.\n")
+        (project / "tasks" / "sso-bug.md").unlink()
+        assert self.search(query="enterprise tier") == []
+        assert self.search(query="nonprofit discount")[0]["path"] == review.relative_to(project).as_posix()
+        assert self.search(query="SSO login redirect", path="tasks") == []
+
+    def test_incremental_by_content_hash(self, project):
+        index = SemanticIndex(project / SEMANTIC_INDEX_FILENAME, project)
+        try:
+            assert index.sync() == 3
+            review = project / "knowledge" / "transcripts" / "2026-03-04-pricing-review.md"
+            # Same content, new signature: not re-embedded
+            review.write_text(review.read_text())
+            assert index.sync() == 0
+            capacity = index._capacity
+            for price in ("up", "down", "up"):
+                review.write_text(f"# Pricing review\n\nThe enterprise tier price goes {price}.\n")
+                assert index.sync() == 1
+            # The replaced rows are reused rather than appended
+            assert index._capacity <= capacity + 1
+        finally:
+            index.close()
+
+    def test_index_is_persistent(self, project):
+        self.search(query="pricing")
+        index = SemanticIndex(project / SEMANTIC_INDEX_FILENAME, project)
+        try:
+            assert index.sync(get_task_store(project / "tasks")) == 0
+            assert index.search("enterprise tier")[0].path == "knowledge/transcripts/2026-03-04-pricing-review.md"
+        finally:
+            index.close()
+
+    def test_truncated_vectors_are_rebuilt(self, project):
+        self.search(query="pricing")
+        (project / SEMANTIC_INDEX_FILENAME).with_suffix(".vectors").write_bytes(b"")
+        index = SemanticIndex(project / SEMANTIC_INDEX_FILENAME, project)
+        try:
+            assert index.sync() == 3
+        finally:
+            index.close()
+
+    def test_candidates_match_exact_ranking(self, mock_project_dirs, monkeypatch):
+        """The quantized first stage keeps the results an exact scan finds."""
+        import semantic_index
+
+        notes = mock_project_dirs / "knowledge" / "notes"
+        words = (
+            "billing export mobile churn pricing roadmap search admin invoice audit "
+            "onboarding dashboard alerts latency report webhook import sync trial seats"
+        ).split()
+        rng = random.Random(3)
+        for i in range(300):
+            (notes / f"note-{i}.md").write_text(" ".join(rng.sample(words, 6)) + "\n")
+        queries = ("churn in mobile billing", "pricing roadmap", "admin search export")
+
+        index = SemanticIndex(mock_project_dirs / SEMANTIC_INDEX_FILENAME, mock_project_dirs)
+        try:
+            index.sync()
+            exact = [[hit.score for hit in index.search(query, limit=5)] for query in queries]
+            monkeypatch.setattr(semantic_index, "MIN_CANDIDATES", 8)
+            monkeypatch.setattr(semantic_index, "CANDIDATES_PER_RESULT", 2)
+            for query, scores in zip(queries, exact):
+                assert [hit.score for hit in index.search(query, limit=5)] == scores
+        finally:
+            index.close()
+
+    def test_markdown_output(self, project):
+        text = call_tool("semantic_search", {"query": "enterprise price", "limit": 1})
+        assert text.startswith('1 passages most similar to "enterprise price":\n\n')
+        assert "- **Pricing review** (knowledge/transcripts/2026-03-04-pricing-review.md:3, similarity" in text
+        assert "  > The enterprise tier price goes up in April." in text
+
+    def test_invalid_arguments(self, project):
+        assert "not a stopword" in call_tool("semantic_search", {"query": "what is the"})
+        assert "positive integer" in call_tool("semantic_search", {"query": "pricing", "limit": 0})
+        assert call_tool("semantic_search", {"query": "zzqx"}).startswith("Nothing indexed")
+
+
+class TestDocumentOutline:
+    """Test outlines of knowledge and task files from the document cache."""
+
+    TRANSCRIPT = (
+        "# Weekly sync with Acme\n\n"
+        "[00:01] Priya: We keep losing trial users during onboarding.\n"
+        "The import step times out for large workspaces.\n\n"
+        "**Sam:** Onboarding pricing came up again.\n\n"
+        "Note: recording started late\n\n"
+        "```\nBob: not a speaker\n- [ ] not an action item\n```\n\n"
+        "## Action items\n"
+        "- Sam to send the pricing deck by Friday\n"
+        "- @priya look into import timeouts\n"
+        "- [x] Book the follow-up call\n\n"
+        "## Other\n"
+        "- [ ] Update the roadmap doc\n"
+        "- Not an action item\n"
+        "TODO: Lena: draft the onboarding checklist\n"
+    )
+
+    @pytest.fixture
+    def parse_count(self, monkeypatch) -> list[str]:
+        import document_cache
+
+        parsed = []
+        original = document_cache.parse_markdown
+
+        def counting(text: str):
+            parsed.append(text)
+            return original(text)
+
+        monkeypatch.setattr(document_cache, "parse_markdown", counting)
+        return parsed
+
+    @pytest.fixture
+    def transcripts(self, mock_project_dirs: Path) -> Path:
+        transcripts = mock_project_dirs / "knowledge" / "transcripts"
+        transcripts.mkdir()
+        (transcripts / "2026-03-02-weekly-acme.md").write_text(self.TRANSCRIPT)
+        return transcripts
+
+    def outline(self, **arguments) -> dict:
+        return json.loads(call_tool("get_document_outline", {**arguments, "format": "json"}))
+
+    def test_parses_structure(self, transcripts):
+        result = self.outline(path="knowledge/transcripts", fields=[
+            "title", "date", "headings", "action_items", "speakers", "keywords", "turns",
+        ])
+        assert result["count"] == 1
+        [document] = result["documents"]
+        assert document["title"] == "Weekly sync with Acme"
+        assert document["date"] == "2026-03-02"
+        assert document["headings"] == [
+            {"line": 1, "level": 1, "text": "Weekly sync with Acme"},
+            {"line": 15, "level": 2, "text": "Action items"},
+            {"line": 20, "level": 2, "text": "Other"},
+        ]
+        assert [(item["line"], item["text"], item["owner"], item["done"]) for item in document["action_items"]] == [
+            (16, "Sam to send the pricing deck by Friday", "Sam", False),
+            (17, "@priya look into import timeouts", "priya", False),
+            (18, "Book the follow-up call", None, True),
+            (21, "Update the roadmap doc", None, False),
+            (23, "Lena: draft the onboarding checklist", "Lena", False),
+        ]
+        assert document["speakers"] == [
+            {"name": "Priya", "turns": 1, "words": 15},
+            {"name": "Sam", "turns": 1, "words": 5},
+        ]
+        assert document["turns"] == [
+            {"line": 3, "speaker": "Priya", "words": 15},
+            {"line": 6, "speaker": "Sam", "words": 5},
+        ]
+        assert document["keywords"][:3] == ["onboarding", "import", "pricing"]
+        assert not {"priya", "sam", "the", "action", "bob"} & set(document["keywords"])
+
+    def test_frontmatter_title_and_date(self, mock_project_dirs):
+        notes = mock_project_dirs / "knowledge" / "notes"
+        (notes / "pricing.md").write_text("---\ntitle: Pricing notes\ndate: 2026-02-01\n---\n\n# Tiers\n")
+        [document] = self.outline(path="knowledge/notes")["documents"]
+        assert (document["title"], document["date"]) == ("Pricing notes", "2026-02-01")
+        assert document["headings"] == [{"line": 6, "level": 1, "text": "Tiers"}]
+
+    def test_date_filters_newest_first(self, transcripts):
+        for day in ("2026-01-05", "2026-02-10", "2026-04-01"):
+            (transcripts / f"{day}-standup.md").write_text(f"# Standup {day}\n")
+        result = self.outline(path="knowledge/transcripts", since="2026-02-01", until="2026-03-31", fields=["path"])
+        assert result == {"count": 2, "documents": [
+            {"path": "knowledge/transcripts/2026-03-02-weekly-acme.md"},
+            {"path": "knowledge/transcripts/2026-02-10-standup.md"},
+        ]}
+        assert self.outline(path="knowledge/transcripts", limit=1, fields=["date"]) == {
+            "count": 4, "documents": [{"date": "2026-04-01"}],
+        }
+
+    def test_parses_are_reused_by_content(self, transcripts, parse_count):
+        transcript = transcripts / "2026-03-02-weekly-acme.md"
+        self.outline()
+        self.outline()
+        assert len(parse_count) == 1
+
+        # Touched, renamed and copied files keep their parse
+        transcript.write_text(self.TRANSCRIPT)
+        transcript.rename(transcripts / "2026-03-03-weekly-acme.md")
+        (transcripts / "copy.md").write_text(self.TRANSCRIPT)
+        result = self.outline(fields=["path", "action_items"])
+        assert len(parse_count) == 1
+        assert result["count"] == 2
+        assert all(len(document["action_items"]) == 5 for document in result["documents"])
+
+        (transcripts / "copy.md").write_text("# Changed\n- [ ] New item\n")
+        assert self.outline(path="knowledge/transcripts/copy.md", fields=["title"])["documents"] == [{"title": "Changed"}]
+        assert len(parse_count) == 2
+
+    def test_cache_is_persistent_and_pruned(self, transcripts, parse_count):
+        from document_cache import DOCUMENT_CACHE_FILENAME, DocumentCache
+
+        root = transcripts.parent.parent
+        self.outline()
+        cache = DocumentCache(root / DOCUMENT_CACHE_FILENAME, root)
+        try:
+            assert list(cache.documents("knowledge")) == ["knowledge/transcripts/2026-03-02-weekly-acme.md"]
+            assert len(parse_count) == 1
+
+            (transcripts / "2026-03-02-weekly-acme.md").write_text("# Rewritten\n")
+            cache.documents()
+            (transcripts / "2026-03-02-weekly-acme.md").unlink()
+            assert cache.documents() == {}
+            conn = sqlite3.connect(root / DOCUMENT_CACHE_FILENAME)
+            assert conn.execute("SELECT count(*) FROM documents").fetchone()[0] == 0
+            conn.close()
+        finally:
+            cache.close()
+
+    def test_markdown_output(self, transcripts):
+        text = call_tool("get_document_outline", {"path": "knowledge/transcripts"})
+        assert text.startswith("1 files in knowledge/transcripts:\n\n## Weekly sync with Acme\n")
+        assert "knowledge/transcripts/2026-03-02-weekly-acme.md (2026-03-02)" in text
+        assert "- **Speakers:** Priya (1 turn, 15 words), Sam (1 turn, 5 words)" in text
+        assert "  - [ ] Sam to send the pricing deck by Friday (line 16, Sam)" in text
+        assert "  - [x] Book the follow-up call (line 18)" in text
+        assert call_tool("get_document_outline", {"path": "knowledge/missing"}) == "No files found in knowledge/missing"
+
+    def test_invalid_arguments(self, transcripts):
+        assert call_tool("get_document_outline", {"limit": 0}) == "limit must be a positive integer"
+        assert call_tool("get_document_outline", {"since": "March"}) == "since must be a date (YYYY-MM-DD)"
+        assert "Unknown fields: body" in call_tool("get_document_outline", {"format": "json", "fields": ["body"]})
+
+
 class TestConfigLoading:
     """Test configuration loading."""
 
@@ -315,6 +1051,29 @@ class TestConfigLoading:
         for cat in expected:
             assert cat in config["category_keywords"]
 
+    def test_config_cached_until_file_changes(self, mock_project_dirs: Path):
+        """config.yaml is parsed once and re-read after it is edited."""
+        config_file = mock_project_dirs / "config.yaml"
+        config = load_config()
+        assert load_config() is config
+
+        data = yaml.safe_load(config_file.read_text())
+        data["priority_caps"]["P0"] = 50
+        config_file.write_text(yaml.dump(data) + "\n")
+
+        assert load_config()["priority_caps"]["P0"] == 50
+
+    def test_category_matcher_rebuilt_with_config(self, mock_project_dirs: Path):
+        """Category keyword edits take effect without restarting the server."""
+        config_file = mock_project_dirs / "config.yaml"
+        assert auto_categorize("Plan the offsite", "", load_config()) == ""
+
+        data = yaml.safe_load(config_file.read_text())
+        data["category_keywords"]["admin"].append("offsite")
+        config_file.write_text(yaml.dump(data) + "\n")
+
+        assert auto_categorize("Plan the offsite", "", load_config()) == "admin"
+
 
 class TestTaskFileIntegrity:
     """Test task file integrity after operations."""
@@ -378,3 +1137,781 @@ Quote: "It's working!"
         final_fm, final_body = parse_yaml_frontmatter(task_path)
         assert "https://example.com" in final_body
         assert "const x = { key:" in final_body
+
+
+class TestTaskStore:
+    """Test the in-memory task index."""
+
+    @pytest.fixture
+    def parse_calls(self, monkeypatch):
+        """Count frontmatter parses performed by the task store."""
+        import task_store
+
+        calls = []
+        original = task_store.read_task_metadata
+
+        def counting_parse(file_path):
+            calls.append(file_path.name)
+            return original(file_path)
+
+        monkeypatch.setattr(task_store, "read_task_metadata", counting_parse)
+        return calls
+
+    def test_unchanged_files_not_reparsed(self, mock_project_dirs: Path, create_task_file, parse_calls):
+        """Repeated listings only parse each file once."""
+        create_task_file("a.md", {"title": "A", "priority": "P1", "status": "n"}, "")
+        create_task_file("b.md", {"title": "B", "priority": "P2", "status": "n"}, "")
+
+        assert len(get_all_tasks()) == 2
+        assert len(get_all_tasks()) == 2
+        assert sorted(parse_calls) == ["a.md", "b.md"]
+
+    def test_modified_file_reparsed(self, mock_project_dirs: Path, create_task_file, parse_calls):
+        """Only the modified file is parsed again."""
+        create_task_file("a.md", {"title": "A", "priority": "P1", "status": "n"}, "")
+        create_task_file("b.md", {"title": "B", "priority": "P2", "status": "n"}, "")
+        get_all_tasks()
+        parse_calls.clear()
+
+        create_task_file("a.md", {"title": "A renamed", "priority": "P1", "status": "s"}, "")
+        tasks = {t["file"]: t for t in get_all_tasks()}
+
+        assert parse_calls == ["a.md"]
+        assert tasks["a.md"]["title"] == "A renamed"
+        assert tasks["a.md"]["status"] == "s"
+
+    def test_listing_is_a_copy(self, mock_project_dirs: Path, create_task_file):
+        """Sorting or trimming a listing does not change the cached order."""
+        create_task_file("a.md", {"title": "A", "priority": "P3", "status": "n"}, "")
+        create_task_file("b.md", {"title": "B", "priority": "P1", "status": "n"}, "")
+
+        tasks = get_all_tasks()
+        tasks.sort(key=lambda t: t.priority)
+        tasks.pop()
+        assert [t.file for t in get_all_tasks()] == ["a.md", "b.md"]
+
+    def test_deleted_and_added_files(self, mock_project_dirs: Path, create_task_file):
+        """Deleted files drop out and new files appear."""
+        path = create_task_file("old.md", {"title": "Old", "priority": "P3", "status": "d"}, "")
+        assert [t["file"] for t in get_all_tasks()] == ["old.md"]
+
+        path.unlink()
+        create_task_file("new.md", {"title": "New", "priority": "P3", "status": "n"}, "")
+
+        assert [t["file"] for t in get_all_tasks()] == ["new.md"]
+        assert get_task_by_file("old.md") is None
+
+    def test_listing_does_not_hold_bodies(self, mock_project_dirs: Path, create_task_file):
+        """Indexed records carry metadata only; bodies are read on access."""
+        path = create_task_file("a.md", {"title": "A", "priority": "P1", "status": "n"}, "Original body")
+        task = get_all_tasks()[0]
+
+        assert task._body is None
+        assert task["body"] == "Original body"
+
+        # The body is read from disk each time rather than cached
+        path.write_text(path.read_text().replace("Original body", "Edited body"))
+        assert task.get("body") == "Edited body"
+
+    def test_indexed_files_record_body_hash(self, mock_project_dirs: Path, create_task_file):
+        """Bodies are hashed into the catalog whoever wrote the file."""
+        from task_catalog import body_hash
+
+        task_file = mock_project_dirs / "tasks" / "hashed.md"
+        get_all_tasks()
+        write_task_file(task_file, {"title": "Hashed", "priority": "P2", "status": "n"}, "Some body")
+        create_task_file("edited.md", {"title": "Edited", "priority": "P2", "status": "n"}, "Edited body")
+        get_all_tasks()
+
+        store = get_task_store(mock_project_dirs / "tasks")
+        rows = dict(store.catalog._connect().execute("SELECT file, body_hash FROM tasks"))
+        assert rows == {"hashed.md": body_hash("Some body"), "edited.md": body_hash("Edited body")}
+
+
+class TestTaskRecord:
+    """Tests for the compact Task record shared by the handlers."""
+
+    def test_dates_parsed_once(self, mock_project_dirs: Path, create_task_file):
+        """Parsed dates sit next to the raw frontmatter values."""
+        create_task_file("a.md", {
+            "title": "A", "priority": "P1", "status": "s",
+            "due_date": "2030-01-15", "updated_date": "2030-01-01T09:30:00",
+        }, "")
+        task = get_task_by_file("a.md")
+
+        assert task.due_date == "2030-01-15"
+        assert task.due == datetime(2030, 1, 15).date()
+        assert task.updated == datetime(2030, 1, 1, 9, 30)
+        assert task.created is None
+
+    def test_compact_and_shared_values(self, mock_project_dirs: Path, create_task_file):
+        """Tasks use slots, tuples for keywords and shared categorical strings."""
+        create_task_file("a.md", {"title": "A", "priority": "P2", "status": "n", "keywords": ["api"]}, "")
+        create_task_file("b.md", {"title": "B", "priority": "P2", "status": "n"}, "")
+        a, b = get_all_tasks()
+
+        assert not hasattr(a, "__dict__")
+        assert a.keywords == ("api",)
+        assert b.keywords == ()
+        assert a.priority is b.priority
+
+    def test_mapping_access(self, mock_project_dirs: Path, create_task_file):
+        """Tasks can still be read like the dicts they replaced."""
+        create_task_file("a.md", {"title": "A", "priority": "P1", "status": "n"}, "Body")
+        task = get_task_by_file("a.md")
+
+        assert task["title"] == task.title == "A"
+        assert task.get("due_date") is None
+        assert task.get("missing", "default") == "default"
+        with pytest.raises(KeyError):
+            task["missing"]
+
+
+class TestSecondaryIndexes:
+    """Test indexed filtering and date range queries."""
+
+    @pytest.fixture
+    def indexed_tasks(self, mock_project_dirs: Path, create_task_file):
+        """Create tasks spread across priorities, statuses and dates."""
+        now = datetime.now()
+        create_task_file("fresh.md", {
+            "title": "Fresh", "priority": "P1", "status": "n", "category": "technical",
+            "created_date": now.isoformat(), "updated_date": now.isoformat(),
+        })
+        create_task_file("stale.md", {
+            "title": "Stale", "priority": "P1", "status": "s", "category": "writing",
+            "created_date": (now - timedelta(days=40)).isoformat(),
+            "updated_date": (now - timedelta(days=30)).isoformat(),
+        })
+        create_task_file("overdue.md", {
+            "title": "Overdue", "priority": "P0", "status": "b", "category": "technical",
+            "due_date": (now - timedelta(days=3)).date(),
+        })
+        create_task_file("done.md", {
+            "title": "Done", "priority": "P2", "status": "d", "category": "admin",
+            "due_date": (now - timedelta(days=3)).strftime("%Y-%m-%d"),
+            "updated_date": (now - timedelta(days=120)).isoformat(),
+        })
+        return get_task_store(mock_project_dirs / "tasks")
+
+    def test_find_intersects_criteria(self, indexed_tasks):
+        """Multiple criteria are intersected."""
+        assert [t["file"] for t in indexed_tasks.find(priority="P1")] == ["fresh.md", "stale.md"]
+        assert [t["file"] for t in indexed_tasks.find(priority="P1", category="writing")] == ["stale.md"]
+        assert indexed_tasks.find(priority="P3") == []
+
+    def test_counts(self, indexed_tasks):
+        """Counts come straight from the inverted indexes."""
+        assert indexed_tasks.count("priority", "P1") == 2
+        assert indexed_tasks.value_counts("category") == {"technical": 2, "writing": 1, "admin": 1}
+
+    def test_date_range_oldest_first(self, indexed_tasks):
+        """Date range scans return tasks in ascending date order."""
+        cutoff = datetime.now() - timedelta(days=14)
+        results = indexed_tasks.date_range("updated_date", end=cutoff)
+        assert [t.file for t in results] == ["done.md", "stale.md"]
+        assert results[0].updated < results[1].updated < cutoff
+
+    def test_index_follows_edits(self, indexed_tasks, create_task_file):
+        """Re-written files move between index buckets."""
+        create_task_file("fresh.md", {"title": "Fresh", "priority": "P3", "status": "d"})
+        assert indexed_tasks.count("priority", "P1") == 1
+        assert [t["file"] for t in indexed_tasks.find(status="d")] == ["done.md", "fresh.md"]
+
+    def test_list_tasks_days_old(self, indexed_tasks):
+        """list_tasks combines field filters with the created_date index."""
+        text = call_tool("list_tasks", {"priority": "P1", "days_old": 30})
+        assert "Found 1 tasks" in text
+        assert "stale.md" in text
+
+    def test_find_overdue_tasks(self, indexed_tasks):
+        """Overdue detection handles YAML dates and skips done tasks."""
+        text = call_tool("find_overdue_tasks", {})
+        assert "Found 1 overdue tasks" in text
+        assert "overdue.md" in text
+        assert "(3 days overdue)" in text
+
+    def test_find_stale_and_prune(self, indexed_tasks):
+        """Stale and prune queries use the updated_date index."""
+        assert "stale.md" in call_tool("find_stale_tasks", {})
+        text = call_tool("prune_completed_tasks", {"dry_run": True})
+        assert "done.md" in text
+        assert "completed 120 days ago" in text
+
+
+class TestJsonOutput:
+    """Test format=json payloads and field projection on the reporting tools."""
+
+    @pytest.fixture
+    def tasks(self, mock_project_dirs: Path, create_task_file):
+        """Create a stale task, an overdue task and a done task."""
+        now = datetime.now()
+        create_task_file("stale.md", {
+            "title": "Write launch email", "priority": "P1", "status": "s",
+            "category": "writing", "keywords": ["launch", "email"],
+            "updated_date": (now - timedelta(days=30)).isoformat(),
+        })
+        create_task_file("overdue.md", {
+            "title": "Fix login bug", "priority": "P0", "status": "b",
+            "category": "technical", "keywords": ["auth", "bug"],
+            "due_date": (now - timedelta(days=3)).date(),
+        })
+        create_task_file("done.md", {
+            "title": "Fix login page", "priority": "P2", "status": "d",
+            "category": "technical", "keywords": ["auth"],
+        })
+
+    def test_list_tasks_default_fields(self, tasks):
+        """list_tasks returns compact JSON with the markdown fields."""
+        text = call_tool("list_tasks", {"priority": "P1", "format": "json"})
+        assert " " not in text.replace("Write launch email", "")
+        assert json.loads(text) == {
+            "count": 1,
+            "tasks": [{
+                "file": "stale.md", "title": "Write launch email",
+                "priority": "P1", "status": "s", "category": "writing",
+            }],
+            "next_cursor": None,
+        }
+
+    def test_field_projection(self, tasks):
+        """Only the requested fields are returned, with dates as ISO strings."""
+        payload = json.loads(call_tool("find_overdue_tasks", {
+            "format": "json", "fields": ["file", "due_date", "days_overdue"],
+        }))
+        due = (datetime.now() - timedelta(days=3)).date().isoformat()
+        assert payload["tasks"] == [{"file": "overdue.md", "due_date": due, "days_overdue": 3}]
+
+    def test_unknown_field(self, tasks):
+        """Unknown fields are reported instead of silently dropped."""
+        text = call_tool("list_tasks", {"format": "json", "fields": ["title", "owner"]})
+        assert text.startswith("Unknown fields: owner.")
+
+    def test_summary_sections(self, tasks):
+        """get_task_summary projects whole sections."""
+        payload = json.loads(call_tool("get_task_summary", {"format": "json"}))
+        assert payload["total"] == 3
+        assert payload["priority"]["P0"] == {"count": 1, "cap": 3}
+        assert payload["status"] == {"n": 0, "s": 1, "b": 1, "d": 1}
+        payload = json.loads(call_tool("get_task_summary", {"format": "json", "fields": ["category"]}))
+        assert payload == {"category": {"technical": 2, "writing": 1}}
+
+    def test_stale_tasks(self, tasks):
+        """find_stale_tasks reports days since the last update."""
+        payload = json.loads(call_tool("find_stale_tasks", {"format": "json"}))
+        assert payload["count"] == 1
+        assert payload["tasks"][0]["file"] == "stale.md"
+        assert payload["tasks"][0]["days_since_update"] == 30
+
+    def test_check_duplicates(self, tasks):
+        """check_duplicates returns matches with suggestion codes."""
+        payload = json.loads(call_tool("check_duplicates", {
+            "title": "Fix login bug", "keywords": ["auth", "bug"], "category": "technical",
+            "format": "json", "fields": ["file", "shared_keywords", "suggestion"],
+        }))
+        assert payload["count"] == len(payload["matches"]) >= 1
+        assert payload["matches"][0] == {
+            "file": "overdue.md", "shared_keywords": ["auth", "bug"], "suggestion": "unblock",
+        }
+
+    def test_markdown_unchanged(self, tasks):
+        """Markdown stays the default output."""
+        text = call_tool("find_overdue_tasks", {})
+        assert text.startswith("Found 1 overdue tasks:\n\n- **Fix login bug** (overdue.md)\n")
+
+
+class TestPagination:
+    """Test limit/cursor/sort_by on the task listing tools."""
+
+    @pytest.fixture
+    def tasks(self, mock_project_dirs: Path, create_task_file):
+        """Create 7 tasks with mixed priorities and due dates, two undated."""
+        today = datetime.now().date()
+        for i, priority in enumerate(["P2", "P0", "P3", "P1", "P0", "P2", "P1"]):
+            frontmatter = {"title": f"Task {i}", "priority": priority, "status": "n"}
+            if i < 5:
+                frontmatter["due_date"] = today - timedelta(days=10 - (i % 3))
+            create_task_file(f"task-{i}.md", frontmatter)
+
+    @staticmethod
+    def pages(name: str, arguments: dict) -> list[list[str]]:
+        """Follow cursors to the end and return the filenames of each page."""
+        pages = []
+        cursor = None
+        while True:
+            args = dict(arguments, format="json", fields=["file"])
+            if cursor:
+                args["cursor"] = cursor
+            payload = json.loads(call_tool(name, args))
+            pages.append([t["file"] for t in payload["tasks"]])
+            cursor = payload["next_cursor"]
+            if cursor is None:
+                return pages
+
+    @pytest.mark.parametrize("sort_by", ["file", "priority", "due_date", "updated_date"])
+    def test_pages_cover_full_order(self, tasks, sort_by):
+        """Paging returns the unpaged order in bounded chunks."""
+        full = self.pages("list_tasks", {"sort_by": sort_by})
+        assert len(full) == 1 and len(full[0]) == 7
+        pages = self.pages("list_tasks", {"sort_by": sort_by, "limit": 3})
+        assert [len(p) for p in pages] == [3, 3, 1]
+        assert sum(pages, []) == full[0]
+
+    def test_sort_orders(self, tasks):
+        """Priority sorts P0 first; dates oldest first with undated tasks last."""
+        by_priority = self.pages("list_tasks", {"sort_by": "priority"})[0]
+        assert by_priority == [
+            "task-1.md", "task-4.md", "task-3.md", "task-6.md",
+            "task-0.md", "task-5.md", "task-2.md",
+        ]
+        by_due = self.pages("list_tasks", {"sort_by": "due_date"})[0]
+        assert by_due == [
+            "task-0.md", "task-3.md", "task-1.md", "task-4.md",
+            "task-2.md", "task-5.md", "task-6.md",
+        ]
+
+    def test_cursor_stable_across_edits(self, tasks, create_task_file):
+        """Tasks added before the cursor do not shift the next page."""
+        first = json.loads(call_tool("list_tasks", {"limit": 3, "format": "json"}))
+        create_task_file("task-00.md", {"title": "Early", "priority": "P1", "status": "n"})
+        second = json.loads(call_tool("list_tasks", {
+            "limit": 3, "cursor": first["next_cursor"], "format": "json",
+        }))
+        assert [t["file"] for t in second["tasks"]] == ["task-3.md", "task-4.md", "task-5.md"]
+
+    def test_overdue_pages(self, tasks):
+        """find_overdue_tasks pages in due date order by default."""
+        pages = self.pages("find_overdue_tasks", {"limit": 2})
+        assert pages == [["task-0.md", "task-3.md"], ["task-1.md", "task-4.md"], ["task-2.md"]]
+
+    def test_markdown_next_cursor(self, tasks):
+        """Markdown output reports the total and how to fetch the next page."""
+        text = call_tool("list_tasks", {"limit": 2})
+        assert text.startswith("Found 7 tasks:")
+        assert text.count("- **") == 2
+        assert "Pass cursor=" in text
+
+    @pytest.mark.parametrize("arguments,error", [
+        ({"cursor": "not-a-cursor"}, "Invalid cursor"),
+        ({"limit": 0}, "limit must be a positive integer"),
+        ({"sort_by": "title"}, "Invalid sort_by"),
+    ])
+    def test_invalid_arguments(self, tasks, arguments, error):
+        """Bad paging arguments are reported."""
+        assert call_tool("list_tasks", arguments).startswith(error)
+
+    def test_cursor_tied_to_sort(self, tasks):
+        """A cursor cannot be reused with a different sort order."""
+        cursor = json.loads(call_tool("list_tasks", {"limit": 2, "format": "json"}))["next_cursor"]
+        text = call_tool("list_tasks", {"cursor": cursor, "sort_by": "priority"})
+        assert text.startswith("Cursor was created with sort_by=file")
+
+
+class TestAtomicWrites:
+    """Test atomic task writes and journaled batches."""
+
+    @pytest.fixture
+    def fsync_calls(self, monkeypatch):
+        """Count fsync calls made by the journal."""
+        import task_journal
+
+        calls = []
+        real_fsync = task_journal.os.fsync
+        monkeypatch.setattr(task_journal.os, "fsync", lambda fd: calls.append(fd) or real_fsync(fd))
+        return calls
+
+    def test_write_leaves_no_temp_files(self, mock_project_dirs: Path, create_task_file):
+        """Rewrites replace the file whole and clean up after themselves."""
+        task_path = create_task_file("task.md", {"title": "Old", "priority": "P2"}, "Old body.")
+        write_task_file(task_path, {"title": "New", "priority": "P1"}, "New body.")
+        assert sorted(p.name for p in task_path.parent.iterdir()) == ["task.md"]
+        assert get_task_by_file("task.md")["title"] == "New"
+
+    def test_batch_applies_writes_and_deletes(self, mock_project_dirs: Path, create_task_file, fsync_calls):
+        """A batch is applied together, syncing each written file and the directory once."""
+        from task_store import TaskBatch
+
+        tasks_dir = mock_project_dirs / "tasks"
+        create_task_file("old.md", {"title": "Old", "priority": "P2"})
+        assert get_task_by_file("old.md") is not None
+
+        with TaskBatch(tasks_dir) as batch:
+            for i in range(10):
+                batch.write(tasks_dir / f"new-{i}.md", {"title": f"New {i}", "priority": "P3"}, "Body.")
+            batch.delete(tasks_dir / "old.md")
+
+        assert get_task_by_file("old.md") is None
+        assert len(get_all_tasks()) == 10
+        assert not list(tasks_dir.glob(".journal*"))
+        assert len(fsync_calls) <= 10 + 3
+
+    def test_batch_synced_before_journal_removed(self, mock_project_dirs: Path, monkeypatch):
+        """Applied files reach the disk while the journal can still replay them."""
+        import task_journal
+        from task_store import TaskBatch
+
+        tasks_dir = mock_project_dirs / "tasks"
+        journals_at_fsync = []
+        real_fsync = task_journal.os.fsync
+        monkeypatch.setattr(
+            task_journal.os, "fsync",
+            lambda fd: journals_at_fsync.append(list(tasks_dir.glob(".journal-*"))) or real_fsync(fd),
+        )
+        with TaskBatch(tasks_dir) as batch:
+            batch.write(tasks_dir / "new.md", {"title": "New"}, "Body.")
+
+        # The new file and then the directory are synced before the journal goes
+        assert [len(journals) for journals in journals_at_fsync[-2:]] == [1, 1]
+        assert not list(tasks_dir.glob(".journal*"))
+
+    def test_recover_skips_live_writers(self, mock_project_dirs: Path):
+        """Journals and temp files of running processes are not touched."""
+        import subprocess
+        from task_journal import recover
+
+        tasks_dir = mock_project_dirs / "tasks"
+        dead = subprocess.Popen([sys.executable, "-c", ""])
+        dead.wait()
+        record = json.dumps({"version": 1, "entries": [["new.md", "---\ntitle: New\n---\n"]]})
+        live_journal = tasks_dir / f".journal-{time.time_ns():020d}-{os.getppid()}-00ff00ff-0"
+        live_journal.write_text(record)
+        live_temp = tasks_dir / f".other.md.{os.getppid()}-00ff00ff.tmp"
+        live_temp.write_text("partial")
+        (tasks_dir / f".journal-{time.time_ns():020d}-{dead.pid}-00ff00ff-0").write_text(record)
+        (tasks_dir / f".new.md.{dead.pid}-00ff00ff.tmp").write_text("partial")
+
+        assert recover(tasks_dir) == ["new.md"]
+        assert sorted(p.name for p in tasks_dir.iterdir()) == sorted([live_journal.name, live_temp.name, "new.md"])
+
+    def test_failed_batch_writes_nothing(self, mock_project_dirs: Path):
+        """An exception inside the block discards the batch."""
+        from task_store import TaskBatch
+
+        tasks_dir = mock_project_dirs / "tasks"
+        with pytest.raises(RuntimeError):
+            with TaskBatch(tasks_dir) as batch:
+                batch.write(tasks_dir / "new.md", {"title": "New"}, "")
+                raise RuntimeError("interrupted")
+        assert list(tasks_dir.iterdir()) == []
+
+    def test_interrupted_batch_replayed(self, mock_project_dirs: Path, create_task_file, monkeypatch):
+        """Journals left by a crash are finished in order when the store is next opened."""
+        import task_store
+        from task_journal import recover
+
+        tasks_dir = mock_project_dirs / "tasks"
+        create_task_file("gone.md", {"title": "Gone"})
+        (tasks_dir / "new.md").write_text("---\ntitle: Trun")
+        (tasks_dir / ".new.md.tmp").write_text("partial")
+        (tasks_dir / ".journal-1").write_text(json.dumps({
+            "version": 1,
+            "entries": [["new.md", "---\ntitle: Newer\n---\n\nBody.\n"], ["gone.md", None]],
+        }))
+        (tasks_dir / ".journal-2").write_text(json.dumps({
+            "version": 1,
+            "entries": [["new.md", "---\ntitle: New\n---\n\nBody.\n"]],
+        }))
+
+        monkeypatch.setattr(task_store, "_stores", {})
+        assert [t.file for t in get_all_tasks()] == ["new.md"]
+        assert get_task_by_file("new.md")["title"] == "New"
+        assert sorted(p.name for p in tasks_dir.iterdir() if p.name != ".index.sqlite") == ["new.md"]
+        assert recover(tasks_dir) == []
+
+    def test_process_backlog_single_batch(self, mock_project_dirs: Path, fsync_calls):
+        """process_backlog commits every created task in one batch."""
+        (mock_project_dirs / "BACKLOG.md").write_text(
+            "# Backlog\n\n"
+            "- Implement OAuth login flow for the API\n"
+            "- Write blog post about the product launch\n"
+            "- Fix database connection pooling bug\n"
+            "- Schedule quarterly planning meeting with design\n"
+        )
+        text = call_tool("process_backlog", {"auto_create": True})
+        created = re.findall(r"✓ Created (\S+)", text)
+        assert len(created) >= 2
+        assert sorted(t.file for t in get_all_tasks()) == sorted(created)
+        assert len(fsync_calls) <= len(created) + 3
+
+    def test_prune_deletes_in_one_batch(self, mock_project_dirs: Path, create_task_file, fsync_calls):
+        """prune_completed_tasks removes all old done tasks together."""
+        old = (datetime.now() - timedelta(days=120)).isoformat()
+        for i in range(5):
+            create_task_file(f"done-{i}.md", {"title": f"Done {i}", "status": "d", "updated_date": old})
+        create_task_file("open.md", {"title": "Open", "status": "n"})
+
+        text = call_tool("prune_completed_tasks", {})
+        assert "Deleting 5 completed tasks" in text
+        assert [t.file for t in get_all_tasks()] == ["open.md"]
+        assert len(fsync_calls) <= 3
+
+
+class TestConcurrentCalls:
+    """Test tool calls running off the event loop under per-file locks."""
+
+    @pytest.fixture
+    def calls(self, monkeypatch):
+        """Replace tool bodies with a 0.1s sleep that records when it ran."""
+        spans = []
+
+        def slow_tool(name, arguments):
+            start = time.monotonic()
+            time.sleep(0.1)
+            spans.append((arguments.get("filename"), start, time.monotonic()))
+            return []
+
+        monkeypatch.setattr(server, "handle_tool", slow_tool)
+        return spans
+
+    @staticmethod
+    def run_concurrently(*calls) -> None:
+        async def gather():
+            await asyncio.gather(*(server.call_tool(name, args) for name, args in calls))
+        asyncio.run(gather())
+
+    @staticmethod
+    def overlapping(spans) -> bool:
+        spans = sorted(spans, key=lambda span: span[1])
+        return any(b[1] < a[2] for a, b in zip(spans, spans[1:]))
+
+    def test_read_only_tools_run_together(self, calls):
+        """Reads do not wait for each other or block the event loop."""
+        self.run_concurrently(*[("list_tasks", {})] * 5)
+        assert len(calls) == 5
+        assert self.overlapping(calls)
+
+    def test_same_file_writes_serialized(self, calls):
+        """Two updates of one task never run at the same time."""
+        self.run_concurrently(
+            ("update_task_status", {"filename": "a.md", "status": "s"}),
+            ("update_task_status", {"filename": "a.md", "status": "d"}),
+        )
+        assert not self.overlapping(calls)
+
+    def test_different_file_writes_run_together(self, calls):
+        """Updates of different tasks are not serialized."""
+        self.run_concurrently(
+            ("update_task_status", {"filename": "a.md", "status": "s"}),
+            ("update_task_status", {"filename": "b.md", "status": "s"}),
+        )
+        assert self.overlapping(calls)
+
+    def test_directory_lock_excludes_file_writes(self, calls):
+        """Pruning waits for, and holds off, single-task writes."""
+        self.run_concurrently(
+            ("update_task_status", {"filename": "a.md", "status": "s"}),
+            ("prune_completed_tasks", {}),
+            ("update_task_status", {"filename": "b.md", "status": "s"}),
+        )
+        prune = next(span for span in calls if span[0] is None)
+        others = [span for span in calls if span[0] is not None]
+        assert all(not self.overlapping([prune, other]) for other in others)
+
+    def test_bulk_update_locks_directory(self, calls):
+        """A bulk update holds off every other write, not only those to its tasks."""
+        self.run_concurrently(
+            ("bulk_update_tasks", {"updates": [{"filename": "a.md", "status": "s"}, {"filename": "b.md", "status": "d"}]}),
+            ("update_task_status", {"filename": "b.md", "status": "s"}),
+        )
+        assert not self.overlapping(calls)
+        calls.clear()
+        self.run_concurrently(
+            ("bulk_update_tasks", {"updates": [{"filename": "a.md", "status": "s"}]}),
+            ("update_task_status", {"filename": "c.md", "status": "s"}),
+        )
+        assert not self.overlapping(calls)
+
+    def test_concurrent_bulk_updates_on_disjoint_files(self, mock_project_dirs: Path, create_task_file):
+        """Bulk updates of different tasks all commit and leave no journal behind."""
+        groups = [f"g{n}" for n in range(8)]
+        for group in groups:
+            for i in range(3):
+                create_task_file(f"{group}-{i}.md", {"title": f"{group} {i}", "priority": "P3", "status": "n"}, "")
+
+        async def gather():
+            return await asyncio.gather(*(
+                server.call_tool("bulk_update_tasks", {
+                    "updates": [{"filename": f"{group}-{i}.md", "status": "s"} for i in range(3)],
+                })
+                for _ in range(3)
+                for group in groups
+            ))
+
+        results = asyncio.run(gather())
+        assert all(result[0].text.startswith("Updated") for result in results)
+        assert {task.status for task in get_all_tasks()} == {"s"}
+        assert not list((mock_project_dirs / "tasks").glob(".journal*"))
+
+    def test_priority_caps_hold_under_concurrency(self, mock_project_dirs: Path):
+        """Concurrent creates cannot overshoot a priority cap."""
+        self.run_concurrently(*[
+            ("create_task", {"title": f"Urgent task {i}", "priority": "P0", "body": "Now."})
+            for i in range(6)
+        ])
+        assert get_task_store(mock_project_dirs / "tasks").count("priority", "P0") == 3
+
+
+class TestParallelScan:
+    """Test parallel frontmatter parsing during scans."""
+
+    @staticmethod
+    def snapshot(store) -> list[tuple]:
+        return [
+            (t.file, t.title, t.priority, t.status, t.category, t.keywords, t.due, t.created, t.updated)
+            for t in store.all()
+        ]
+
+    @pytest.mark.parametrize("mode", ["threads", "processes"])
+    def test_same_records_as_serial(self, mock_project_dirs: Path, create_task_file, monkeypatch, mode):
+        """Parallel scans build the same index, in the same order, as serial ones."""
+        import task_store
+        from task_store import TaskStore
+
+        monkeypatch.setattr(task_store, "PARALLEL_SCAN_MIN_FILES", 1)
+        now = datetime.now()
+        for i in range(30):
+            create_task_file(f"task-{(i * 7) % 30:02d}.md", {
+                "title": f"Task {i}", "priority": f"P{i % 4}", "status": "nsbd"[i % 4],
+                "keywords": ["api", f"k{i % 3}"],
+                "updated_date": (now - timedelta(days=i)).isoformat(),
+            })
+        tasks_dir = mock_project_dirs / "tasks"
+
+        serial = TaskStore(tasks_dir)
+        parallel = TaskStore(tasks_dir)
+        parallel.configure_scan(mode, workers=2)
+        try:
+            assert self.snapshot(parallel) == self.snapshot(serial)
+            assert [t.file for t in parallel.date_range("updated_date")] == \
+                [t.file for t in serial.date_range("updated_date")]
+
+            create_task_file("task-05.md", {"title": "Changed", "priority": "P0"})
+            assert self.snapshot(parallel) == self.snapshot(serial)
+        finally:
+            parallel.configure_scan("serial")
+
+    def test_invalid_mode(self, mock_project_dirs: Path):
+        """Unknown scan modes are rejected."""
+        from task_store import TaskStore
+
+        with pytest.raises(ValueError, match="Invalid scan mode"):
+            TaskStore(mock_project_dirs / "tasks").configure_scan("gpu")
+
+
+class TestTaskWatcher:
+    """Test the filesystem watcher feeding the task store."""
+
+    @pytest.fixture(params=[True, False], ids=["inotify", "polling"])
+    def watcher(self, request, mock_project_dirs: Path):
+        """Run a watcher over the temp tasks dir for the duration of a test."""
+        from task_watcher import start_task_watcher
+
+        watcher = start_task_watcher(
+            mock_project_dirs / "tasks",
+            debounce=0.01,
+            poll_interval=0.05,
+            use_inotify=request.param,
+        )
+        yield watcher
+        watcher.stop()
+
+    @staticmethod
+    def wait_for(predicate, timeout: float = 2.0) -> bool:
+        import time
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if predicate():
+                return True
+            time.sleep(0.01)
+        return False
+
+    def test_external_edits_applied(self, watcher, create_task_file):
+        """Files created and deleted behind the server's back show up."""
+        path = create_task_file("external.md", {"title": "External", "priority": "P2", "status": "n"})
+        assert self.wait_for(lambda: [t["file"] for t in get_all_tasks()] == ["external.md"])
+
+        path.unlink()
+        assert self.wait_for(lambda: get_all_tasks() == [])
+
+    def test_reads_do_not_rescan(self, watcher, monkeypatch):
+        """While watching, reads never walk the directory."""
+        if watcher.mode == "polling":
+            pytest.skip("polling rescans on its own thread")
+        scans = []
+        monkeypatch.setattr(watcher.store, "rescan", lambda: scans.append(1))
+
+        get_all_tasks()
+        get_task_store(watcher.store.tasks_dir).find(priority="P1")
+        assert scans == []
+
+    def test_server_writes_visible_immediately(self, watcher, mock_project_dirs: Path):
+        """Writes made through the server do not wait for the watcher."""
+        task_file = mock_project_dirs / "tasks" / "own.md"
+        write_task_file(task_file, {"title": "Own", "priority": "P1", "status": "n"}, "")
+        assert [t["file"] for t in get_all_tasks()] == ["own.md"]
+
+
+class TestTaskCatalog:
+    """Test the persistent SQLite catalog."""
+
+    @pytest.fixture
+    def fresh_store(self, mock_project_dirs: Path):
+        """Build stores the way a newly started server process would."""
+        from task_catalog import CATALOG_FILENAME, TaskCatalog
+        from task_store import TaskStore
+
+        tasks_dir = mock_project_dirs / "tasks"
+
+        def _fresh_store():
+            return TaskStore(tasks_dir, TaskCatalog(tasks_dir / CATALOG_FILENAME))
+
+        return _fresh_store
+
+    def test_cold_start_skips_parsing(self, fresh_store, create_task_file, monkeypatch):
+        """A new process hydrates unchanged tasks from the catalog."""
+        import task_store
+
+        create_task_file("a.md", {"title": "A", "priority": "P1", "status": "s",
+                                  "keywords": ["auth"], "due_date": "2030-01-01"}, "Body A")
+        create_task_file("b.md", {"title": "B", "priority": "P2", "status": "n"}, "Body B")
+        first = fresh_store().all()
+
+        def fail_parse(file_path):
+            raise AssertionError(f"{file_path.name} should come from the catalog")
+
+        monkeypatch.setattr(task_store, "read_task_metadata", fail_parse)
+        second = fresh_store().all()
+
+        assert [t["title"] for t in second] == ["A", "B"]
+        assert second[0].keywords == ("auth",)
+        assert second[0]["due_date"] == "2030-01-01"
+        assert second[0]["body"] == first[0]["body"] == "Body A"
+
+    def test_dates_survive_the_catalog(self, fresh_store, mock_project_dirs: Path):
+        """Tasks hydrated from the catalog hold the same date values as parsed ones."""
+        (mock_project_dirs / "tasks" / "dated.md").write_text(
+            "---\ntitle: Dated\ndue_date: 2030-01-01\ncreated_date: 2026-01-15T10:00:00.123456\n"
+            "updated_date: '2026-02-01'\n---\n\nBody\n"
+        )
+        [cold] = fresh_store().all()
+        [warm] = fresh_store().all()
+
+        for field in ("due_date", "created_date", "updated_date"):
+            assert warm[field] == cold[field]
+            assert type(warm[field]) is type(cold[field])
+        assert isinstance(warm["due_date"], date) and isinstance(warm["updated_date"], str)
+
+    def test_changed_and_deleted_files_reconciled(self, fresh_store, create_task_file):
+        """Files edited or removed between processes are reconciled."""
+        create_task_file("a.md", {"title": "A", "priority": "P1", "status": "n"})
+        gone = create_task_file("b.md", {"title": "B", "priority": "P2", "status": "n"})
+        fresh_store().all()
+
+        create_task_file("a.md", {"title": "A edited", "priority": "P0", "status": "n"})
+        gone.unlink()
+        store = fresh_store()
+
+        assert [t["title"] for t in store.all()] == ["A edited"]
+        assert store.count("priority", "P0") == 1
+        assert list(store.catalog.load()) == ["a.md"]
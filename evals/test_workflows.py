@@ -309,3 +309,133 @@ class TestDeduplication:
                 similar.append((task, similarity))
 
         assert len(similar) == 0
+
+
+class TestBacklogPipeline:
+    """Test the streaming process_backlog pipeline."""
+
+    def test_items_yielded_as_parsed(self):
+        """Each item is yielded once the next one starts, before the rest is read."""
+        read = []
+
+        def lines():
+            for line in ["# Backlog", "## First item", "Some context", "- detail", "## Second item", "More"]:
+                read.append(line)
+                yield line
+
+        items = server.iter_backlog_items(lines())
+        assert next(items) == {"title": "First item", "description": "Some context- detail\n"}
+        assert read[-1] == "## Second item"
+        assert list(items) == [{"title": "Second item", "description": "More"}]
+
+    def test_classification_kinds(self, mock_project_dirs: Path):
+        """Items are classified with the precompiled phrase patterns."""
+        config = load_config()
+        cases = [
+            ({"title": "Pricing research", "description": "https://example.com/pricing"}, "reference"),
+            ({"title": "Standup notes", "description": "- shipped search"}, "notes"),
+            ({"title": "Users complaining about slow loading", "description": ""}, "initiative"),
+            ({"title": "Maybe do something", "description": ""}, "ambiguous"),
+            ({"title": "Fix authentication bug", "description": "JWT tokens expiring"}, "candidate"),
+        ]
+        for item, kind in cases:
+            assert server.classify_backlog_item(item, config)[0] == kind, item["title"]
+
+    def test_summary_matches_fixture(self, load_fixture_file, load_expected_output, mock_project_dirs: Path):
+        """process_backlog reports the expected section counts."""
+        (mock_project_dirs / "BACKLOG.md").write_text(load_fixture_file("test-backlogs/basic.md"))
+        expected = load_expected_output("basic.json")["expected"]
+
+        text = server.handle_tool("process_backlog", {})[0].text
+        assert f"Tasks to Create ({expected['tasks']['count']})" in text
+        assert f"Initiatives Identified ({expected['initiatives']['count']})" in text
+        assert f"References to Save ({expected['references']['count']})" in text
+        assert f"Notes to Archive ({expected['archived']['count']})" in text
+
+    def test_duplicates_checked_in_batches(self, mock_project_dirs: Path, monkeypatch):
+        """Candidates are deduplicated in bounded batches without changing the report."""
+        (mock_project_dirs / "BACKLOG.md").write_text("".join(
+            f"## Fix login bug number {i}\nUsers cannot sign in.\n" for i in range(7)
+        ))
+        full = server.handle_tool("process_backlog", {})[0].text
+
+        batches = []
+        find_similar_tasks = server.find_similar_tasks
+        monkeypatch.setattr(server, "DEDUP_BATCH_SIZE", 3)
+        monkeypatch.setattr(
+            server, "find_similar_tasks",
+            lambda proposed, config: batches.append(len(proposed)) or find_similar_tasks(proposed, config),
+        )
+        assert server.handle_tool("process_backlog", {"force_full": True})[0].text == full
+        assert batches == [3, 3, 1]
+
+    def test_empty_backlog(self, mock_project_dirs: Path):
+        """Whitespace-only backlogs are reported as empty."""
+        (mock_project_dirs / "BACKLOG.md").write_text("\n   \n\n")
+        assert server.handle_tool("process_backlog", {})[0].text == "BACKLOG.md is empty"
+
+
+class TestIncrementalBacklog:
+    """Test that process_backlog only handles items earlier runs have not."""
+
+    @pytest.fixture
+    def backlog(self, mock_project_dirs: Path) -> Path:
+        backlog = mock_project_dirs / "BACKLOG.md"
+        backlog.write_text(
+            "## Fix authentication bug\nJWT tokens expiring early.\n\n"
+            "## Users complaining about slow loading\nSeveral tickets this week.\n"
+        )
+        return backlog
+
+    @staticmethod
+    def process(**arguments) -> str:
+        return server.handle_tool("process_backlog", arguments)[0].text
+
+    def test_appended_items_only(self, backlog: Path):
+        """A second run reports only items added since the first."""
+        assert "**Total items:** 2" in self.process()
+        assert self.process().startswith("No new items in BACKLOG.md (2 already processed)")
+
+        with open(backlog, "a") as f:
+            f.write("\n## Email Sarah about roadmap\nNeed to sync on Q1 planning.\n")
+        text = self.process()
+        assert "**Total items:** 1" in text
+        assert "2 items from earlier runs skipped" in text
+        assert "Email Sarah" in text
+        assert "Fix authentication bug" not in text
+
+    def test_edited_item_reprocessed(self, backlog: Path):
+        """Changing an item's text makes it new again."""
+        self.process()
+        backlog.write_text(backlog.read_text().replace("expiring early", "expiring after 5 minutes"))
+        text = self.process()
+        assert "**Total items:** 1" in text
+        assert "Fix authentication bug" in text
+
+    def test_previewed_tasks_created_later(self, backlog: Path, mock_project_dirs: Path):
+        """auto_create still creates tasks an earlier preview reported."""
+        self.process()
+        text = self.process(auto_create=True)
+        assert "✓ Created fix-authentication-bug.md" in text
+        assert "Initiatives Identified" not in text
+        assert (mock_project_dirs / "tasks" / "fix-authentication-bug.md").exists()
+        assert self.process(auto_create=True).startswith("No new items")
+
+    def test_force_full(self, backlog: Path):
+        """force_full reprocesses every item."""
+        self.process()
+        text = self.process(force_full=True)
+        assert "**Total items:** 2" in text
+        assert "Already processed" not in text
+
+    def test_state_reset(self, backlog: Path, mock_project_dirs: Path):
+        """clear_backlog forgets processed items; a corrupt state file is ignored."""
+        state_file = mock_project_dirs / ".backlog-state.json"
+        self.process()
+        assert state_file.exists()
+
+        state_file.write_text("{not json")
+        assert "**Total items:** 2" in self.process()
+
+        server.handle_tool("clear_backlog", {"archive": False})
+        assert not state_file.exists()
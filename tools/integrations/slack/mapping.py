@@ -17,6 +17,8 @@ from typing import Any
 
 import yaml
 
+from ...project_config import get_project_config
+
 # Cache file location (same directory as this module)
 MAPPINGS_FILE = Path(__file__).parent / "mappings.json"
 
@@ -28,18 +30,15 @@ def is_caching_enabled() -> bool:
     """
     Check if user mapping caching is enabled in config.
 
-    Reads integrations.slack.cache_user_mappings from config.yaml.
+    Reads integrations.slack.cache_user_mappings from config.yaml, which is
+    parsed once and re-read only when it changes.
     Returns True by default if config is missing or malformed.
 
     Returns:
         True if caching is enabled (default), False if explicitly disabled.
     """
-    if not CONFIG_FILE.exists():
-        return True
-
     try:
-        with open(CONFIG_FILE) as f:
-            config = yaml.safe_load(f) or {}
+        config = get_project_config(CONFIG_FILE).load() or {}
         return config.get("integrations", {}).get("slack", {}).get(
             "cache_user_mappings", True
         )
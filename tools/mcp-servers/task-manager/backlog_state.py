@@ -0,0 +1,49 @@
+"""
+Which BACKLOG.md items earlier process_backlog runs already handled.
+
+The state file (.backlog-state.json in the project root) maps a hash of each
+item's title and description to how it was last handled: its classification
+("task", "initiative", "reference", "notes", "ambiguous", "duplicate") or
+"created" once a task was created from it. Editing an item changes its hash,
+so it is processed again. Entries for items no longer in the backlog are
+dropped on the next run, and clear_backlog removes the file.
+
+A missing, unreadable or outdated state file just means every item is new.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+from task_journal import atomic_write
+
+BACKLOG_STATE_FILENAME = ".backlog-state.json"
+STATE_VERSION = 1
+
+# Status of an item whose task has been created
+CREATED = "created"
+
+
+def backlog_item_hash(item: dict) -> str:
+    """Stable hash of a backlog item's content"""
+    content = f"{item['title']}\0{item['description']}"
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def load_backlog_state(path: Path) -> dict[str, str]:
+    """Return item hash -> status recorded by the previous run"""
+    try:
+        data = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != STATE_VERSION:
+        return {}
+    items = data.get("items")
+    return items if isinstance(items, dict) else {}
+
+
+def save_backlog_state(path: Path, items: dict[str, str]) -> None:
+    """Replace the state file with the statuses of the current backlog items"""
+    # Not fsynced: losing the file only means items are processed again
+    content = json.dumps({"version": STATE_VERSION, "items": items}, separators=(",", ":"))
+    atomic_write(path, content, sync=False)
@@ -0,0 +1,64 @@
+"""
+Compiled category keyword matcher for auto-categorization.
+
+config.yaml's `category_keywords` table is compiled once per distinct table:
+keywords are lowercased and de-duplicated across categories, and each keyword
+carries the categories it counts towards. Categorizing a text is then one
+substring search per distinct keyword plus a few additions, instead of
+lowercasing and searching every keyword of every category on every call.
+
+Matching keeps the original semantics: each keyword listed under a category
+adds one hit if it appears anywhere in the text (substring match), and ties
+go to the category listed first.
+"""
+
+from functools import lru_cache
+from typing import Any
+
+
+class CategoryMatcher:
+    """Counts category keyword hits in lowercased text"""
+
+    def __init__(self, category_keywords: dict[str, list[Any]]):
+        self.categories = list(category_keywords)
+        # keyword -> [(category index, occurrences in that category's list)]
+        weights: dict[str, dict[int, int]] = {}
+        for index, keywords in enumerate(category_keywords.values()):
+            for keyword in keywords or ():
+                per_category = weights.setdefault(str(keyword).lower(), {})
+                per_category[index] = per_category.get(index, 0) + 1
+        self._keywords = [(keyword, list(hits.items())) for keyword, hits in weights.items()]
+
+    def counts(self, text: str) -> dict[str, int]:
+        """Return keyword hit counts for categories with at least one hit"""
+        totals = [0] * len(self.categories)
+        for keyword, hits in self._keywords:
+            if keyword in text:
+                for index, weight in hits:
+                    totals[index] += weight
+        return {
+            category: total
+            for category, total in zip(self.categories, totals)
+            if total > 0
+        }
+
+    def categorize(self, text: str) -> str:
+        """Return the category with the most hits in text, or "" if none"""
+        matches = self.counts(text)
+        if matches:
+            return max(matches, key=matches.get)
+        return ""
+
+
+@lru_cache(maxsize=8)
+def _compile(table: tuple[tuple[str, tuple[Any, ...]], ...]) -> CategoryMatcher:
+    return CategoryMatcher({category: list(keywords) for category, keywords in table})
+
+
+def get_category_matcher(category_keywords: dict[str, list[Any]]) -> CategoryMatcher:
+    """Return the compiled matcher for a keyword table, compiling it on first use"""
+    table = tuple(
+        (category, tuple(keywords or ()))
+        for category, keywords in category_keywords.items()
+    )
+    return _compile(table)
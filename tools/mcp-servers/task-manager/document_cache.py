@@ -0,0 +1,432 @@
+"""
+Parsed structure of knowledge and task files, cached by content hash.
+
+Transcripts and archived notes pile up in knowledge/, and agents used to
+re-read them and split them into sections every session. DocumentCache parses
+each file once into its headings, action items, speaker turns and keywords,
+and keeps the result in .document-cache.sqlite at the project root, keyed by
+a hash of the file's bytes:
+
+- A file is only read when its signature changes, as in the search indexes.
+- A file that was read is only parsed when its content has never been seen,
+  so a touched, renamed or copied transcript reuses the stored parse.
+- Parses no file refers to any more are dropped as files change or go away.
+
+Parsing is line based and meant for the markdown this repo produces: `#`
+headings; action items as checkbox bullets, bullets under an "Action items",
+"Next steps", "To do" or "Follow-ups" heading, or lines starting with
+"Action:" or "TODO:"; and speaker turns as lines starting with a capitalized
+name and a colon ("**Priya:** ...", "[00:12] Sam: ..."). Fenced code is
+skipped. Keywords are the most frequent words outside stopwords and speaker
+names.
+"""
+
+import json
+import re
+import sqlite3
+import threading
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from hashlib import blake2b
+from pathlib import Path
+from typing import Optional
+
+from frontmatter import FRONTMATTER_RE, load_frontmatter
+from knowledge_search import ProjectFiles, file_date, frontmatter_date, is_under, normalize_path, parse_day
+from semantic_index import STOPWORDS
+from task_store import FileSignature, TaskStore
+
+DOCUMENT_CACHE_FILENAME = ".document-cache.sqlite"
+# Bump when parsing changes; cached parses are dropped
+SCHEMA_VERSION = 1
+
+KEYWORD_LIMIT = 20
+
+# Conversation filler and section labels that say nothing about a document's subject
+KEYWORD_STOPWORDS = STOPWORDS | frozenset(
+    "yeah yes okay like know think going get got really right well maybe should "
+    "need want one two also much many some more very sure thanks good great "
+    "let lets make made see say said thing things way back still even now came come "
+    "again during action actions item items next steps todo notes".split()
+)
+
+# Line labels that look like speakers but are not
+NOT_SPEAKERS = frozenset({
+    "action", "action item", "action items", "agenda", "attendees", "context", "date",
+    "decision", "decisions", "due", "fyi", "link", "links", "location", "next steps",
+    "note", "notes", "owner", "participants", "status", "subject", "summary", "time",
+    "title", "todo", "update",
+})
+
+_SCHEMA = """
+CREATE TABLE files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    hash TEXT NOT NULL
+);
+CREATE INDEX files_hash ON files (hash);
+CREATE TABLE documents (
+    hash TEXT PRIMARY KEY,
+    parsed TEXT NOT NULL
+);
+"""
+
+_NAME = r"[A-Z][^\W\d_]*(?:[ .'-]{1,2}[A-Z][^\W\d_]*){0,2}"
+_TIMESTAMP = r"\d{1,2}:\d{2}(?::\d{2})?"
+_HEADING_RE = re.compile(r"#{1,6}[ \t]+(.+?)[ \t#]*$")
+_FENCE_RE = re.compile(r"[ \t]*(?:```|~~~)")
+_BULLET_RE = re.compile(r"[ \t]*(?:[-*+]|\d+[.)])[ \t]+(?:\[([ xX])\][ \t]+)?(.*)$")
+_ACTION_HEADING_RE = re.compile(
+    r"\b(?:action items?|actions|next steps|to-?dos?|to do|follow[- ]?ups?)\b", re.IGNORECASE
+)
+_ACTION_PREFIX_RE = re.compile(
+    r"(?:\*\*)?(?:action(?: item)?|todo|follow[- ]?up)s?(?:\*\*)?[ \t]*:(?:\*\*)?[ \t]*", re.IGNORECASE
+)
+_SPEAKER_RE = re.compile(
+    rf"[ \t]*(?:[\[(]?{_TIMESTAMP}[\])]?[ \t]*)?(?:\*\*)?({_NAME})(?:\*\*)?"
+    rf"[ \t]*(?:[\[(]{_TIMESTAMP}[\])][ \t]*)?(?::\*\*|\*\*:|:)[ \t]+(.*)$"
+)
+_MENTION_RE = re.compile(r"@([\w.-]*\w)")
+_OWNER_RE = re.compile(rf"(?:\*\*)?({_NAME})(?:\*\*)?(?:[ \t]*:|[ \t]+(?:to|will|should|owns)\b)")
+_URL_RE = re.compile(r"https?://\S+")
+_WORD_RE = re.compile(r"[^\W\d_]{3,}")
+
+
+@dataclass
+class Heading:
+    # 1-based line of the file
+    line: int
+    level: int
+    text: str
+
+
+@dataclass
+class ActionItem:
+    line: int
+    text: str
+    # @mention or leading name ("Sam to ...", "Priya: ..."), if any
+    owner: Optional[str]
+    # Checked checkbox
+    done: bool
+
+
+@dataclass
+class SpeakerTurn:
+    line: int
+    speaker: str
+    # Words in the turn, continuation lines included
+    words: int
+
+
+@dataclass
+class ParsedDocument:
+    # Frontmatter title or first heading; None if the file has neither
+    title: Optional[str]
+    # Frontmatter date, updated_date or created_date (YYYY-MM-DD), if any
+    date: Optional[str]
+    headings: list[Heading] = field(default_factory=list)
+    action_items: list[ActionItem] = field(default_factory=list)
+    turns: list[SpeakerTurn] = field(default_factory=list)
+    keywords: list[str] = field(default_factory=list)
+
+    def speakers(self) -> list[tuple[str, int, int]]:
+        """(speaker, turns, words) in order of first appearance"""
+        totals: dict[str, list[int]] = {}
+        for turn in self.turns:
+            counts = totals.setdefault(turn.speaker, [0, 0])
+            counts[0] += 1
+            counts[1] += turn.words
+        return [(speaker, turns, words) for speaker, (turns, words) in totals.items()]
+
+
+def _owner(text: str) -> Optional[str]:
+    mention = _MENTION_RE.search(text)
+    if mention:
+        return mention.group(1)
+    match = _OWNER_RE.match(text)
+    if match and match.group(1).lower() not in NOT_SPEAKERS:
+        return match.group(1)
+    return None
+
+
+def _action_item(line: int, text: str, done: bool = False) -> ActionItem:
+    text = text.strip()
+    return ActionItem(line, text, _owner(text), done)
+
+
+def parse_markdown(text: str) -> ParsedDocument:
+    """Parse the headings, action items, speaker turns and keywords of a file's text"""
+    frontmatter: dict = {}
+    body, line = text, 1
+    match = FRONTMATTER_RE.match(text)
+    if match:
+        try:
+            parsed = load_frontmatter(match.group(1))
+        except Exception:
+            # Malformed frontmatter is parsed as text
+            parsed = None
+        if isinstance(parsed, dict):
+            frontmatter = parsed
+            body = match.group(2)
+            line = text.count("\n", 0, match.start(2)) + 1
+
+    title = frontmatter.get("title")
+    document = ParsedDocument(str(title) if title else None, frontmatter_date(frontmatter))
+    words: list[str] = []
+    turn: Optional[SpeakerTurn] = None
+    in_actions = in_fence = False
+
+    for number, raw in enumerate(body.splitlines(), start=line):
+        if _FENCE_RE.match(raw):
+            in_fence = not in_fence
+            continue
+        if in_fence or not raw.strip():
+            continue
+
+        heading = _HEADING_RE.match(raw)
+        if heading:
+            heading_text = heading.group(1)
+            document.headings.append(Heading(number, len(raw) - len(raw.lstrip("#")), heading_text))
+            if document.title is None:
+                document.title = heading_text
+            in_actions = bool(_ACTION_HEADING_RE.search(heading_text))
+            turn = None
+            words += _WORD_RE.findall(heading_text.lower())
+            continue
+
+        content = raw
+        bullet = _BULLET_RE.match(raw)
+        if bullet:
+            checkbox, content = bullet.groups()
+            prefix = _ACTION_PREFIX_RE.match(content)
+            if checkbox is not None:
+                document.action_items.append(_action_item(number, content, checkbox != " "))
+            elif prefix:
+                document.action_items.append(_action_item(number, content[prefix.end():]))
+            elif in_actions:
+                document.action_items.append(_action_item(number, content))
+        else:
+            prefix = _ACTION_PREFIX_RE.match(raw.lstrip())
+            speaker = None if prefix else _SPEAKER_RE.match(raw)
+            if prefix:
+                content = raw.lstrip()[prefix.end():]
+                document.action_items.append(_action_item(number, content))
+            elif speaker and speaker.group(1).lower() in NOT_SPEAKERS:
+                # A labelled line ("Note: ...") is not part of anyone's turn
+                turn = None
+            elif speaker:
+                content = speaker.group(2)
+                turn = SpeakerTurn(number, speaker.group(1), 0)
+                document.turns.append(turn)
+
+        if turn is not None:
+            turn.words += len(content.split())
+        words += _WORD_RE.findall(_URL_RE.sub(" ", content).lower())
+
+    names = {part for turn in document.turns for part in turn.speaker.lower().split()}
+    counts = Counter(word for word in words if word not in KEYWORD_STOPWORDS and word not in names)
+    document.keywords = [word for word, _ in counts.most_common(KEYWORD_LIMIT)]
+    return document
+
+
+def _load(data: str) -> ParsedDocument:
+    fields = json.loads(data)
+    return ParsedDocument(
+        fields["title"],
+        fields["date"],
+        [Heading(**heading) for heading in fields["headings"]],
+        [ActionItem(**item) for item in fields["action_items"]],
+        [SpeakerTurn(**turn) for turn in fields["turns"]],
+        fields["keywords"],
+    )
+
+
+def _dump(document: ParsedDocument) -> str:
+    return json.dumps(asdict(document), separators=(",", ":"))
+
+
+class DocumentCache:
+    """Parsed knowledge and task files, stored by content hash and synced by signature"""
+
+    def __init__(self, path: Path, root: Path):
+        self.path = path
+        self.root = root
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._project_files = ProjectFiles(root)
+        # path -> (signature, content hash) as recorded in the cache
+        self._files: dict[str, tuple[FileSignature, str]] = {}
+        # Parses loaded or made this session, by content hash
+        self._parsed: dict[str, ParsedDocument] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            try:
+                version = conn.execute("PRAGMA user_version").fetchone()[0]
+            except sqlite3.DatabaseError:
+                # Not a database: start over
+                conn.close()
+                self.path.unlink(missing_ok=True)
+                conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+                version = 0
+            if version != SCHEMA_VERSION:
+                conn.executescript("DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS documents;")
+                conn.executescript(_SCHEMA)
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+                conn.commit()
+            self._conn = conn
+            self._files = {
+                path: ((mtime_ns, size, inode), digest)
+                for path, mtime_ns, size, inode, digest in conn.execute(
+                    "SELECT path, mtime_ns, size, inode, hash FROM files"
+                )
+            }
+        return self._conn
+
+    def documents(
+        self, path: Optional[str] = None, store: Optional[TaskStore] = None
+    ) -> dict[str, tuple[FileSignature, ParsedDocument]]:
+        """
+        Return relative path -> (signature, parse) of every file under path
+        (a directory or file relative to the project root; everything if None).
+
+        Files under path are synced first. Task file signatures come from store
+        if given, else from a directory walk.
+        """
+        prefix = normalize_path(path)
+        with self._lock:
+            conn = self._connect()
+            current = self._project_files.scan(store, prefix)
+            known = self._files
+            removed = [
+                file_path for file_path in known
+                if file_path not in current and is_under(file_path, prefix)
+            ]
+            changed = [
+                (file_path, signature)
+                for file_path, signature in current.items()
+                if known.get(file_path, (None, None))[0] != signature
+            ]
+
+            results = {}
+            try:
+                with conn:
+                    orphans = False
+                    # New paths first, so a renamed file finds its old parse
+                    for file_path, signature in changed:
+                        try:
+                            data = (self.root / file_path).read_bytes()
+                        except OSError:
+                            # Gone since the scan; dropped on the next sync
+                            continue
+                        digest = blake2b(data, digest_size=16).hexdigest()
+                        if file_path in known:
+                            orphans = orphans or known[file_path][1] != digest
+                        self._store(conn, digest, data)
+                        conn.execute(
+                            "INSERT OR REPLACE INTO files (path, mtime_ns, size, inode, hash) VALUES (?, ?, ?, ?, ?)",
+                            (file_path, *signature, digest),
+                        )
+                        known[file_path] = (signature, digest)
+                    for file_path in removed:
+                        conn.execute("DELETE FROM files WHERE path = ?", (file_path,))
+                        del known[file_path]
+                        orphans = True
+                    if orphans:
+                        conn.execute("DELETE FROM documents WHERE hash NOT IN (SELECT hash FROM files)")
+                        referenced = {digest for _, digest in known.values()}
+                        self._parsed = {
+                            digest: document for digest, document in self._parsed.items() if digest in referenced
+                        }
+
+                    for file_path in current:
+                        if file_path in known:
+                            signature, digest = known[file_path]
+                            results[file_path] = (signature, self._parse_for(conn, digest))
+            except sqlite3.Error:
+                # The transaction was rolled back; reload what the file holds next time
+                self._close()
+                raise
+            return results
+
+    def _store(self, conn: sqlite3.Connection, digest: str, data: bytes) -> None:
+        """Parse and store content unless a parse of it exists"""
+        if digest in self._parsed:
+            return
+        if conn.execute("SELECT 1 FROM documents WHERE hash = ?", (digest,)).fetchone():
+            return
+        document = parse_markdown(data.decode("utf-8", "replace"))
+        conn.execute("INSERT INTO documents (hash, parsed) VALUES (?, ?)", (digest, _dump(document)))
+        self._parsed[digest] = document
+
+    def _parse_for(self, conn: sqlite3.Connection, digest: str) -> ParsedDocument:
+        document = self._parsed.get(digest)
+        if document is None:
+            row = conn.execute("SELECT parsed FROM documents WHERE hash = ?", (digest,)).fetchone()
+            document = self._parsed[digest] = _load(row[0])
+        return document
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        self._files = {}
+        self._parsed = {}
+        self._project_files.reset()
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+
+_caches: dict[Path, DocumentCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_document_cache(root: Path) -> DocumentCache:
+    """Return the shared document cache for a project root"""
+    with _caches_lock:
+        cache = _caches.get(root)
+        if cache is None:
+            cache = _caches[root] = DocumentCache(root / DOCUMENT_CACHE_FILENAME, root)
+        return cache
+
+
+@dataclass
+class DocumentOutline:
+    # Relative to the project root, with forward slashes
+    path: str
+    # Parsed title, else the file name without suffix
+    title: str
+    # YYYY-MM-DD, as for search_knowledge
+    date: str
+    document: ParsedDocument
+
+
+def outline_documents(
+    root: Path,
+    path: Optional[str] = None,
+    store: Optional[TaskStore] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    limit: int = 20,
+) -> tuple[int, list[DocumentOutline]]:
+    """
+    Return the number of files under path dated within since..until and the
+    newest `limit` of them, parsed through the project's document cache.
+
+    Raises ValueError for a since or until that is not a date.
+    """
+    since = parse_day(since, "since")
+    until = parse_day(until, "until")
+    outlines = []
+    for file_path, (signature, document) in get_document_cache(root).documents(path, store).items():
+        name = file_path.rsplit("/", 1)[-1]
+        day = file_date(name, document.date, signature[0])
+        if (since is None or day >= since) and (until is None or day <= until):
+            outlines.append(DocumentOutline(file_path, document.title or Path(name).stem, day, document))
+    outlines.sort(key=lambda outline: (outline.date, outline.path), reverse=True)
+    return len(outlines), outlines[:limit]
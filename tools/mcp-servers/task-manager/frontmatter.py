@@ -0,0 +1,205 @@
+"""
+Frontmatter parsing for task files.
+
+YAML parsing dominates the cost of loading tasks, so the read path avoids the
+pure-Python PyYAML loader where it can:
+
+- A restricted parser handles the flat schema that write_task_file emits
+  (scalar fields, quoted strings, block lists of scalars, dates). It returns
+  exactly what YAML would for that subset and is several times faster than
+  even the libyaml loader.
+- Anything outside that schema goes through CSafeLoader when PyYAML is built
+  against libyaml, and yaml.safe_load otherwise.
+
+read_frontmatter() stops reading at the closing `---`, for callers that do not
+need the markdown body.
+"""
+
+import re
+from datetime import date
+from pathlib import Path
+from typing import Any, Optional
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as _CSafeLoader
+except ImportError:
+    _CSafeLoader = None
+
+# YAML frontmatter between --- delimiters
+FRONTMATTER_RE = re.compile(r"^---\s*\n(.*?)\n---\s*\n(.*)$", re.DOTALL)
+
+# YAML only allows spaces for indentation and after ":" or "-"; lines with
+# tabs there are left to the full parser
+_KEY_RE = re.compile(r"([A-Za-z_][A-Za-z0-9_-]*):(?:[ ]+(.*))?$")
+_ITEM_RE = re.compile(r" *-(?:[ ]+(.*))?$")
+_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}$")
+_INT_RE = re.compile(r"[-+]?(?:0|[1-9][0-9]*)$")
+
+# First characters that make a plain scalar anything but a simple string
+_INDICATORS = frozenset("[]{}&*!|>%@`#,?:-'\"")
+
+_BOOLS = {
+    "yes": True, "true": True, "on": True,
+    "no": False, "false": False, "off": False,
+}
+
+_resolver = yaml.resolver.Resolver()
+_STR_TAG = "tag:yaml.org,2002:str"
+_NOT_FLAT = object()
+
+
+def _flat_scalar(raw: str) -> Any:
+    """Parse one scalar of the flat schema, or return _NOT_FLAT"""
+    raw = raw.rstrip()
+    if not raw:
+        return None
+
+    first = raw[0]
+    if first == "'":
+        inner = raw[1:-1]
+        if len(raw) < 2 or raw[-1] != "'" or "'" in inner.replace("''", ""):
+            return _NOT_FLAT
+        return inner.replace("''", "'")
+    if first == '"':
+        inner = raw[1:-1]
+        if len(raw) < 2 or raw[-1] != '"' or "\\" in inner or '"' in inner:
+            return _NOT_FLAT
+        return inner
+    if raw == "[]":
+        return []
+    if raw == "{}":
+        return {}
+    if first in _INDICATORS or ": " in raw or " #" in raw or raw.endswith(":") or "\t" in raw:
+        return _NOT_FLAT
+
+    tag = _resolver.resolve(yaml.ScalarNode, raw, (True, False))
+    if tag == _STR_TAG:
+        return raw
+    if tag == "tag:yaml.org,2002:timestamp" and _DATE_RE.match(raw):
+        return date.fromisoformat(raw)
+    if tag == "tag:yaml.org,2002:int" and _INT_RE.match(raw):
+        return int(raw)
+    if tag == "tag:yaml.org,2002:bool":
+        return _BOOLS[raw.lower()]
+    if tag == "tag:yaml.org,2002:null":
+        return None
+    return _NOT_FLAT
+
+
+def parse_flat_frontmatter(text: str) -> Optional[dict]:
+    """
+    Parse frontmatter restricted to top-level scalars and lists of scalars.
+
+    Returns None when the text uses anything outside that schema, so the
+    caller can fall back to a full YAML parser.
+    """
+    result: dict = {}
+    open_key: Optional[str] = None
+    item_indent: Optional[int] = None
+
+    for line in text.split("\n"):
+        if not line.strip():
+            continue
+
+        if line[0] in " \t-":
+            item = _ITEM_RE.match(line)
+            if open_key is None or item is None:
+                return None
+            indent = len(line) - len(line.lstrip(" "))
+            if item_indent is None:
+                item_indent = indent
+            elif indent != item_indent:
+                return None
+            value = _flat_scalar(item.group(1) or "")
+            if value is _NOT_FLAT:
+                return None
+            if result[open_key] is None:
+                result[open_key] = []
+            result[open_key].append(value)
+            continue
+
+        match = _KEY_RE.match(line)
+        if match is None:
+            return None
+        key, raw = match.groups()
+        if _resolver.resolve(yaml.ScalarNode, key, (True, False)) != _STR_TAG:
+            return None
+        item_indent = None
+        if raw is None or not raw.strip():
+            # Either null or the start of a block list
+            result[key] = None
+            open_key = key
+            continue
+
+        value = _flat_scalar(raw)
+        if value is _NOT_FLAT:
+            return None
+        result[key] = value
+        open_key = None
+
+    return result
+
+
+def load_frontmatter(text: str) -> dict:
+    """Parse frontmatter text, raising yaml.YAMLError if it is invalid"""
+    flat = parse_flat_frontmatter(text)
+    if flat is not None:
+        return flat
+    if _CSafeLoader is not None:
+        return yaml.load(text, Loader=_CSafeLoader) or {}
+    return yaml.safe_load(text) or {}
+
+
+def parse_yaml_frontmatter(file_path: Path) -> tuple[dict, str]:
+    """Parse YAML frontmatter and markdown body from a task file"""
+    if not file_path.exists():
+        return {}, ""
+
+    with open(file_path, "r") as f:
+        content = f.read()
+
+    match = FRONTMATTER_RE.match(content)
+    if not match:
+        return {}, content
+
+    frontmatter_str, body = match.groups()
+    try:
+        frontmatter = load_frontmatter(frontmatter_str)
+    except yaml.YAMLError:
+        frontmatter = {}
+
+    if not isinstance(frontmatter, dict):
+        frontmatter = {}
+
+    return frontmatter, body.strip()
+
+
+def read_frontmatter(file_path: Path) -> dict:
+    """Parse only the frontmatter of a task file, without reading the body"""
+    lines = []
+    with open(file_path, "r") as f:
+        if f.readline().rstrip() != "---":
+            return {}
+        for line in f:
+            if line.rstrip() == "---":
+                break
+            lines.append(line)
+        else:
+            return {}
+
+    try:
+        frontmatter = load_frontmatter("".join(lines))
+    except yaml.YAMLError:
+        return {}
+    return frontmatter if isinstance(frontmatter, dict) else {}
+
+
+def read_task_body(file_path: Path) -> str:
+    """Read only the markdown body of a task file, skipping YAML parsing"""
+    with open(file_path, "r") as f:
+        content = f.read()
+
+    match = FRONTMATTER_RE.match(content)
+    return match.group(2).strip() if match else content
@@ -0,0 +1,487 @@
+"""
+Full-text search over the knowledge base and task files.
+
+Workflows used to find context by walking knowledge/ (transcripts, notes,
+initiatives, specs) and reading every file. KnowledgeIndex keeps an SQLite
+FTS5 table of every markdown or text file under knowledge/ and tasks/ in
+.knowledge-index.sqlite at the project root, ranked with BM25 (title above
+file name above body).
+
+The index is synced before each search. knowledge/ is walked with stat calls
+only; task files are taken from the task store, so with the watcher on they
+cost nothing to check. Files whose signature changed are read and re-indexed,
+deleted files are dropped, and unchanged files are never opened.
+
+Each file has a date for filtering: a YYYY-MM-DD prefix of its name (the
+convention for transcripts and notes), else its frontmatter `date`,
+`updated_date` or `created_date`, else its modification time.
+
+Results carry the paragraph that matches the most query words, with the line
+it starts on, so an agent can quote or open the passage without reading the
+whole file.
+"""
+
+import os
+import re
+import sqlite3
+import sys
+import threading
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Iterator, Optional
+
+from frontmatter import FRONTMATTER_RE, load_frontmatter
+from task_search import highlight_pattern, make_snippet, match_expression, query_words
+from task_store import FileSignature, TaskStore, file_signature, parse_date
+
+KNOWLEDGE_INDEX_FILENAME = ".knowledge-index.sqlite"
+SCHEMA_VERSION = 1
+
+# Directories under the project root that are indexed
+KNOWLEDGE_DIR = "knowledge"
+TASKS_DIR = "tasks"
+INDEXED_SUFFIXES = (".md", ".markdown", ".txt")
+
+# BM25 column weights: title, file name, body
+TITLE_WEIGHT = 10.0
+NAME_WEIGHT = 5.0
+BODY_WEIGHT = 1.0
+
+# Longest paragraph snippet, in words
+PARAGRAPH_WORDS = 60
+
+_SCHEMA = f"""
+CREATE TABLE files (
+    doc INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    body_line INTEGER NOT NULL
+);
+CREATE INDEX files_date ON files (date);
+CREATE VIRTUAL TABLE knowledge_text USING fts5(
+    title, name, body,
+    tokenize = 'porter unicode61'
+);
+INSERT INTO knowledge_text (knowledge_text, rank)
+    VALUES ('rank', 'bm25({TITLE_WEIGHT}, {NAME_WEIGHT}, {BODY_WEIGHT})');
+"""
+
+_COLUMNS = ("title", "name", "body")
+_NAME_DATE_RE = re.compile(r"(\d{4}-\d{2}-\d{2})")
+_HEADING_RE = re.compile(r"^#{1,6}[ \t]+(.+?)[ \t#]*$", re.MULTILINE)
+_PARAGRAPH_BREAK_RE = re.compile(r"\n[ \t]*\n")
+
+
+@dataclass
+class KnowledgeHit:
+    # Relative to the project root, with forward slashes
+    path: str
+    title: str
+    # YYYY-MM-DD
+    date: str
+    # Higher is better (negated BM25)
+    score: float
+    # 1-based line where the snippet's paragraph starts
+    line: int
+    # Best matching paragraph, matches wrapped in **
+    snippet: str
+
+
+@dataclass
+class Document:
+    title: str
+    body: str
+    date: str
+    # 1-based line of the file where body starts
+    body_line: int
+
+
+def _is_indexed(name: str) -> bool:
+    return not name.startswith(".") and name.endswith(INDEXED_SUFFIXES)
+
+
+def _walk(directory: Path, prefix: str) -> Iterator[tuple[str, FileSignature]]:
+    """Yield (relative path, signature) of indexed files below directory"""
+    try:
+        with os.scandir(directory) as it:
+            entries = list(it)
+    except (FileNotFoundError, NotADirectoryError, PermissionError):
+        return
+    for entry in entries:
+        if entry.name.startswith("."):
+            continue
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _walk(Path(entry.path), f"{prefix}{entry.name}/")
+            elif _is_indexed(entry.name) and entry.is_file():
+                yield f"{prefix}{entry.name}", file_signature(entry.stat())
+        except FileNotFoundError:
+            continue
+
+
+def frontmatter_date(frontmatter: dict) -> Optional[str]:
+    """The first of date, updated_date and created_date that parses, as YYYY-MM-DD"""
+    for field in ("date", "updated_date", "created_date"):
+        parsed = parse_date(frontmatter.get(field))
+        if parsed is not None:
+            return parsed.date().isoformat()
+    return None
+
+
+def file_date(name: str, day: Optional[str], mtime_ns: int) -> str:
+    """
+    Date of a file: the YYYY-MM-DD prefix of its name, else day (from its
+    frontmatter), else its modification time.
+    """
+    match = _NAME_DATE_RE.match(name)
+    if match:
+        try:
+            return date.fromisoformat(match.group(1)).isoformat()
+        except ValueError:
+            pass
+    if day is not None:
+        return day
+    return datetime.fromtimestamp(mtime_ns / 1e9).date().isoformat()
+
+
+def read_document(path: Path, mtime_ns: int) -> Document:
+    """Read a knowledge or task file into its indexed parts"""
+    return parse_document(path, path.read_text(encoding="utf-8", errors="replace"), mtime_ns)
+
+
+def parse_document(path: Path, text: str, mtime_ns: int) -> Document:
+    """Split the text of a knowledge or task file into its indexed parts"""
+    frontmatter: dict = {}
+    body, body_line = text, 1
+    match = FRONTMATTER_RE.match(text)
+    if match:
+        try:
+            parsed = load_frontmatter(match.group(1))
+        except Exception:
+            # Malformed frontmatter is indexed as text
+            parsed = None
+        if isinstance(parsed, dict):
+            frontmatter = parsed
+            body = match.group(2)
+            body_line = text.count("\n", 0, match.start(2)) + 1
+
+    title = frontmatter.get("title")
+    if not title:
+        heading = _HEADING_RE.search(body)
+        title = heading.group(1) if heading else path.stem
+    return Document(str(title), body, file_date(path.name, frontmatter_date(frontmatter), mtime_ns), body_line)
+
+
+def best_paragraph(text: str, words: list[str]) -> Optional[tuple[int, str]]:
+    """
+    Return the offset and text of the paragraph of text matching the most
+    distinct query words (then the most matches), or None if none matches.
+    """
+    breaks = list(_PARAGRAPH_BREAK_RE.finditer(text))
+    ends = [match.end() for match in breaks]
+    # paragraph index -> (distinct words, matches)
+    counts: dict[int, tuple[set[str], int]] = {}
+    for match in highlight_pattern(tuple(words)).finditer(text):
+        paragraph = bisect_right(ends, match.start())
+        seen, total = counts.get(paragraph, (set(), 0))
+        seen.add(match.group().lower())
+        counts[paragraph] = (seen, total + 1)
+    if not counts:
+        return None
+
+    best = max(counts, key=lambda i: (len(counts[i][0]), counts[i][1], -i))
+    start = ends[best - 1] if best else 0
+    end = breaks[best].start() if best < len(breaks) else len(text)
+    paragraph = text[start:end]
+    stripped = paragraph.lstrip()
+    return start + len(paragraph) - len(stripped), stripped.rstrip()
+
+
+def parse_day(value: Optional[str], name: str) -> Optional[str]:
+    """Normalize an optional YYYY-MM-DD argument, raising ValueError naming it if invalid"""
+    if value is None:
+        return None
+    try:
+        return date.fromisoformat(value).isoformat()
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a date (YYYY-MM-DD)") from None
+
+
+def normalize_path(path: Optional[str]) -> Optional[str]:
+    if path is None:
+        return None
+    normalized = path.replace("\\", "/").strip("/")
+    while normalized.startswith("./"):
+        normalized = normalized[2:]
+    return normalized or None
+
+
+def is_under(path: str, prefix: Optional[str]) -> bool:
+    """Whether a relative path is prefix or lies below it; everything is under None"""
+    return prefix is None or path == prefix or path.startswith(prefix + "/")
+
+
+def _within(directory: str, prefix: Optional[str]) -> bool:
+    """Whether files under prefix can lie in directory"""
+    return is_under(prefix, directory) if prefix is not None else True
+
+
+class ProjectFiles:
+    """
+    Signatures of the indexable files of a project: a stat-only walk of
+    knowledge/, and task files from the task store when there is one.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._store_version: Optional[int] = None
+        self._task_signatures: dict[str, FileSignature] = {}
+
+    def scan(self, store: Optional[TaskStore] = None, prefix: Optional[str] = None) -> dict[str, FileSignature]:
+        """
+        Return relative path -> signature of every indexable file, or of the
+        ones under prefix (a normalized relative path) without looking
+        anywhere else.
+        """
+        files: dict[str, FileSignature] = {}
+        if _within(KNOWLEDGE_DIR, prefix):
+            start = prefix if prefix and prefix != KNOWLEDGE_DIR else KNOWLEDGE_DIR
+            files.update(_walk(self.root / start, f"{start}/"))
+            if not files and start != KNOWLEDGE_DIR and _is_indexed(start.rsplit("/", 1)[-1]):
+                # prefix names a single file
+                try:
+                    stat = os.stat(self.root / start)
+                except OSError:
+                    pass
+                else:
+                    files[start] = file_signature(stat)
+        if not _within(TASKS_DIR, prefix):
+            return files
+        if store is None:
+            tasks = dict(_walk(self.root / TASKS_DIR, f"{TASKS_DIR}/"))
+        else:
+            version, entries = store.snapshot(since=self._store_version)
+            if entries is not None:
+                self._task_signatures = {
+                    f"{TASKS_DIR}/{filename}": signature for filename, (signature, _) in entries.items()
+                }
+                self._store_version = version
+            tasks = self._task_signatures
+        if prefix is None or prefix == TASKS_DIR:
+            files.update(tasks)
+        else:
+            files.update((path, signature) for path, signature in tasks.items() if is_under(path, prefix))
+        return files
+
+    def reset(self) -> None:
+        """Forget the task store state, so the next scan copies it again"""
+        self._store_version = None
+        self._task_signatures = {}
+
+
+class KnowledgeIndex:
+    """FTS5 index of knowledge and task files, synced by file signature"""
+
+    def __init__(self, path: Path, root: Path):
+        self.path = path
+        self.root = root
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # path -> (doc id, signature) as recorded in the index
+        self._docs: Optional[dict[str, tuple[int, FileSignature]]] = None
+        self._files = ProjectFiles(root)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            try:
+                version = conn.execute("PRAGMA user_version").fetchone()[0]
+            except sqlite3.DatabaseError:
+                # Not a database: start over
+                conn.close()
+                self.path.unlink(missing_ok=True)
+                conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+                version = 0
+            if version != SCHEMA_VERSION:
+                conn.executescript("DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS knowledge_text;")
+                conn.executescript(_SCHEMA)
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+                conn.commit()
+            self._conn = conn
+            self._docs = {
+                path: (doc, (mtime_ns, size, inode))
+                for doc, path, mtime_ns, size, inode in conn.execute(
+                    "SELECT doc, path, mtime_ns, size, inode FROM files"
+                )
+            }
+        return self._conn
+
+    def sync(self, store: Optional[TaskStore] = None) -> int:
+        """
+        Re-index knowledge and task files that changed since the last sync.
+
+        Task file signatures come from store if given, else from a directory
+        walk. Returns the number of files (re)indexed or removed.
+        """
+        with self._lock:
+            conn = self._connect()
+            current = self._files.scan(store)
+
+            docs = self._docs
+            changed = [
+                (path, signature)
+                for path, signature in current.items()
+                if docs.get(path, (None, None))[1] != signature
+            ]
+            removed = [path for path in docs if path not in current]
+
+            try:
+                with conn:
+                    for path in removed:
+                        self._remove(conn, path)
+                    for path, signature in changed:
+                        try:
+                            document = read_document(self.root / path, signature[0])
+                        except OSError:
+                            # Gone since the walk; dropped now, or on the next sync
+                            if path in docs:
+                                self._remove(conn, path)
+                            continue
+                        self._index(conn, path, signature, document)
+            except sqlite3.Error:
+                # The transaction was rolled back; reload what the file holds next time
+                self._close()
+                raise
+            return len(changed) + len(removed)
+
+    def _remove(self, conn: sqlite3.Connection, path: str) -> None:
+        doc, _ = self._docs.pop(path)
+        conn.execute("DELETE FROM knowledge_text WHERE rowid = ?", (doc,))
+        conn.execute("DELETE FROM files WHERE doc = ?", (doc,))
+
+    def _index(self, conn: sqlite3.Connection, path: str, signature: FileSignature, document: Document) -> None:
+        known = self._docs.get(path)
+        if known is None:
+            doc = conn.execute(
+                "INSERT INTO files (path, mtime_ns, size, inode, date, body_line) VALUES (?, ?, ?, ?, ?, ?)",
+                (path, *signature, document.date, document.body_line),
+            ).lastrowid
+        else:
+            doc = known[0]
+            conn.execute("DELETE FROM knowledge_text WHERE rowid = ?", (doc,))
+            conn.execute(
+                "UPDATE files SET mtime_ns = ?, size = ?, inode = ?, date = ?, body_line = ? WHERE doc = ?",
+                (*signature, document.date, document.body_line, doc),
+            )
+        # A file changing between the stat and the read is indexed under the
+        # older signature and simply re-read on the next sync
+        name = Path(path).stem
+        conn.execute(
+            "INSERT INTO knowledge_text (rowid, title, name, body) VALUES (?, ?, ?, ?)",
+            (doc, document.title, name, document.body),
+        )
+        self._docs[path] = (doc, signature)
+
+    def search(
+        self,
+        query: str,
+        path: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 20,
+    ) -> tuple[int, list[KnowledgeHit]]:
+        """
+        Return the number of matching files and the best `limit` of them.
+
+        path restricts results to a file or directory (relative to the project
+        root); since and until are inclusive YYYY-MM-DD bounds on file dates.
+        Raises ValueError for a query without words or a malformed date.
+        """
+        expression = match_expression(query, columns=_COLUMNS)
+        words = query_words(query)
+        conditions, parameters = ["knowledge_text MATCH ?"], [expression]
+        prefix = normalize_path(path)
+        if prefix is not None:
+            conditions.append("(files.path = ? OR substr(files.path, 1, ?) = ?)")
+            parameters += [prefix, len(prefix) + 1, prefix + "/"]
+        for bound, operator, name in ((since, ">=", "since"), (until, "<=", "until")):
+            day = parse_day(bound, name)
+            if day is not None:
+                conditions.append(f"files.date {operator} ?")
+                parameters.append(day)
+        where = " AND ".join(conditions)
+        source = "knowledge_text JOIN files ON files.doc = knowledge_text.rowid"
+
+        with self._lock:
+            conn = self._connect()
+            if len(conditions) == 1:
+                total = conn.execute(
+                    "SELECT count(*) FROM knowledge_text WHERE knowledge_text MATCH ?", (expression,)
+                ).fetchone()[0]
+            else:
+                total = conn.execute(f"SELECT count(*) FROM {source} WHERE {where}", parameters).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT files.path, files.date, files.body_line, rank, title, body "
+                f"FROM {source} WHERE {where} ORDER BY rank LIMIT ?",
+                (*parameters, limit),
+            ).fetchall()
+
+        hits = []
+        for file_path, day, body_line, rank, title, body in rows:
+            paragraph = best_paragraph(body, words)
+            if paragraph is None:
+                line, snippet = 1, make_snippet(title, words) or make_snippet(Path(file_path).stem, words)
+            else:
+                offset, text = paragraph
+                line = body_line + body.count("\n", 0, offset)
+                snippet = make_snippet(text, words, PARAGRAPH_WORDS)
+            hits.append(KnowledgeHit(file_path, title, day, round(-rank, 4), line, snippet))
+        return total, hits
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        self._docs = None
+        self._files.reset()
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+
+_indexes: dict[Path, KnowledgeIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_knowledge_index(root: Path) -> KnowledgeIndex:
+    """Return the shared knowledge index for a project root"""
+    with _indexes_lock:
+        index = _indexes.get(root)
+        if index is None:
+            index = _indexes[root] = KnowledgeIndex(root / KNOWLEDGE_INDEX_FILENAME, root)
+        return index
+
+
+def search_knowledge(
+    root: Path,
+    query: str,
+    store: Optional[TaskStore] = None,
+    path: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    limit: int = 20,
+) -> tuple[int, list[KnowledgeHit]]:
+    """Sync the knowledge index of the project at root and run a query against it"""
+    index = get_knowledge_index(root)
+    try:
+        index.sync(store)
+    except sqlite3.Error as e:
+        # Searching a slightly stale index beats failing the call
+        print(f"Knowledge index not updated ({index.path}): {e}", file=sys.stderr)
+    return index.search(query, path, since, until, limit)
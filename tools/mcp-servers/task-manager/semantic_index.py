@@ -0,0 +1,608 @@
+"""
+Similarity search over the knowledge base and task files.
+
+search_knowledge only finds files containing every query word. This index
+ranks passages by how much they have in common with the query, so
+"customers cancelling after onboarding" still finds a paragraph about churn
+during the onboarding flow that never uses "cancelling".
+
+Vectors are hashed bag-of-n-grams, computed offline on the CPU with no model
+or extra dependency: each non-stopword, its character trigrams and each word
+bigram is hashed to one of DIMENSIONS signed buckets, weighted by 1 + log(tf)
+and L2-normalized. Shared words, word pieces ("onboard"/"onboarding") and
+phrases all raise the cosine similarity; synonyms with no letters in common
+do not.
+
+Files are split into chunks of a few paragraphs (CHUNK_WORDS words or
+more), each prefixed with the file's title. Vectors are float32 rows of
+.semantic-index.vectors at the project root, memory-mapped for queries;
+.semantic-index.sqlite records which file and line each row belongs to.
+
+Search is approximate, in two stages. Every vector also has a one-byte-per-
+dimension quantized code (.semantic-index.codes), held in memory by
+dimension. The query is quantized to small integer weights, and the codes of
+the dimensions it uses are combined with big-integer arithmetic that scores
+every chunk at once in C (see _approximate_scores). Only the best few hundred
+chunks are then scored exactly against the float32 rows. Sign-bit sketches
+were tried first and missed half of the true top 10 at 10,000 tasks; the
+quantized scan finds all of them in a few milliseconds.
+
+The index is synced before each search like the full-text indexes. Files are
+re-read only when their signature changes, and re-embedded only when their
+content hash changes. A changed chunk is written to a free row, and the rows
+it replaces are reused by later syncs, so the vector file never holds a row
+the metadata does not account for. Both files are safe to delete.
+"""
+
+import heapq
+import math
+import mmap
+import os
+import re
+import sqlite3
+import sys
+import threading
+from array import array
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+from hashlib import blake2b
+from itertools import compress
+from operator import mul
+from pathlib import Path
+from typing import Optional
+from zlib import crc32
+
+from knowledge_search import Document, ProjectFiles, normalize_path, parse_document
+from task_store import FileSignature, TaskStore
+
+SEMANTIC_INDEX_FILENAME = ".semantic-index.sqlite"
+VECTORS_SUFFIX = ".vectors"
+CODES_SUFFIX = ".codes"
+# Bump when the embedding or chunking changes; the index is rebuilt
+SCHEMA_VERSION = 1
+
+DIMENSIONS = 1024
+ROW_BYTES = DIMENSIONS * 4
+
+# Quantized codes: value v is stored as round(v * CODE_SCALE) + ZERO_CODE,
+# clipped, which is exact to about 0.002 for |v| <= 0.25
+ZERO_CODE = 128
+CODE_SCALE = 127 / 0.25
+
+# A chunk is closed once it has at least this many words
+CHUNK_WORDS = 120
+PREVIEW_CHARS = 280
+
+# Weight of a word's trigrams (as a whole, by L2 norm) relative to the word
+# itself, and of a bigram
+TRIGRAM_WEIGHT = 1.0
+BIGRAM_WEIGHT = 0.5
+WORD_CACHE_SIZE = 100_000
+
+# Chunks scored exactly per query: at least MIN_CANDIDATES, or
+# CANDIDATES_PER_RESULT per requested result
+MIN_CANDIDATES = 128
+CANDIDATES_PER_RESULT = 8
+
+# Hash collisions and common trigrams ("ing") alone give unrelated text a
+# similarity of up to about 0.13
+MIN_SIMILARITY = 0.15
+
+STOPWORDS = frozenset(
+    "a about after all also an and any are as at be been but by can could did do does for "
+    "from had has have he her him his how i if in into is it its just me my no not of on or "
+    "our out she so than that the their them then there these they this to too up us was we "
+    "were what when where which who will with would you your".split()
+)
+
+_SCHEMA = """
+CREATE TABLE files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    title TEXT NOT NULL
+);
+CREATE TABLE chunks (
+    row INTEGER PRIMARY KEY,
+    file INTEGER NOT NULL,
+    line INTEGER NOT NULL,
+    preview TEXT NOT NULL
+);
+CREATE INDEX chunks_file ON chunks (file);
+"""
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+_PARAGRAPH_BREAK_RE = re.compile(r"\n[ \t]*\n")
+_SPACE_RE = re.compile(r"\s+")
+
+
+@dataclass
+class SemanticHit:
+    # Relative to the project root, with forward slashes
+    path: str
+    title: str
+    # Cosine similarity of the best chunk, 0 to 1
+    score: float
+    # 1-based line where the best chunk starts
+    line: int
+    # Start of the best chunk
+    snippet: str
+
+
+def _hashed(feature: str) -> tuple[int, float]:
+    """Bucket and sign of a feature; crc32 is stable across processes, unlike hash()"""
+    h = crc32(feature.encode("utf-8"))
+    return h % DIMENSIONS, 1.0 if h & 0x80000000 else -1.0
+
+
+@lru_cache(maxsize=WORD_CACHE_SIZE)
+def _word_features(word: str) -> tuple[tuple[int, float], ...]:
+    """(bucket, value) contributions of one occurrence of a word"""
+    features: dict[int, float] = defaultdict(float)
+    bucket, sign = _hashed("w " + word)
+    features[bucket] += sign
+    padded = f"<{word}>"
+    grams = [padded[i:i + 3] for i in range(len(padded) - 2)]
+    for gram in grams:
+        bucket, sign = _hashed("t " + gram)
+        features[bucket] += sign * TRIGRAM_WEIGHT / math.sqrt(len(grams))
+    return tuple(features.items())
+
+
+def embed(text: str) -> Optional[array]:
+    """Unit-length float32 vector of text, or None if it has no words but stopwords"""
+    words = [word for word in _TOKEN_RE.findall(text.lower()) if word not in STOPWORDS]
+    if not words:
+        return None
+    vector = [0.0] * DIMENSIONS
+    for word, count in Counter(words).items():
+        weight = 1.0 + math.log(count)
+        for bucket, value in _word_features(word):
+            vector[bucket] += weight * value
+    for (first, second), count in Counter(zip(words, words[1:])).items():
+        bucket, sign = _hashed(f"b {first} {second}")
+        vector[bucket] += sign * BIGRAM_WEIGHT * (1.0 + math.log(count))
+    norm = math.sqrt(sum(x * x for x in vector))
+    if norm == 0:
+        return None
+    return array("f", [x / norm for x in vector])
+
+
+def quantize(vector: array) -> bytes:
+    """One byte per dimension: 128 + value * CODE_SCALE, clipped to 1..255"""
+    return bytes(min(255, max(1, round(x * CODE_SCALE) + ZERO_CODE)) for x in vector)
+
+
+def query_weights(vector: array) -> list[tuple[int, int]]:
+    """(dimension, integer weight) of a query, the weights' magnitudes summing to at most 255"""
+    total = sum(abs(x) for x in vector)
+    weights = [(dimension, int(x / total * 255)) for dimension, x in enumerate(vector)]
+    return [(dimension, weight) for dimension, weight in weights if weight]
+
+
+@lru_cache(maxsize=256)
+def _at_least(threshold: int) -> bytes:
+    """Translation table mapping bytes >= threshold to 1 and the rest to 0"""
+    return bytes(value >= threshold for value in range(256))
+
+
+def chunk_document(document: Document) -> list[tuple[int, str]]:
+    """
+    Split a document body into (line, text) runs of whole paragraphs.
+
+    A heading repeating the title is left out; every chunk is embedded with
+    the title anyway.
+    """
+    body = document.body
+    title_heading = f"# {document.title}"
+    chunks = []
+    start, words, position = None, 0, 0
+    ends = [(match.start(), match.end()) for match in _PARAGRAPH_BREAK_RE.finditer(body)]
+    ends.append((len(body), len(body)))
+    for end, next_start in ends:
+        paragraph = body[position:end]
+        if paragraph.strip() and paragraph.strip() != title_heading:
+            if start is None:
+                start = position + len(paragraph) - len(paragraph.lstrip())
+            words += len(paragraph.split())
+            if words >= CHUNK_WORDS:
+                chunks.append((start, end))
+                start, words = None, 0
+        position = next_start
+    if start is not None:
+        chunks.append((start, len(body)))
+    return [
+        (document.body_line + body.count("\n", 0, chunk_start), body[chunk_start:chunk_end].strip())
+        for chunk_start, chunk_end in chunks
+    ]
+
+
+def _preview(text: str) -> str:
+    text = _SPACE_RE.sub(" ", text).strip()
+    if len(text) <= PREVIEW_CHARS:
+        return text
+    return text[:PREVIEW_CHARS].rsplit(" ", 1)[0] + "…"
+
+
+class SemanticIndex:
+    """Hashed n-gram vectors of knowledge and task file chunks, with a quantized scan"""
+
+    def __init__(self, path: Path, root: Path):
+        self.path = path
+        self.vectors_path = path.with_suffix(VECTORS_SUFFIX)
+        self.codes_path = path.with_suffix(CODES_SUFFIX)
+        self.root = root
+        self._lock = threading.Lock()
+        self._project_files = ProjectFiles(root)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._vectors_fd: Optional[int] = None
+        self._codes_fd: Optional[int] = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._matrix: Optional[memoryview] = None
+        # Rows the vector and code files hold
+        self._capacity = 0
+        # Codes by dimension: _columns[d][row] is dimension d of the row's code
+        self._columns: list[bytearray] = []
+        # path -> (file id, signature, content hash)
+        self._files: dict[str, tuple[int, FileSignature, str]] = {}
+        # row -> file id
+        self._chunks: dict[int, int] = {}
+        self._file_rows: dict[int, list[int]] = defaultdict(list)
+        # Live rows in order; None when stale
+        self._live: Optional[list[int]] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is not None:
+            return self._conn
+        conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+        except sqlite3.DatabaseError:
+            # Not a database: start over
+            conn.close()
+            self.path.unlink(missing_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            version = 0
+        vectors_fd = os.open(self.vectors_path, os.O_RDWR | os.O_CREAT, 0o644)
+        codes_fd = os.open(self.codes_path, os.O_RDWR | os.O_CREAT, 0o644)
+        capacity = os.fstat(vectors_fd).st_size // ROW_BYTES
+        if version == SCHEMA_VERSION:
+            last_row = conn.execute("SELECT max(row) FROM chunks").fetchone()[0]
+            if os.fstat(codes_fd).st_size // DIMENSIONS != capacity or (
+                last_row is not None and last_row >= capacity
+            ):
+                # The row files lost rows the metadata points to
+                version = 0
+        if version != SCHEMA_VERSION:
+            conn.executescript("DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS chunks;")
+            conn.executescript(_SCHEMA)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.commit()
+            os.ftruncate(vectors_fd, 0)
+            os.ftruncate(codes_fd, 0)
+            capacity = 0
+
+        self._conn, self._vectors_fd, self._codes_fd = conn, vectors_fd, codes_fd
+        self._files = {
+            path: (file_id, (mtime_ns, size, inode), digest)
+            for file_id, path, mtime_ns, size, inode, digest in conn.execute(
+                "SELECT id, path, mtime_ns, size, inode, hash FROM files"
+            )
+        }
+        for row, file_id in conn.execute("SELECT row, file FROM chunks"):
+            self._chunks[row] = file_id
+            self._file_rows[file_id].append(row)
+
+        # Transposed with one strided slice per dimension
+        codes = os.pread(codes_fd, capacity * DIMENSIONS, 0)
+        self._columns = [bytearray(codes[d::DIMENSIONS]) for d in range(DIMENSIONS)]
+        self._capacity = capacity
+        for row in set(range(capacity)) - self._chunks.keys():
+            self._clear_code(row)
+        self._map()
+        return conn
+
+    def _map(self) -> None:
+        """(Re)map the vector file after it grew"""
+        if self._matrix is not None:
+            self._matrix.release()
+            self._mmap.close()
+            self._matrix = self._mmap = None
+        if self._capacity:
+            self._mmap = mmap.mmap(self._vectors_fd, self._capacity * ROW_BYTES, access=mmap.ACCESS_READ)
+            self._matrix = memoryview(self._mmap).cast("f")
+
+    def _clear_code(self, row: int) -> None:
+        """Give a free row the code of a zero vector, which no positive match ranks below"""
+        for column in self._columns:
+            column[row] = ZERO_CODE
+
+    def _write_row(self, row: int, vector: array) -> None:
+        code = quantize(vector)
+        os.pwrite(self._vectors_fd, vector.tobytes(), row * ROW_BYTES)
+        os.pwrite(self._codes_fd, code, row * DIMENSIONS)
+        if row >= len(self._columns[0]):
+            padding = bytes([ZERO_CODE]) * (row + 1 - len(self._columns[0]))
+            for column in self._columns:
+                column.extend(padding)
+        for column, value in zip(self._columns, code):
+            column[row] = value
+
+    def sync(self, store: Optional[TaskStore] = None) -> int:
+        """
+        Re-embed knowledge and task files whose content changed since the last sync.
+
+        Task file signatures come from store if given, else from a directory
+        walk. Returns the number of files re-embedded or removed.
+        """
+        with self._lock:
+            conn = self._connect()
+            current = self._project_files.scan(store)
+            known = self._files
+            removed = [path for path in known if path not in current]
+            changed = [
+                (path, signature)
+                for path, signature in current.items()
+                if path not in known or known[path][1] != signature
+            ]
+            if not removed and not changed:
+                return 0
+
+            # Rows freed during this sync are only reused by the next one, so a
+            # crash before the commit leaves every committed row intact
+            free = sorted(set(range(self._capacity)) - self._chunks.keys(), reverse=True)
+            next_row = self._capacity
+            count = len(removed)
+            try:
+                with conn:
+                    for path in removed:
+                        self._remove(conn, path)
+                    for path, signature in changed:
+                        try:
+                            data = (self.root / path).read_bytes()
+                        except OSError:
+                            # Gone since the scan; dropped now, or on the next sync
+                            if path in known:
+                                self._remove(conn, path)
+                                count += 1
+                            continue
+                        digest = blake2b(data, digest_size=16).hexdigest()
+                        if path in known and known[path][2] == digest:
+                            # Touched or rewritten with the same content
+                            file_id = known[path][0]
+                            conn.execute(
+                                "UPDATE files SET mtime_ns = ?, size = ?, inode = ? WHERE id = ?",
+                                (*signature, file_id),
+                            )
+                            known[path] = (file_id, signature, digest)
+                            continue
+
+                        document = parse_document(self.root / path, data.decode("utf-8", "replace"), signature[0])
+                        file_id = self._store_file(conn, path, signature, digest, document.title)
+                        for line, text in chunk_document(document) or [(1, document.title)]:
+                            vector = embed(f"{document.title}\n{text}")
+                            if vector is None:
+                                continue
+                            if free:
+                                row = free.pop()
+                            else:
+                                row, next_row = next_row, next_row + 1
+                            self._write_row(row, vector)
+                            conn.execute(
+                                "INSERT INTO chunks (row, file, line, preview) VALUES (?, ?, ?, ?)",
+                                (row, file_id, line, _preview(text)),
+                            )
+                            self._chunks[row] = file_id
+                            self._file_rows[file_id].append(row)
+                        count += 1
+            except (sqlite3.Error, OSError):
+                # The transaction was rolled back; reload what the files hold next time
+                self._close()
+                raise
+
+            self._live = None
+            if next_row > self._capacity:
+                self._capacity = next_row
+                self._map()
+            return count
+
+    def _store_file(
+        self, conn: sqlite3.Connection, path: str, signature: FileSignature, digest: str, title: str
+    ) -> int:
+        """Insert or update a file's row, dropping its old chunks; returns its id"""
+        known = self._files.get(path)
+        if known is None:
+            file_id = conn.execute(
+                "INSERT INTO files (path, mtime_ns, size, inode, hash, title) VALUES (?, ?, ?, ?, ?, ?)",
+                (path, *signature, digest, title),
+            ).lastrowid
+        else:
+            file_id = known[0]
+            conn.execute(
+                "UPDATE files SET mtime_ns = ?, size = ?, inode = ?, hash = ?, title = ? WHERE id = ?",
+                (*signature, digest, title, file_id),
+            )
+            self._drop_chunks(conn, file_id)
+        self._files[path] = (file_id, signature, digest)
+        return file_id
+
+    def _drop_chunks(self, conn: sqlite3.Connection, file_id: int) -> None:
+        conn.execute("DELETE FROM chunks WHERE file = ?", (file_id,))
+        for row in self._file_rows.pop(file_id, ()):
+            del self._chunks[row]
+            self._clear_code(row)
+
+    def _remove(self, conn: sqlite3.Connection, path: str) -> None:
+        file_id = self._files.pop(path)[0]
+        self._drop_chunks(conn, file_id)
+        conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    def _rows_under(self, prefix: Optional[str]) -> list[int]:
+        """Live rows, limited to files under prefix"""
+        if self._live is None:
+            self._live = sorted(self._chunks)
+        if prefix is None:
+            return self._live
+        allowed = {
+            file_id
+            for path, (file_id, _, _) in self._files.items()
+            if path == prefix or path.startswith(prefix + "/")
+        }
+        return [row for row in self._live if self._chunks[row] in allowed]
+
+    def _approximate_scores(self, weights: list[tuple[int, int]]) -> bytes:
+        """
+        Dot products of the quantized query with every row's code, as
+        little-endian 16-bit integers.
+
+        Each column of codes is spread into 16-bit lanes of one big integer, so
+        scaling and summing columns computes every row at once in C. A negative
+        weight adds (255 - code) instead, keeping lanes non-negative; with the
+        weights summing to at most 255, no lane overflows into the next.
+        """
+        n = self._capacity
+        lanes = bytearray(2 * n)
+        positive = negative = negative_weight = 0
+        for dimension, weight in weights:
+            lanes[::2] = self._columns[dimension]
+            column = int.from_bytes(lanes, "little")
+            if weight > 0:
+                positive += weight * column
+            else:
+                negative += -weight * column
+                negative_weight -= weight
+        offset = int.from_bytes((negative_weight * 255).to_bytes(2, "little") * n, "little")
+        return (positive + offset - negative).to_bytes(2 * n, "little")
+
+    def _candidates(self, rows: list[int], count: int, weights: list[tuple[int, int]], everything: bool) -> list[int]:
+        """The `count` rows of rows with the highest approximate scores"""
+        raw = self._approximate_scores(weights)
+        scores = array("H")
+        scores.frombytes(raw)
+        if sys.byteorder == "big":
+            scores.byteswap()
+        if not everything:
+            return heapq.nlargest(count, rows, key=scores.__getitem__)
+
+        # Narrow down on the high byte of each score first, all in C
+        high = raw[1::2]
+        threshold, total = max(high, default=0), 0
+        while True:
+            total += high.count(threshold)
+            if total >= count or threshold == 0:
+                break
+            threshold -= 1
+        selected = [
+            row for row in compress(range(self._capacity), high.translate(_at_least(threshold)))
+            if row in self._chunks
+        ]
+        if len(selected) > count:
+            selected = heapq.nlargest(count, selected, key=scores.__getitem__)
+        return selected
+
+    def search(self, query: str, path: Optional[str] = None, limit: int = 10) -> list[SemanticHit]:
+        """
+        Return the files with the chunks closest to query, best first.
+
+        path restricts results to a file or directory (relative to the project
+        root). Raises ValueError for a query without words but stopwords.
+        """
+        vector = embed(query)
+        if vector is None:
+            raise ValueError("Search query must contain at least one word that is not a stopword")
+        weights = query_weights(vector)
+
+        with self._lock:
+            conn = self._connect()
+            prefix = normalize_path(path)
+            rows = self._rows_under(prefix)
+            count = max(MIN_CANDIDATES, limit * CANDIDATES_PER_RESULT)
+            if len(rows) > count:
+                rows = self._candidates(rows, count, weights, everything=prefix is None)
+
+            # Exact cosine (vectors are unit length) of each candidate over the
+            # query's non-zero dimensions; best chunk per file
+            matrix = self._matrix
+            dimensions = [dimension for dimension, value in enumerate(vector) if value]
+            values = [vector[dimension] for dimension in dimensions]
+            best: dict[int, tuple[float, int]] = {}
+            for row in rows:
+                start = row * DIMENSIONS
+                score = sum(map(mul, values, [matrix[start + dimension] for dimension in dimensions]))
+                file_id = self._chunks[row]
+                if file_id not in best or score > best[file_id][0]:
+                    best[file_id] = (score, row)
+            top = heapq.nlargest(limit, (item for item in best.values() if item[0] >= MIN_SIMILARITY))
+            if not top:
+                return []
+            details = {
+                row: (file_path, title, line, preview)
+                for row, line, preview, file_path, title in conn.execute(
+                    "SELECT chunks.row, chunks.line, chunks.preview, files.path, files.title "
+                    "FROM chunks JOIN files ON files.id = chunks.file "
+                    f"WHERE chunks.row IN ({', '.join('?' * len(top))})",
+                    [row for _, row in top],
+                )
+            }
+
+        hits = []
+        for score, row in top:
+            file_path, title, line, preview = details[row]
+            hits.append(SemanticHit(file_path, title, round(score, 4), line, preview))
+        return hits
+
+    def _close(self) -> None:
+        if self._matrix is not None:
+            self._matrix.release()
+            self._mmap.close()
+        for fd in (self._vectors_fd, self._codes_fd):
+            if fd is not None:
+                os.close(fd)
+        if self._conn is not None:
+            self._conn.close()
+        self._conn = self._vectors_fd = self._codes_fd = self._mmap = self._matrix = None
+        self._capacity = 0
+        self._columns = []
+        self._files = {}
+        self._chunks = {}
+        self._file_rows = defaultdict(list)
+        self._live = None
+        self._project_files.reset()
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+
+_indexes: dict[Path, SemanticIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_semantic_index(root: Path) -> SemanticIndex:
+    """Return the shared semantic index for a project root"""
+    with _indexes_lock:
+        index = _indexes.get(root)
+        if index is None:
+            index = _indexes[root] = SemanticIndex(root / SEMANTIC_INDEX_FILENAME, root)
+        return index
+
+
+def semantic_search(
+    root: Path,
+    query: str,
+    store: Optional[TaskStore] = None,
+    path: Optional[str] = None,
+    limit: int = 10,
+) -> list[SemanticHit]:
+    """Sync the semantic index of the project at root and run a query against it"""
+    index = get_semantic_index(root)
+    try:
+        index.sync(store)
+    except (sqlite3.Error, OSError) as e:
+        # Searching a slightly stale index beats failing the call
+        print(f"Semantic index not updated ({index.path}): {e}", file=sys.stderr)
+    return index.search(query, path, limit)
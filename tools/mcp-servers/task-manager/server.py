@@ -7,31 +7,184 @@ Exposes 10 tools for CRUD operations, deduplication, priority enforcement, and s
 """
 
 import asyncio
+import base64
+import heapq
+import itertools
+import json
 import re
-from datetime import datetime, timedelta
+import sqlite3
+import sys
+from collections import Counter, defaultdict
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import asdict
+from datetime import date, datetime, timedelta
 from difflib import SequenceMatcher
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence
 
-import yaml
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent
 
+# Shared with the integrations; importable because uv installs the project
+from tools.project_config import get_project_config
+
+from backlog_state import (
+    BACKLOG_STATE_FILENAME,
+    CREATED,
+    backlog_item_hash,
+    load_backlog_state,
+    save_backlog_state,
+)
+from category_matcher import CategoryMatcher, get_category_matcher
+from similarity_cache import (
+    DEFAULT_MAX_ENTRIES,
+    SAVE_AFTER,
+    TitleRatioCache,
+    get_similarity_cache,
+    pair_key,
+    title_key,
+)
+from task_store import (
+    Task,
+    TaskBatch,
+    TaskStore,
+    get_task_store,
+    parse_yaml_frontmatter,
+    write_task_file,
+)
+from document_cache import DocumentOutline, outline_documents
+from knowledge_search import search_knowledge
+from semantic_index import semantic_search
+from task_search import search_tasks
+from task_watcher import start_task_watcher
+from tool_locks import TaskLocks
+
 # Configuration
 PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
 TASKS_DIR = PROJECT_ROOT / "tasks"
 CONFIG_FILE = PROJECT_ROOT / "config.yaml"
 
+# Weights of the title and keyword components of calculate_similarity
+TITLE_WEIGHT = 0.6
+KEYWORD_WEIGHT = 0.3
+
+# Task fields available to the JSON output of the reporting tools
+TASK_JSON_FIELDS = (
+    "file", "title", "priority", "status", "category", "keywords",
+    "due_date", "created_date", "updated_date",
+)
+
+# Fields of a search_knowledge result in JSON output
+KNOWLEDGE_JSON_FIELDS = ("path", "title", "date", "line", "score", "snippet")
+# Fields of a semantic_search result in JSON output
+SEMANTIC_JSON_FIELDS = ("path", "title", "line", "score", "snippet")
+# Fields of a get_document_outline document in JSON output; turns only on request
+OUTLINE_JSON_FIELDS = ("path", "title", "date", "headings", "action_items", "speakers", "keywords", "turns")
+DEFAULT_OUTLINE_FIELDS = OUTLINE_JSON_FIELDS[:-1]
+
+# Output options shared by the reporting tools
+OUTPUT_FORMAT_PROPERTIES = {
+    "format": {
+        "type": "string",
+        "description": "Output format: markdown (default) or json for a compact structured payload",
+        "enum": ["markdown", "json"],
+    },
+    "fields": {
+        "type": "array",
+        "items": {"type": "string"},
+        "description": "With format=json, the fields to include for each task (default: the fields shown in markdown)",
+    },
+}
+
+# Paging options shared by the task listing tools
+PAGINATION_PROPERTIES = {
+    "limit": {
+        "type": "integer",
+        "description": "Maximum number of tasks to return",
+        "minimum": 1,
+    },
+    "cursor": {
+        "type": "string",
+        "description": "Cursor returned by the previous page, to continue after it",
+    },
+    "sort_by": {
+        "type": "string",
+        "description": "Sort order: file, priority (P0 first), due_date or updated_date (oldest first, undated last)",
+        "enum": ["file", "priority", "due_date", "updated_date"],
+    },
+}
+
+PRIORITY_RANK = {"P0": 0, "P1": 1, "P2": 2, "P3": 3}
+
+# Results search_tasks and search_knowledge return unless a limit is given
+DEFAULT_SEARCH_LIMIT = 20
+# Results semantic_search returns unless a limit is given
+DEFAULT_SEMANTIC_LIMIT = 10
+# Documents get_document_outline returns unless a limit is given
+DEFAULT_OUTLINE_LIMIT = 20
+
+
+def _date_sort_key(attribute: str) -> Callable[[Task], tuple]:
+    def key(task: Task) -> tuple:
+        value = getattr(task, attribute)
+        if value is None:
+            return (1, "", task.file)
+        return (0, value.isoformat(), task.file)
+    return key
+
+
+# Sort keys for paging. Each ends with the filename so the order is total, and
+# holds only strings and ints so a key can be stored in a cursor.
+SORT_KEYS: dict[str, Callable[[Task], tuple]] = {
+    "file": lambda task: (task.file,),
+    "priority": lambda task: (PRIORITY_RANK.get(task.priority, len(PRIORITY_RANK)), task.file),
+    "due_date": _date_sort_key("due"),
+    "updated_date": _date_sort_key("updated"),
+}
+
+# Suggested action for a duplicate, by the existing task's status
+DUPLICATE_SUGGESTIONS = {
+    "d": ("reopen", "This task is done. You may want to reopen it instead of creating new."),
+    "b": ("unblock", "This task is blocked. Consider unblocking and updating it."),
+}
+DEFAULT_DUPLICATE_SUGGESTION = (
+    "update", "Update existing task with new details instead of creating duplicate."
+)
+
+# Fields bulk_update_tasks can change and their allowed values (None: a YYYY-MM-DD date, or null to clear)
+BULK_UPDATE_FIELDS: dict[str, Optional[tuple[str, ...]]] = {
+    "status": ("n", "s", "b", "d"),
+    "priority": ("P0", "P1", "P2", "P3"),
+    "due_date": None,
+}
+
+# Tools that never write; they run concurrently without locks
+READ_ONLY_TOOLS = frozenset({
+    "list_tasks", "get_task", "search_tasks", "search_knowledge", "semantic_search", "get_document_outline",
+    "get_task_summary", "find_stale_tasks", "find_overdue_tasks", "check_duplicates",
+})
+
+# Lock name guarding priority cap check-then-write sequences
+PRIORITY_CAPS_LOCK = "priority caps"
+BACKLOG_LOCK = "BACKLOG.md"
+
 # Initialize MCP server
 app = Server("pm-tasks")
+task_locks = TaskLocks()
 
 
 # Helper Functions
 
 def load_config() -> dict:
-    """Load configuration from config.yaml"""
-    if not CONFIG_FILE.exists():
+    """
+    Load configuration from config.yaml.
+
+    The parsed file is cached and re-read only when it changes, so the result
+    is shared and must not be modified.
+    """
+    config = get_project_config(CONFIG_FILE).load()
+    if config is None:
         return {
             "priority_caps": {"P0": 3, "P1": 7, "P2": 15, "P3": 999},
             "task_aging": {"prune_completed_after": 90, "flag_stale_after": 14},
@@ -42,70 +195,12 @@ def load_config() -> dict:
             },
             "category_keywords": {},
         }
+    return config
 
-    with open(CONFIG_FILE, "r") as f:
-        return yaml.safe_load(f)
-
-
-def parse_yaml_frontmatter(file_path: Path) -> tuple[dict, str]:
-    """Parse YAML frontmatter and markdown body from a task file"""
-    if not file_path.exists():
-        return {}, ""
-
-    with open(file_path, "r") as f:
-        content = f.read()
-
-    # Match YAML frontmatter between --- delimiters
-    match = re.match(r"^---\s*\n(.*?)\n---\s*\n(.*)$", content, re.DOTALL)
-    if not match:
-        return {}, content
-
-    frontmatter_str, body = match.groups()
-    try:
-        frontmatter = yaml.safe_load(frontmatter_str) or {}
-    except yaml.YAMLError:
-        frontmatter = {}
-
-    return frontmatter, body.strip()
-
-
-def write_task_file(file_path: Path, frontmatter: dict, body: str):
-    """Write task file with YAML frontmatter"""
-    yaml_str = yaml.dump(frontmatter, default_flow_style=False, sort_keys=False)
-    content = f"---\n{yaml_str}---\n\n{body}\n"
-
-    with open(file_path, "w") as f:
-        f.write(content)
 
-
-def get_all_tasks() -> list[dict]:
+def get_all_tasks() -> list[Task]:
     """Get all tasks with metadata"""
-    tasks = []
-
-    if not TASKS_DIR.exists():
-        return tasks
-
-    for task_file in TASKS_DIR.glob("*.md"):
-        if task_file.name == "README.md":
-            continue
-
-        frontmatter, body = parse_yaml_frontmatter(task_file)
-        task = {
-            "file": task_file.name,
-            "path": str(task_file),
-            "title": frontmatter.get("title", ""),
-            "priority": frontmatter.get("priority", "P3"),
-            "status": frontmatter.get("status", "n"),
-            "category": frontmatter.get("category", ""),
-            "keywords": frontmatter.get("keywords", []),
-            "due_date": frontmatter.get("due_date"),
-            "created_date": frontmatter.get("created_date"),
-            "updated_date": frontmatter.get("updated_date"),
-            "body": body,
-        }
-        tasks.append(task)
-
-    return tasks
+    return get_task_store(TASKS_DIR).all()
 
 
 def calculate_similarity(task1: dict, task2: dict, config: dict) -> float:
@@ -134,51 +229,420 @@ def calculate_similarity(task1: dict, task2: dict, config: dict) -> float:
         category_match = 1.0 if cat1 == cat2 else 0.5
 
     # Weighted average: title (60%), keywords (30%), category (10%)
-    similarity = (title_score * 0.6 + keyword_score * 0.3) * category_match
+    similarity = (title_score * TITLE_WEIGHT + keyword_score * KEYWORD_WEIGHT) * category_match
     return similarity
 
 
+def _normalize_for_similarity(task: dict) -> tuple[str, frozenset[str], str]:
+    return (
+        task.get("title", "").lower(),
+        frozenset(k.lower() for k in task.get("keywords", [])),
+        task.get("category", "").lower(),
+    )
+
+
+def score_matrix(
+    proposed_items: list[dict],
+    existing_tasks: list[dict],
+    config: dict,
+    threshold: Optional[float] = None,
+    candidates: Optional[list[Iterable[int]]] = None,
+    ratios: Optional[TitleRatioCache] = None,
+) -> list[list[Optional[float]]]:
+    """
+    Score proposed items against existing tasks in one batch.
+
+    Entry [i][j] equals calculate_similarity(proposed_items[i],
+    existing_tasks[j], config). Titles, keyword sets and categories are
+    normalized once per item and task, keyword overlap is counted through a
+    keyword -> tasks map, and each task's SequenceMatcher is built once and
+    reused for every item.
+
+    With a threshold, entries that provably score below it are left as None:
+    the keyword and category factors are exact, so the title ratio is only
+    computed when difflib's cheap upper bounds on it could still reach the
+    threshold. With candidates, only the listed columns of each row are scored.
+    With ratios, title ratios are looked up in and added to that cache.
+    """
+    dedup = config["deduplication"]
+    check_keywords = dedup["check_keywords"]
+    check_categories = dedup["check_categories"]
+
+    rows = [_normalize_for_similarity(item) for item in proposed_items]
+    columns = [_normalize_for_similarity(task) for task in existing_tasks]
+
+    by_keyword: dict[str, list[int]] = defaultdict(list)
+    if check_keywords:
+        for j, (_, keywords, _) in enumerate(columns):
+            for keyword in keywords:
+                by_keyword[keyword].append(j)
+
+    # column -> [(row, keyword score, category match)] still to be scored
+    pending: dict[int, list[tuple[int, float, float]]] = defaultdict(list)
+    for i, (_, keywords, category) in enumerate(rows):
+        overlap: Counter = Counter()
+        for keyword in keywords:
+            overlap.update(by_keyword.get(keyword, ()))
+        for j in range(len(columns)) if candidates is None else candidates[i]:
+            shared = overlap.get(j)
+            keyword_score = shared / len(keywords | columns[j][1]) if shared else 0.0
+            category_match = 1.0
+            if check_categories:
+                category_match = 1.0 if category == columns[j][2] else 0.5
+            pending[j].append((i, keyword_score, category_match))
+
+    def score(title_score: float, keyword_score: float, category_match: float) -> float:
+        return (title_score * TITLE_WEIGHT + keyword_score * KEYWORD_WEIGHT) * category_match
+
+    matrix: list[list[Optional[float]]] = [[None] * len(columns) for _ in rows]
+    if ratios is not None:
+        row_keys = [title_key(row[0]) for row in rows]
+    for j, pairs in pending.items():
+        matcher = SequenceMatcher(None, "", columns[j][0])
+        if ratios is not None:
+            column_key = title_key(columns[j][0])
+        for i, keyword_score, category_match in pairs:
+            matcher.set_seq1(rows[i][0])
+            if threshold is not None and score(matcher.real_quick_ratio(), keyword_score, category_match) < threshold:
+                continue
+
+            title_score = None
+            if ratios is not None:
+                key = pair_key(row_keys[i], column_key)
+                title_score = ratios.get(key)
+            if title_score is None:
+                if threshold is not None and score(matcher.quick_ratio(), keyword_score, category_match) < threshold:
+                    continue
+                title_score = matcher.ratio()
+                if ratios is not None:
+                    ratios.put(key, title_score)
+            matrix[i][j] = score(title_score, keyword_score, category_match)
+    return matrix
+
+
+def find_similar_tasks(proposed_tasks: list[dict], config: dict) -> list[list[tuple[Task, float]]]:
+    """
+    For each proposed task, return (task, similarity) for existing tasks at or
+    above the configured similarity threshold, ordered by filename.
+
+    Only tasks the similarity index shortlists are scored. A task sharing no
+    keyword scores at most title_score * TITLE_WEIGHT, so it can only reach
+    the threshold with a title ratio of at least threshold / TITLE_WEIGHT.
+    Title ratios are memoized across calls unless
+    task_manager.similarity_cache_size is 0.
+    """
+    dedup = config["deduplication"]
+    threshold = dedup["similarity_threshold"]
+
+    cache_size = (config.get("task_manager") or {}).get("similarity_cache_size", DEFAULT_MAX_ENTRIES)
+    ratios = None
+    if cache_size:
+        ratios = get_similarity_cache(TASKS_DIR)
+        ratios.max_entries = cache_size
+
+    shortlists = get_task_store(TASKS_DIR).similarity_candidates(
+        [
+            (proposed.get("title", ""), proposed.get("keywords", []) if dedup["check_keywords"] else [])
+            for proposed in proposed_tasks
+        ],
+        threshold / TITLE_WEIGHT,
+    )
+
+    # Score every shortlist in one batch over the union of shortlisted tasks
+    existing: list[Task] = []
+    column_of: dict[str, int] = {}
+    candidates = []
+    for shortlist in shortlists:
+        row = []
+        for task in shortlist:
+            if task.file not in column_of:
+                column_of[task.file] = len(existing)
+                existing.append(task)
+            row.append(column_of[task.file])
+        candidates.append(row)
+
+    scores = score_matrix(proposed_tasks, existing, config, threshold, candidates, ratios)
+    if ratios is not None:
+        ratios.save(min_unsaved=SAVE_AFTER)
+    return [
+        [
+            (existing[j], scores[i][j])
+            for j in row
+            if scores[i][j] is not None and scores[i][j] >= threshold
+        ]
+        for i, row in enumerate(candidates)
+    ]
+
+
+def _compile_category_matcher(config: dict) -> CategoryMatcher:
+    return CategoryMatcher(config.get("category_keywords") or {})
+
+
 def auto_categorize(title: str, body: str, config: dict) -> str:
     """Auto-categorize task based on keywords in config"""
     text = f"{title} {body}".lower()
-    category_keywords = config.get("category_keywords", {})
+    project_config = get_project_config(CONFIG_FILE)
+    if config is project_config.data:
+        # Compiled once per version of config.yaml
+        matcher = project_config.derived("category_matcher", _compile_category_matcher)
+    else:
+        matcher = get_category_matcher(config.get("category_keywords") or {})
+
+    # Return category with most keyword matches
+    return matcher.categorize(text)
+
+
+def check_bulk_update(updates: Any, store: TaskStore, caps: dict) -> tuple[dict[str, dict], dict[str, str]]:
+    """
+    Validate bulk_update_tasks entries against the store and priority caps.
+
+    Caps are checked once, against the priority counts after every update,
+    so a batch may promote one task while demoting another at a full
+    priority. Returns the changes by filename, in order, and an error
+    message by filename (or entry position) for every entry that cannot be
+    applied. Raises ValueError if updates is not a non-empty list.
+    """
+    if not isinstance(updates, list) or not updates:
+        raise ValueError("updates must be a non-empty list of {filename, status, priority, due_date} objects")
+
+    changes: dict[str, dict] = {}
+    errors: dict[str, str] = {}
+    for position, entry in enumerate(updates, start=1):
+        filename = entry.get("filename") if isinstance(entry, dict) else None
+        if not isinstance(filename, str) or not filename:
+            errors[f"update {position}"] = "Missing filename"
+            continue
+        if filename in changes or filename in errors:
+            errors[filename] = "Listed more than once"
+            continue
+        fields = {field: value for field, value in entry.items() if field != "filename"}
+        unknown = [field for field in fields if field not in BULK_UPDATE_FIELDS]
+        if unknown:
+            errors[filename] = f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(BULK_UPDATE_FIELDS)}"
+            continue
+        if not fields:
+            errors[filename] = "No changes given"
+            continue
+        invalid = None
+        for field, value in fields.items():
+            allowed = BULK_UPDATE_FIELDS[field]
+            if allowed is not None and value not in allowed:
+                invalid = f"Invalid {field}: {value} (use {', '.join(allowed)})"
+            elif allowed is None and value is not None:
+                try:
+                    date.fromisoformat(value)
+                except (TypeError, ValueError):
+                    invalid = f"Invalid {field}: {value} (use YYYY-MM-DD or null)"
+        if invalid:
+            errors[filename] = invalid
+            continue
+        if store.get(filename) is None:
+            errors[filename] = f"Task not found: {filename}"
+            continue
+        changes[filename] = fields
+
+    # Priority counts once every update is applied
+    counts = Counter(store.value_counts("priority"))
+    raised: dict[str, list[str]] = defaultdict(list)
+    for filename, fields in changes.items():
+        old, new = store.get(filename).priority, fields.get("priority")
+        if new is not None and new != old:
+            counts[old] -= 1
+            counts[new] += 1
+            raised[new].append(filename)
+    for priority, filenames in raised.items():
+        cap = caps.get(priority, 999)
+        if counts[priority] > cap:
+            for filename in filenames:
+                errors[filename] = (
+                    f"{priority} cap ({cap}) would be exceeded: {counts[priority]} {priority} tasks after these updates"
+                )
+    return {filename: fields for filename, fields in changes.items() if filename not in errors}, errors
+
 
-    # Count keyword matches for each category
-    matches = {}
-    for category, keywords in category_keywords.items():
-        count = sum(1 for keyword in keywords if keyword.lower() in text)
-        if count > 0:
-            matches[category] = count
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
 
-    # Return category with most matches
-    if matches:
-        return max(matches, key=matches.get)
 
-    return ""
+def json_response(payload: dict) -> list[TextContent]:
+    """Return a structured tool result as compact JSON"""
+    return [
+        TextContent(
+            type="text",
+            text=json.dumps(payload, separators=(",", ":"), default=_json_default),
+        )
+    ]
 
 
-def get_task_by_file(filename: str) -> Optional[dict]:
-    """Get task by filename"""
-    task_file = TASKS_DIR / filename
-    if not task_file.exists():
-        return None
+def select_fields(arguments: dict, available: Sequence[str], default: Sequence[str]) -> list[str]:
+    """Return the fields requested for JSON output, raising ValueError for unknown ones"""
+    fields = arguments.get("fields") or default
+    unknown = [field for field in fields if field not in available]
+    if unknown:
+        raise ValueError(
+            f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(available)}"
+        )
+    return list(fields)
 
-    frontmatter, body = parse_yaml_frontmatter(task_file)
+
+def project_task(task: Task, fields: Sequence[str], extra: Optional[dict] = None) -> dict:
+    """Return the selected fields of a task, taking computed fields from extra"""
+    extra = extra or {}
     return {
-        "file": filename,
-        "path": str(task_file),
-        "title": frontmatter.get("title", ""),
-        "priority": frontmatter.get("priority", "P3"),
-        "status": frontmatter.get("status", "n"),
-        "category": frontmatter.get("category", ""),
-        "keywords": frontmatter.get("keywords", []),
-        "due_date": frontmatter.get("due_date"),
-        "created_date": frontmatter.get("created_date"),
-        "updated_date": frontmatter.get("updated_date"),
-        "body": body,
+        field: extra[field] if field in extra else getattr(task, field)
+        for field in fields
     }
 
 
+def outline_json(outline: DocumentOutline, fields: Sequence[str]) -> dict:
+    """Return the selected fields of a document outline"""
+    document = outline.document
+    values = {
+        "path": lambda: outline.path,
+        "title": lambda: outline.title,
+        "date": lambda: outline.date,
+        "headings": lambda: [asdict(heading) for heading in document.headings],
+        "action_items": lambda: [asdict(item) for item in document.action_items],
+        "speakers": lambda: [
+            {"name": speaker, "turns": turns, "words": words}
+            for speaker, turns, words in document.speakers()
+        ],
+        "keywords": lambda: document.keywords,
+        "turns": lambda: [asdict(turn) for turn in document.turns],
+    }
+    return {field: values[field]() for field in fields}
+
+
+def format_outline(outline: DocumentOutline) -> str:
+    """Markdown outline of one document"""
+    document = outline.document
+    lines = [f"\n## {outline.title}\n", f"{outline.path} ({outline.date})\n"]
+    if document.headings:
+        sections = ", ".join(f"{heading.text} (line {heading.line})" for heading in document.headings)
+        lines.append(f"- **Sections:** {sections}\n")
+    speakers = document.speakers()
+    if speakers:
+        counts = ", ".join(
+            f"{speaker} ({turns} {'turn' if turns == 1 else 'turns'}, {words} words)"
+            for speaker, turns, words in speakers
+        )
+        lines.append(f"- **Speakers:** {counts}\n")
+    if document.keywords:
+        lines.append(f"- **Keywords:** {', '.join(document.keywords)}\n")
+    if document.action_items:
+        lines.append("- **Action items:**\n")
+        for item in document.action_items:
+            owner = f", {item.owner}" if item.owner else ""
+            lines.append(f"  - [{'x' if item.done else ' '}] {item.text} (line {item.line}{owner})\n")
+    return "".join(lines)
+
+
+def encode_cursor(sort_by: str, key: tuple) -> str:
+    raw = json.dumps([sort_by, list(key)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str, sort_by: str) -> tuple:
+    """Return the sort key stored in a cursor, raising ValueError if it is not valid for sort_by"""
+    try:
+        cursor_sort, key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor") from None
+    if cursor_sort != sort_by:
+        raise ValueError(f"Cursor was created with sort_by={cursor_sort}, not {sort_by}")
+    if not isinstance(key, list) or not all(isinstance(k, (str, int)) for k in key):
+        raise ValueError("Invalid cursor")
+    return tuple(key)
+
+
+def paginate(
+    tasks: list[Task], arguments: dict, default_sort: str
+) -> tuple[list[Task], Optional[str]]:
+    """
+    Return one page of tasks and the cursor for the next page (None on the last page).
+
+    Tasks are ordered by arguments["sort_by"] (default_sort if not given) with the
+    filename as tie-breaker, and the page starts after arguments["cursor"].
+    Cursors hold the last sort key rather than an offset, so tasks created or
+    deleted between calls do not shift later pages. Raises ValueError for bad
+    arguments.
+    """
+    sort_by = arguments.get("sort_by") or default_sort
+    if sort_by not in SORT_KEYS:
+        raise ValueError(f"Invalid sort_by: {sort_by}. Use one of: {', '.join(SORT_KEYS)}")
+    key = SORT_KEYS[sort_by]
+    limit = arguments.get("limit")
+    if limit is not None and (not isinstance(limit, int) or limit < 1):
+        raise ValueError("limit must be a positive integer")
+
+    if arguments.get("cursor"):
+        after = decode_cursor(arguments["cursor"], sort_by)
+        try:
+            tasks = [t for t in tasks if key(t) > after]
+        except TypeError:
+            raise ValueError("Invalid cursor") from None
+
+    if limit is None:
+        return sorted(tasks, key=key), None
+
+    # Select the page without sorting everything after it
+    page = heapq.nsmallest(limit + 1, tasks, key=key)
+    if len(page) <= limit:
+        return page, None
+    page = page[:limit]
+    return page, encode_cursor(sort_by, key(page[-1]))
+
+
+def next_page_note(next_cursor: Optional[str]) -> str:
+    if next_cursor is None:
+        return ""
+    return f"More tasks available. Pass cursor=\"{next_cursor}\" for the next page.\n"
+
+
+def task_filename(title: str) -> str:
+    """Return the task filename generated from a title"""
+    filename = re.sub(r"[^a-z0-9]+", "-", title.lower())
+    return filename.strip("-") + ".md"
+
+
+def get_task_by_file(filename: str) -> Optional[Task]:
+    """Get task by filename"""
+    return get_task_store(TASKS_DIR).get(filename)
+
+
+def _phrase_regex(phrases: Iterable[str]) -> re.Pattern:
+    """Compile phrases into one regex that finds any of them as a substring"""
+    return re.compile("|".join(re.escape(phrase) for phrase in phrases))
+
+
+# Words that show an item asks for an action
+ACTION_VERBS = [
+    "add", "update", "fix", "create", "write", "review", "send", "email",
+    "call", "schedule", "research", "analyze", "implement", "deploy",
+    "design", "test", "document", "refactor", "contact", "follow up",
+    "debug", "investigate", "explore", "consider", "evaluate", "assess",
+    "patch", "restore", "resolve", "address", "handle", "complete", "finish"
+]
+# Words that imply action is needed even without explicit verb
+URGENCY_INDICATORS = [
+    "bug", "vulnerability", "downtime", "outage", "broken", "failing",
+    "urgent", "critical", "immediate", "asap", "need to", "needs to",
+    "must", "required", "deadline", "due", "blocked", "blocking"
+]
+VAGUE_WORDS = ["something", "maybe", "should", "might", "possibly", "think about"]
+# Action verb present but unclear what it applies to
+VAGUE_TARGETS = [
+    "the thing", "the issue", "the problem", "that thing", "this thing",
+    "that problem", "this problem", "that issue", "this issue"
+]
+
+ACTION_RE = _phrase_regex(ACTION_VERBS + URGENCY_INDICATORS)
+VAGUE_WORDS_RE = _phrase_regex(VAGUE_WORDS)
+VAGUE_TARGETS_RE = _phrase_regex(VAGUE_TARGETS)
+
+
 def is_ambiguous(text: str) -> tuple[bool, str]:
     """
     Check if a backlog item is too vague/ambiguous to become a task.
@@ -190,41 +654,18 @@ def is_ambiguous(text: str) -> tuple[bool, str]:
     if len(text) < 10:
         return True, "Item too short (less than 10 characters)"
 
-    # Check for action verbs or urgency indicators
-    action_verbs = [
-        "add", "update", "fix", "create", "write", "review", "send", "email",
-        "call", "schedule", "research", "analyze", "implement", "deploy",
-        "design", "test", "document", "refactor", "contact", "follow up",
-        "debug", "investigate", "explore", "consider", "evaluate", "assess",
-        "patch", "restore", "resolve", "address", "handle", "complete", "finish"
-    ]
-    # Words that imply action is needed even without explicit verb
-    urgency_indicators = [
-        "bug", "vulnerability", "downtime", "outage", "broken", "failing",
-        "urgent", "critical", "immediate", "asap", "need to", "needs to",
-        "must", "required", "deadline", "due", "blocked", "blocking"
-    ]
-    has_action = any(verb in text.lower() for verb in action_verbs)
-    has_urgency = any(indicator in text.lower() for indicator in urgency_indicators)
+    lowered = text.lower()
 
-    if not has_action and not has_urgency:
+    # Check for action verbs or urgency indicators
+    if not ACTION_RE.search(lowered):
         return True, "No clear action verb found"
 
     # Check for vague language
-    vague_words = ["something", "maybe", "should", "might", "possibly", "think about"]
-    has_vague = any(word in text.lower() for word in vague_words)
-
-    if has_vague:
-        return True, f"Contains vague language: {[w for w in vague_words if w in text.lower()]}"
+    if VAGUE_WORDS_RE.search(lowered):
+        return True, f"Contains vague language: {[w for w in VAGUE_WORDS if w in lowered]}"
 
     # Check for vague targets (has action verb but unclear what it applies to)
-    vague_targets = [
-        "the thing", "the issue", "the problem", "that thing", "this thing",
-        "that problem", "this problem", "that issue", "this issue"
-    ]
-    has_vague_target = any(target in text.lower() for target in vague_targets)
-
-    if has_vague_target:
+    if VAGUE_TARGETS_RE.search(lowered):
         return True, "Contains vague target reference"
 
     return False, ""
@@ -376,6 +817,8 @@ async def list_tools() -> list[Tool]:
                         "type": "integer",
                         "description": "Filter tasks created more than N days ago",
                     },
+                    **PAGINATION_PROPERTIES,
+                    **OUTPUT_FORMAT_PROPERTIES,
                 },
             },
         ),
@@ -393,6 +836,111 @@ async def list_tools() -> list[Tool]:
                 "required": ["filename"],
             },
         ),
+        Tool(
+            name="search_tasks",
+            description="Full-text search over task titles, keywords and bodies, ranked by relevance (BM25) with a snippet of the best matching passage. Matches tasks containing every word of the query; word forms are stemmed.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "query": {"type": "string", "description": "Words to search for"},
+                    "priority": {
+                        "type": "string",
+                        "description": "Filter by priority (P0, P1, P2, P3)",
+                        "enum": ["P0", "P1", "P2", "P3"],
+                    },
+                    "status": {
+                        "type": "string",
+                        "description": "Filter by status (n=not started, s=started, b=blocked, d=done)",
+                        "enum": ["n", "s", "b", "d"],
+                    },
+                    "category": {"type": "string", "description": "Filter by category"},
+                    "limit": {
+                        "type": "integer",
+                        "description": f"Maximum number of results (default {DEFAULT_SEARCH_LIMIT})",
+                        "minimum": 1,
+                    },
+                    **OUTPUT_FORMAT_PROPERTIES,
+                },
+                "required": ["query"],
+            },
+        ),
+        Tool(
+            name="search_knowledge",
+            description="Full-text search over knowledge/ (transcripts, notes, initiatives, specs, ...) and tasks/, ranked by relevance (BM25). Each result has the file's date and the paragraph that best matches the query, with its line number. Matches files containing every word of the query; word forms are stemmed.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "query": {"type": "string", "description": "Words to search for"},
+                    "path": {
+                        "type": "string",
+                        "description": "Only search this directory or file, relative to the project root (e.g. knowledge/transcripts)",
+                    },
+                    "since": {
+                        "type": "string",
+                        "description": "Only files dated on or after this day (YYYY-MM-DD). A file's date is the YYYY-MM-DD prefix of its name, else its frontmatter date, else its modification time",
+                    },
+                    "until": {
+                        "type": "string",
+                        "description": "Only files dated on or before this day (YYYY-MM-DD)",
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": f"Maximum number of results (default {DEFAULT_SEARCH_LIMIT})",
+                        "minimum": 1,
+                    },
+                    **OUTPUT_FORMAT_PROPERTIES,
+                },
+                "required": ["query"],
+            },
+        ),
+        Tool(
+            name="semantic_search",
+            description="Find the passages in knowledge/ and tasks/ most similar to a query, ranked by shared words, word pieces and phrases. Unlike search_knowledge, results need not contain every word, so reworded or partial matches are found too; synonyms with no letters in common are not. Returns the best passage per file with its line number.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "query": {"type": "string", "description": "Text to find similar passages for: a question, a sentence or a task description"},
+                    "path": {
+                        "type": "string",
+                        "description": "Only search this directory or file, relative to the project root (e.g. knowledge/transcripts)",
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": f"Maximum number of results (default {DEFAULT_SEMANTIC_LIMIT})",
+                        "minimum": 1,
+                    },
+                    **OUTPUT_FORMAT_PROPERTIES,
+                },
+                "required": ["query"],
+            },
+        ),
+        Tool(
+            name="get_document_outline",
+            description="Outline transcripts, notes and other files in knowledge/ and tasks/ without reading them: headings, action items (checkboxes, bullets under an action items/next steps heading, Action:/TODO: lines) with owners, speakers with turn and word counts, and keywords. Parses are cached by file content, so repeated calls only parse new or changed files.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "path": {
+                        "type": "string",
+                        "description": "Directory or file to outline, relative to the project root (e.g. knowledge/transcripts). Default: all of knowledge/ and tasks/",
+                    },
+                    "since": {
+                        "type": "string",
+                        "description": "Only files dated on or after this day (YYYY-MM-DD). A file's date is the YYYY-MM-DD prefix of its name, else its frontmatter date, else its modification time",
+                    },
+                    "until": {
+                        "type": "string",
+                        "description": "Only files dated on or before this day (YYYY-MM-DD)",
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": f"Maximum number of files, newest first (default {DEFAULT_OUTLINE_LIMIT})",
+                        "minimum": 1,
+                    },
+                    **OUTPUT_FORMAT_PROPERTIES,
+                },
+            },
+        ),
         Tool(
             name="create_task",
             description="Create a new task with YAML frontmatter. Auto-categorizes if category not provided. Checks priority caps.",
@@ -464,20 +1012,76 @@ async def list_tools() -> list[Tool]:
                 "required": ["filename", "priority"],
             },
         ),
+        Tool(
+            name="bulk_update_tasks",
+            description="Update the status, priority and/or due date of many tasks in one call. Priority caps are checked once against the result of all updates, so tasks can be swapped between full priorities. All updates are written together, or none if any entry is invalid or would exceed a cap. Returns a result per file.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "updates": {
+                        "type": "array",
+                        "description": "One entry per task, each with the fields to change",
+                        "minItems": 1,
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "filename": {
+                                    "type": "string",
+                                    "description": "Task filename (e.g., 'fix-auth-bug.md')",
+                                },
+                                "status": {
+                                    "type": "string",
+                                    "description": "New status",
+                                    "enum": list(BULK_UPDATE_FIELDS["status"]),
+                                },
+                                "priority": {
+                                    "type": "string",
+                                    "description": "New priority",
+                                    "enum": list(BULK_UPDATE_FIELDS["priority"]),
+                                },
+                                "due_date": {
+                                    "type": ["string", "null"],
+                                    "description": "New due date (YYYY-MM-DD format), or null to clear it",
+                                },
+                            },
+                            "required": ["filename"],
+                        },
+                    },
+                    "format": OUTPUT_FORMAT_PROPERTIES["format"],
+                },
+                "required": ["updates"],
+            },
+        ),
         Tool(
             name="get_task_summary",
             description="Get task statistics (counts by priority, status, category)",
-            inputSchema={"type": "object", "properties": {}},
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "format": OUTPUT_FORMAT_PROPERTIES["format"],
+                    "fields": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "With format=json, the sections to include (total, priority, status, category)",
+                    },
+                },
+            },
         ),
         Tool(
             name="find_stale_tasks",
             description="Find tasks marked as started but not updated recently (uses flag_stale_after from config)",
-            inputSchema={"type": "object", "properties": {}},
+            inputSchema={
+                "type": "object",
+                "properties": {**PAGINATION_PROPERTIES, **OUTPUT_FORMAT_PROPERTIES},
+            },
         ),
         Tool(
             name="find_overdue_tasks",
             description="Find tasks past their due date",
-            inputSchema={"type": "object", "properties": {}},
+            inputSchema={
+                "type": "object",
+                "properties": {**PAGINATION_PROPERTIES, **OUTPUT_FORMAT_PROPERTIES},
+            },
         ),
         Tool(
             name="prune_completed_tasks",
@@ -508,20 +1112,25 @@ async def list_tools() -> list[Tool]:
                         "type": "string",
                         "description": "Proposed category",
                     },
+                    **OUTPUT_FORMAT_PROPERTIES,
                 },
                 "required": ["title"],
             },
         ),
         Tool(
             name="process_backlog",
-            description="Process all items from BACKLOG.md with automated categorization, deduplication, and ambiguity detection. Returns summary of what would be created and flags any items needing clarification.",
+            description="Process new items from BACKLOG.md with automated categorization, deduplication, and ambiguity detection. Items handled by earlier runs are skipped unless changed. Returns summary of what would be created and flags any items needing clarification.",
             inputSchema={
                 "type": "object",
                 "properties": {
                     "auto_create": {
                         "type": "boolean",
-                        "description": "If true, automatically create tasks/initiatives. If false (default), only return summary for review.",
-                    }
+                        "description": "If true, automatically create tasks/initiatives (including tasks previewed by earlier runs). If false (default), only return summary for review.",
+                    },
+                    "force_full": {
+                        "type": "boolean",
+                        "description": "If true, reprocess every item, including ones handled by earlier runs (default: false)",
+                    },
                 },
             },
         ),
@@ -541,40 +1150,312 @@ async def list_tools() -> list[Tool]:
     ]
 
 
+BULLET_PREFIXES = ("- ", "* ", "+ ")
+
+URL_RE = re.compile(r"https?://\S")
+# Only classify as reference if it has a URL or explicit reference phrases
+REFERENCE_PHRASES_RE = _phrase_regex(
+    ["found article", "found link", "read this", "source:", "reference:"]
+)
+# Meeting notes, random notes
+NOTES_KEYWORDS_RE = _phrase_regex(["notes", "meeting notes", "standup", "retrospective"])
+# Strategic, user pain point, not immediately actionable
+INITIATIVE_INDICATORS_RE = _phrase_regex([
+    "explore", "investigate", "consider", "opportunity", "idea", "strategy",
+    "users complaining", "user feedback", "users want", "users requesting",
+    "performance issue", "slow startup", "slow loading"
+])
+
+# Candidate tasks are checked for duplicates this many at a time
+DEDUP_BATCH_SIZE = 256
+
+
+def iter_backlog_items(lines: Iterable[str]) -> Iterator[dict]:
+    """
+    Parse BACKLOG.md lines into items, yielding each as soon as it is complete.
+
+    Supports two formats:
+    1. Structured: ## Title followed by description lines
+    2. Simple: bullet points (- item)
+    """
+    title = None
+    description: list[str] = []
+
+    for line in lines:
+        stripped = line.strip()
+
+        # Skip empty lines
+        if not stripped:
+            continue
+
+        # Skip top-level header (# Backlog, # Test Backlog, etc.)
+        if stripped.startswith('# ') and not stripped.startswith('## '):
+            continue
+
+        # New item: ## heading format
+        if stripped.startswith('## '):
+            if title is not None:
+                yield {"title": title, "description": "".join(description)}
+            title = stripped[3:].strip()
+            description = []
+
+        # Bullet point format (standalone items)
+        elif stripped.startswith(BULLET_PREFIXES) and title is None:
+            item_text = stripped.lstrip('- ').lstrip('* ').lstrip('+ ')
+            if len(item_text) >= 5:
+                yield {"title": item_text, "description": ""}
+
+        # Description line for current structured item
+        elif title is not None:
+            if stripped.startswith(BULLET_PREFIXES):
+                # Sub-items (meeting notes, etc.) keep their own lines
+                description.append(stripped + "\n")
+            elif description:
+                description.append(" " + stripped)
+            else:
+                description.append(stripped)
+
+    # Don't forget the last item
+    if title is not None:
+        yield {"title": title, "description": "".join(description)}
+
+
+def classify_backlog_item(item: dict, config: dict) -> tuple[str, dict]:
+    """
+    Classify a backlog item as a reference, notes, initiative, ambiguous item
+    or candidate task. Returns (kind, details for the summary).
+    """
+    title = item["title"]
+    description = item["description"]
+    full_text = f"{title} {description}".strip()
+    lowered = full_text.lower()
+
+    # 1. Reference (has URL) - these don't need action verbs
+    if URL_RE.search(full_text) or REFERENCE_PHRASES_RE.search(lowered):
+        return "reference", {"title": title, "description": description, "category": "reference"}
+
+    # 2. Notes to archive (meeting notes, random notes)
+    if description.startswith("-") and NOTES_KEYWORDS_RE.search(title.lower()):
+        return "notes", {"title": title, "description": description}
+
+    # 3. Initiative (strategic, user pain point, not immediately actionable)
+    if INITIATIVE_INDICATORS_RE.search(lowered):
+        category = auto_categorize(title, description, config)
+        return "initiative", {"title": title, "description": description, "category": category}
+
+    # 4. Check ambiguity only for items that look like tasks
+    is_amb, reason = is_ambiguous(full_text)
+    if is_amb:
+        return "ambiguous", {
+            "item": title,
+            "description": description,
+            "reason": reason,
+            "questions": generate_clarification_questions(full_text),
+        }
+
+    category = auto_categorize(title, description, config)
+    return "candidate", {"title": title, "description": description, "category": category}
+
+
+def dedup_backlog_candidates(
+    classified: Iterable[tuple[str, dict]], config: dict
+) -> Iterator[tuple[str, dict]]:
+    """
+    Pass classified items through, turning each candidate into a "task" or a
+    "duplicate". Candidates are checked against existing tasks in batches of
+    DEDUP_BATCH_SIZE.
+    """
+    pending: list[dict] = []
+
+    def check_pending() -> Iterator[tuple[str, dict]]:
+        proposed = [
+            {"title": c["title"], "keywords": [], "category": c["category"]}
+            for c in pending
+        ]
+        for candidate, similar in zip(pending, find_similar_tasks(proposed, config)):
+            if similar:
+                yield "duplicate", {**candidate, "item": candidate["title"], "similar": similar}
+            else:
+                # Default to P2, user can adjust
+                yield "task", {**candidate, "priority": "P2"}
+        pending.clear()
+
+    for kind, item in classified:
+        if kind != "candidate":
+            yield kind, item
+            continue
+        pending.append(item)
+        if len(pending) >= DEDUP_BATCH_SIZE:
+            yield from check_pending()
+    if pending:
+        yield from check_pending()
+
+
+def _preview(text: str, length: int) -> str:
+    return f"{text[:length]}{'...' if len(text) > length else ''}"
+
+
+class BacklogSummary:
+    """
+    The process_backlog report, built one item at a time.
+
+    Each item is formatted into its section as it arrives, so only the tasks
+    to create are kept whole.
+    """
+
+    SECTIONS = {
+        "task": "## ✓ Tasks to Create",
+        "initiative": "## 💡 Initiatives Identified",
+        "reference": "## 📚 References to Save",
+        "notes": "## 📝 Notes to Archive",
+        "ambiguous": "## ⚠️  Ambiguous Items Needing Clarification",
+        "duplicate": "## 🔄 Possible Duplicates",
+    }
+
+    def __init__(self):
+        self.total = 0
+        # Items left out because earlier runs handled them
+        self.skipped = 0
+        self.tasks_to_create: list[dict] = []
+        self._sections: dict[str, list[str]] = {kind: [] for kind in self.SECTIONS}
+        self._counts: Counter = Counter()
+
+    def add(self, kind: str, item: dict) -> None:
+        self.total += 1
+        self._counts[kind] += 1
+        lines = self._sections[kind]
+        description = item.get("description")
+
+        if kind == "task":
+            self.tasks_to_create.append(item)
+            lines.append(f"- **{item['title']}**\n")
+            if description:
+                lines.append(f"  {_preview(description, 100)}\n")
+            lines.append(f"  Category: {item['category'] or 'uncategorized'} | Priority: {item['priority']}\n\n")
+        elif kind == "initiative":
+            lines.append(f"- **{item['title']}**\n")
+            if description:
+                lines.append(f"  {_preview(description, 100)}\n")
+            lines.append(f"  Category: {item['category'] or 'uncategorized'}\n\n")
+        elif kind == "reference":
+            lines.append(f"- **{item['title']}**\n")
+            if description:
+                lines.append(f"  {_preview(description, 100)}\n")
+            lines.append("\n")
+        elif kind == "notes":
+            lines.append(f"- **{item['title']}**\n")
+            if description:
+                desc_preview = description[:80].replace('\n', ' ')
+                lines.append(f"  {desc_preview}{'...' if len(description) > 80 else ''}\n")
+            lines.append("\n")
+        elif kind == "ambiguous":
+            lines.append(f"**Item:** {item['item']}\n")
+            if description:
+                lines.append(f"**Description:** {_preview(description, 100)}\n")
+            lines.append(f"**Issue:** {item['reason']}\n")
+            lines.append(f"**Questions:**\n")
+            for q in item['questions']:
+                lines.append(f"  - {q}\n")
+            lines.append("\n")
+        elif kind == "duplicate":
+            lines.append(f"**Item:** {item['item']}\n")
+            if description:
+                lines.append(f"**Description:** {_preview(description, 100)}\n")
+            lines.append(f"**Similar to:**\n")
+            for task, sim in item['similar'][:2]:  # Show top 2
+                lines.append(f"  - {task.title} ({task.file}) - {int(sim*100)}% match\n")
+            lines.append("\n")
+
+    def render(self) -> list[str]:
+        """Return the report as a list of strings to join"""
+        parts = [f"# Backlog Processing Summary\n\n", f"**Total items:** {self.total}\n\n"]
+        if self.skipped:
+            parts.append(
+                f"**Already processed:** {self.skipped} items from earlier runs skipped "
+                f"(pass force_full=true to include them)\n\n"
+            )
+        for kind, heading in self.SECTIONS.items():
+            if self._counts[kind]:
+                parts.append(f"{heading} ({self._counts[kind]})\n\n")
+                parts.extend(self._sections[kind])
+        return parts
+
+
+def tool_lock(name: str, arguments: Any) -> AbstractContextManager:
+    """Return the lock a tool call must hold while it runs"""
+    if name in READ_ONLY_TOOLS:
+        return nullcontext()
+    if name == "create_task":
+        return task_locks.files(task_filename(arguments["title"]), PRIORITY_CAPS_LOCK)
+    if name == "update_task_status":
+        return task_locks.files(arguments["filename"])
+    if name == "update_task_priority":
+        return task_locks.files(arguments["filename"], PRIORITY_CAPS_LOCK)
+    if name == "clear_backlog" or (name == "process_backlog" and not arguments.get("auto_create", False)):
+        return task_locks.files(BACKLOG_LOCK)
+    if name in ("prune_completed_tasks", "process_backlog", "bulk_update_tasks"):
+        return task_locks.directory()
+    return nullcontext()
+
+
 @app.call_tool()
 async def call_tool(name: str, arguments: Any) -> list[TextContent]:
-    """Handle tool calls"""
+    """Handle tool calls in a worker thread so a slow tool does not block others"""
+    return await asyncio.to_thread(run_tool, name, arguments)
+
+
+def run_tool(name: str, arguments: Any) -> list[TextContent]:
+    """Run a tool call under its lock"""
+    with tool_lock(name, arguments):
+        return handle_tool(name, arguments)
+
+
+def handle_tool(name: str, arguments: Any) -> list[TextContent]:
+    """Run a tool call (blocking)"""
     config = load_config()
 
     if name == "list_tasks":
-        tasks = get_all_tasks()
+        store = get_task_store(TASKS_DIR)
 
         # Apply filters
-        if "priority" in arguments:
-            tasks = [t for t in tasks if t["priority"] == arguments["priority"]]
-
-        if "status" in arguments:
-            tasks = [t for t in tasks if t["status"] == arguments["status"]]
-
-        if "category" in arguments:
-            tasks = [t for t in tasks if t["category"] == arguments["category"]]
+        criteria = {
+            field: arguments[field]
+            for field in ("priority", "status", "category")
+            if field in arguments
+        }
+        tasks = store.find(**criteria)
 
         if "days_old" in arguments:
             cutoff = datetime.now() - timedelta(days=arguments["days_old"])
-            tasks = [
-                t
-                for t in tasks
-                if t.get("created_date")
-                and datetime.fromisoformat(t["created_date"]) < cutoff
-            ]
+            tasks = [t for t in tasks if t.created is not None and t.created < cutoff]
+
+        try:
+            page, next_cursor = paginate(tasks, arguments, "file")
+        except ValueError as e:
+            return [TextContent(type="text", text=str(e))]
+
+        if arguments.get("format") == "json":
+            try:
+                fields = select_fields(
+                    arguments, TASK_JSON_FIELDS,
+                    ("file", "title", "priority", "status", "category"),
+                )
+            except ValueError as e:
+                return [TextContent(type="text", text=str(e))]
+            return json_response({
+                "count": len(tasks),
+                "tasks": [project_task(task, fields) for task in page],
+                "next_cursor": next_cursor,
+            })
 
         # Format output
-        result = f"Found {len(tasks)} tasks:\n\n"
-        for task in tasks:
-            result += f"- **{task['title']}** ({task['file']})\n"
-            result += f"  Priority: {task['priority']} | Status: {task['status']} | Category: {task['category']}\n\n"
+        lines = [f"Found {len(tasks)} tasks:\n\n"]
+        for task in page:
+            lines.append(f"- **{task.title}** ({task.file})\n")
+            lines.append(f"  Priority: {task.priority} | Status: {task.status} | Category: {task.category}\n\n")
+        lines.append(next_page_note(next_cursor))
 
-        return [TextContent(type="text", text=result)]
+        return [TextContent(type="text", text="".join(lines))]
 
     elif name == "get_task":
         filename = arguments["filename"]
@@ -583,25 +1464,178 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
         if not task:
             return [TextContent(type="text", text=f"Task not found: {filename}")]
 
-        result = f"# {task['title']}\n\n"
-        result += f"**File:** {task['file']}\n"
-        result += f"**Priority:** {task['priority']}\n"
-        result += f"**Status:** {task['status']}\n"
-        result += f"**Category:** {task['category']}\n"
-        result += f"**Keywords:** {', '.join(task['keywords'])}\n"
-        result += f"**Due Date:** {task.get('due_date', 'None')}\n"
-        result += f"**Created:** {task.get('created_date', 'Unknown')}\n"
-        result += f"**Updated:** {task.get('updated_date', 'Unknown')}\n\n"
-        result += f"## Description\n\n{task['body']}\n"
+        result = f"# {task.title}\n\n"
+        result += f"**File:** {task.file}\n"
+        result += f"**Priority:** {task.priority}\n"
+        result += f"**Status:** {task.status}\n"
+        result += f"**Category:** {task.category}\n"
+        result += f"**Keywords:** {', '.join(task.keywords)}\n"
+        result += f"**Due Date:** {task.due_date}\n"
+        result += f"**Created:** {task.created_date}\n"
+        result += f"**Updated:** {task.updated_date}\n\n"
+        result += f"## Description\n\n{task.body}\n"
 
         return [TextContent(type="text", text=result)]
 
+    elif name == "search_tasks":
+        filters = {
+            field: arguments[field]
+            for field in ("priority", "status", "category")
+            if field in arguments
+        }
+        limit = arguments.get("limit", DEFAULT_SEARCH_LIMIT)
+        if not isinstance(limit, int) or limit < 1:
+            return [TextContent(type="text", text="limit must be a positive integer")]
+        try:
+            fields = None
+            if arguments.get("format") == "json":
+                fields = select_fields(
+                    arguments, TASK_JSON_FIELDS + ("score", "snippet"),
+                    ("file", "title", "priority", "status", "category", "score", "snippet"),
+                )
+            total, results = search_tasks(get_task_store(TASKS_DIR), arguments["query"], filters, limit)
+        except ValueError as e:
+            return [TextContent(type="text", text=str(e))]
+        except sqlite3.Error as e:
+            return [TextContent(type="text", text=f"Search failed: {e}")]
+
+        if fields is not None:
+            return json_response({
+                "count": total,
+                "tasks": [
+                    project_task(task, fields, {"score": hit.score, "snippet": hit.snippet})
+                    for task, hit in results
+                ],
+            })
+
+        if not results:
+            return [TextContent(type="text", text=f"No tasks match: {arguments['query']}")]
+        lines = [f"Found {total} tasks matching \"{arguments['query']}\""]
+        if total > len(results):
+            lines.append(f" (showing the best {len(results)})")
+        lines.append(":\n\n")
+        for task, hit in results:
+            lines.append(f"- **{task.title}** ({task.file})\n")
+            lines.append(f"  Priority: {task.priority} | Status: {task.status} | Category: {task.category}\n")
+            lines.append(f"  > {hit.snippet}\n\n")
+        return [TextContent(type="text", text="".join(lines))]
+
+    elif name == "search_knowledge":
+        limit = arguments.get("limit", DEFAULT_SEARCH_LIMIT)
+        if not isinstance(limit, int) or limit < 1:
+            return [TextContent(type="text", text="limit must be a positive integer")]
+        try:
+            fields = None
+            if arguments.get("format") == "json":
+                fields = select_fields(arguments, KNOWLEDGE_JSON_FIELDS, KNOWLEDGE_JSON_FIELDS)
+            total, hits = search_knowledge(
+                PROJECT_ROOT,
+                arguments["query"],
+                store=get_task_store(TASKS_DIR),
+                path=arguments.get("path"),
+                since=arguments.get("since"),
+                until=arguments.get("until"),
+                limit=limit,
+            )
+        except ValueError as e:
+            return [TextContent(type="text", text=str(e))]
+        except sqlite3.Error as e:
+            return [TextContent(type="text", text=f"Search failed: {e}")]
+
+        if fields is not None:
+            return json_response({
+                "count": total,
+                "results": [{field: getattr(hit, field) for field in fields} for hit in hits],
+            })
+
+        if not hits:
+            return [TextContent(type="text", text=f"No files match: {arguments['query']}")]
+        lines = [f"Found {total} files matching \"{arguments['query']}\""]
+        if total > len(hits):
+            lines.append(f" (showing the best {len(hits)})")
+        lines.append(":\n\n")
+        for hit in hits:
+            lines.append(f"- **{hit.title}** ({hit.path}:{hit.line}, {hit.date})\n")
+            lines.append(f"  > {hit.snippet}\n\n")
+        return [TextContent(type="text", text="".join(lines))]
+
+    elif name == "semantic_search":
+        limit = arguments.get("limit", DEFAULT_SEMANTIC_LIMIT)
+        if not isinstance(limit, int) or limit < 1:
+            return [TextContent(type="text", text="limit must be a positive integer")]
+        try:
+            fields = None
+            if arguments.get("format") == "json":
+                fields = select_fields(arguments, SEMANTIC_JSON_FIELDS, SEMANTIC_JSON_FIELDS)
+            hits = semantic_search(
+                PROJECT_ROOT,
+                arguments["query"],
+                store=get_task_store(TASKS_DIR),
+                path=arguments.get("path"),
+                limit=limit,
+            )
+        except ValueError as e:
+            return [TextContent(type="text", text=str(e))]
+        except (sqlite3.Error, OSError) as e:
+            return [TextContent(type="text", text=f"Search failed: {e}")]
+
+        if fields is not None:
+            return json_response({
+                "count": len(hits),
+                "results": [{field: getattr(hit, field) for field in fields} for hit in hits],
+            })
+
+        if not hits:
+            return [TextContent(type="text", text=f"Nothing indexed is similar to: {arguments['query']}")]
+        lines = [f"{len(hits)} passages most similar to \"{arguments['query']}\":\n\n"]
+        for hit in hits:
+            lines.append(f"- **{hit.title}** ({hit.path}:{hit.line}, similarity {hit.score:.2f})\n")
+            lines.append(f"  > {hit.snippet}\n\n")
+        return [TextContent(type="text", text="".join(lines))]
+
+    elif name == "get_document_outline":
+        limit = arguments.get("limit", DEFAULT_OUTLINE_LIMIT)
+        if not isinstance(limit, int) or limit < 1:
+            return [TextContent(type="text", text="limit must be a positive integer")]
+        try:
+            fields = None
+            if arguments.get("format") == "json":
+                fields = select_fields(arguments, OUTLINE_JSON_FIELDS, DEFAULT_OUTLINE_FIELDS)
+            total, outlines = outline_documents(
+                PROJECT_ROOT,
+                path=arguments.get("path"),
+                store=get_task_store(TASKS_DIR),
+                since=arguments.get("since"),
+                until=arguments.get("until"),
+                limit=limit,
+            )
+        except ValueError as e:
+            return [TextContent(type="text", text=str(e))]
+        except sqlite3.Error as e:
+            return [TextContent(type="text", text=f"Outline failed: {e}")]
+
+        if fields is not None:
+            return json_response({
+                "count": total,
+                "documents": [outline_json(outline, fields) for outline in outlines],
+            })
+
+        where = arguments.get("path") or "knowledge/ and tasks/"
+        if not outlines:
+            return [TextContent(type="text", text=f"No files found in {where}")]
+        lines = [f"{total} files in {where}"]
+        if total > len(outlines):
+            lines.append(f" (showing the newest {len(outlines)})")
+        lines.append(":\n")
+        for outline in outlines:
+            lines.append(format_outline(outline))
+        return [TextContent(type="text", text="".join(lines))]
+
     elif name == "create_task":
         # Check priority caps
         priority = arguments["priority"]
         priority_caps = config["priority_caps"]
-        current_tasks = get_all_tasks()
-        current_count = len([t for t in current_tasks if t["priority"] == priority])
+        current_count = get_task_store(TASKS_DIR).count("priority", priority)
 
         if current_count >= priority_caps.get(priority, 999):
             return [
@@ -619,8 +1653,7 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
             )
 
         # Generate filename from title
-        filename = re.sub(r"[^a-z0-9]+", "-", arguments["title"].lower())
-        filename = filename.strip("-") + ".md"
+        filename = task_filename(arguments["title"])
         task_file = TASKS_DIR / filename
 
         # Check if file already exists
@@ -690,12 +1723,11 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
 
         # Check priority caps (excluding current task from count)
         priority_caps = config["priority_caps"]
-        current_tasks = get_all_tasks()
         current_count = len(
             [
                 t
-                for t in current_tasks
-                if t["priority"] == new_priority and t["file"] != filename
+                for t in get_task_store(TASKS_DIR).find(priority=new_priority)
+                if t.file != filename
             ]
         )
 
@@ -719,59 +1751,166 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
             )
         ]
 
+    elif name == "bulk_update_tasks":
+        store = get_task_store(TASKS_DIR)
+        try:
+            changes, errors = check_bulk_update(arguments.get("updates"), store, config["priority_caps"])
+        except ValueError as e:
+            return [TextContent(type="text", text=str(e))]
+        as_json = arguments.get("format") == "json"
+
+        if errors:
+            results = [
+                {"filename": filename, "updated": False, "error": error} for filename, error in errors.items()
+            ] + [
+                {"filename": filename, "updated": False, "error": None} for filename in changes
+            ]
+            if as_json:
+                return json_response({"updated": 0, "results": results})
+            lines = [f"No tasks updated: {len(errors)} of {len(arguments['updates'])} updates cannot be applied\n\n"]
+            lines += [f"- {result['filename']}: {result['error'] or 'ok'}\n" for result in results]
+            return [TextContent(type="text", text="".join(lines))]
+
+        # Write every changed task at once, or none
+        now = datetime.now().isoformat()
+        results = []
+        with TaskBatch(TASKS_DIR) as batch:
+            for filename, fields in changes.items():
+                task_file = TASKS_DIR / filename
+                frontmatter, body = parse_yaml_frontmatter(task_file)
+                changed = {}
+                for field, value in fields.items():
+                    old = frontmatter.get(field)
+                    old = old.isoformat() if isinstance(old, (date, datetime)) else old
+                    if old != value:
+                        changed[field] = (old, value)
+                        if value is None:
+                            frontmatter.pop(field, None)
+                        else:
+                            frontmatter[field] = value
+                if changed:
+                    frontmatter["updated_date"] = now
+                    batch.write(task_file, frontmatter, body)
+                results.append((filename, changed))
+
+        updated = sum(1 for _, changed in results if changed)
+        if as_json:
+            return json_response({
+                "updated": updated,
+                "results": [
+                    {
+                        "filename": filename,
+                        "updated": bool(changed),
+                        "changes": {field: {"from": old, "to": new} for field, (old, new) in changed.items()},
+                    }
+                    for filename, changed in results
+                ],
+            })
+        lines = [f"Updated {updated} of {len(results)} tasks\n\n"]
+        for filename, changed in results:
+            if changed:
+                described = ", ".join(
+                    f"{field} from {'unset' if old is None else old} to {'unset' if new is None else new}"
+                    for field, (old, new) in changed.items()
+                )
+                lines.append(f"- {filename}: {described}\n")
+            else:
+                lines.append(f"- {filename}: unchanged\n")
+        return [TextContent(type="text", text="".join(lines))]
+
     elif name == "get_task_summary":
-        tasks = get_all_tasks()
+        store = get_task_store(TASKS_DIR)
+        total = len(store.all())
 
         # Count by priority
         priority_counts = {"P0": 0, "P1": 0, "P2": 0, "P3": 0}
-        for task in tasks:
-            priority_counts[task["priority"]] += 1
+        for priority, count in store.value_counts("priority").items():
+            if priority in priority_counts:
+                priority_counts[priority] = count
 
         # Count by status
         status_counts = {"n": 0, "s": 0, "b": 0, "d": 0}
-        for task in tasks:
-            status_counts[task["status"]] += 1
+        for status, count in store.value_counts("status").items():
+            if status in status_counts:
+                status_counts[status] = count
 
         # Count by category
         category_counts = {}
-        for task in tasks:
-            cat = task["category"] or "uncategorized"
-            category_counts[cat] = category_counts.get(cat, 0) + 1
+        for category, count in store.value_counts("category").items():
+            cat = category or "uncategorized"
+            category_counts[cat] = category_counts.get(cat, 0) + count
+
+        if arguments.get("format") == "json":
+            sections = ("total", "priority", "status", "category")
+            try:
+                fields = select_fields(arguments, sections, sections)
+            except ValueError as e:
+                return [TextContent(type="text", text=str(e))]
+            summary = {
+                "total": total,
+                "priority": {
+                    priority: {"count": count, "cap": config["priority_caps"].get(priority, 999)}
+                    for priority, count in priority_counts.items()
+                },
+                "status": status_counts,
+                "category": dict(sorted(category_counts.items())),
+            }
+            return json_response({field: summary[field] for field in fields})
 
         # Format output
-        result = f"# Task Summary\n\n"
-        result += f"**Total Tasks:** {len(tasks)}\n\n"
+        lines = [f"# Task Summary\n\n", f"**Total Tasks:** {total}\n\n"]
 
-        result += f"## By Priority\n"
+        lines.append(f"## By Priority\n")
         for priority in ["P0", "P1", "P2", "P3"]:
             cap = config["priority_caps"].get(priority, 999)
             count = priority_counts[priority]
-            result += f"- {priority}: {count}/{cap}\n"
+            lines.append(f"- {priority}: {count}/{cap}\n")
 
-        result += f"\n## By Status\n"
+        lines.append(f"\n## By Status\n")
         status_names = {"n": "Not Started", "s": "Started", "b": "Blocked", "d": "Done"}
         for status, count in status_counts.items():
-            result += f"- {status_names[status]}: {count}\n"
+            lines.append(f"- {status_names[status]}: {count}\n")
 
-        result += f"\n## By Category\n"
+        lines.append(f"\n## By Category\n")
         for category, count in sorted(category_counts.items()):
-            result += f"- {category}: {count}\n"
+            lines.append(f"- {category}: {count}\n")
 
-        return [TextContent(type="text", text=result)]
+        return [TextContent(type="text", text="".join(lines))]
 
     elif name == "find_stale_tasks":
-        tasks = get_all_tasks()
         flag_stale_after = config["task_aging"]["flag_stale_after"]
-        cutoff = datetime.now() - timedelta(days=flag_stale_after)
+        now = datetime.now()
+        cutoff = now - timedelta(days=flag_stale_after)
 
         stale_tasks = [
             t
-            for t in tasks
-            if t["status"] == "s"
-            and t.get("updated_date")
-            and datetime.fromisoformat(t["updated_date"]) < cutoff
+            for t in get_task_store(TASKS_DIR).date_range("updated_date", end=cutoff)
+            if t.status == "s"
         ]
 
+        try:
+            page, next_cursor = paginate(stale_tasks, arguments, "updated_date")
+        except ValueError as e:
+            return [TextContent(type="text", text=str(e))]
+
+        if arguments.get("format") == "json":
+            try:
+                fields = select_fields(
+                    arguments, TASK_JSON_FIELDS + ("days_since_update",),
+                    ("file", "title", "priority", "days_since_update"),
+                )
+            except ValueError as e:
+                return [TextContent(type="text", text=str(e))]
+            return json_response({
+                "stale_after_days": flag_stale_after,
+                "count": len(stale_tasks),
+                "tasks": [
+                    project_task(task, fields, {"days_since_update": (now - task.updated).days})
+                    for task in page
+                ],
+                "next_cursor": next_cursor,
+            })
+
         if not stale_tasks:
             return [
                 TextContent(
@@ -780,51 +1919,69 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
                 )
             ]
 
-        result = f"Found {len(stale_tasks)} stale tasks (started but not updated in {flag_stale_after}+ days):\n\n"
-        for task in stale_tasks:
-            days_old = (
-                datetime.now() - datetime.fromisoformat(task["updated_date"])
-            ).days
-            result += f"- **{task['title']}** ({task['file']})\n"
-            result += f"  Last updated: {days_old} days ago | Priority: {task['priority']}\n\n"
+        lines = [f"Found {len(stale_tasks)} stale tasks (started but not updated in {flag_stale_after}+ days):\n\n"]
+        for task in page:
+            days_old = (now - task.updated).days
+            lines.append(f"- **{task.title}** ({task.file})\n")
+            lines.append(f"  Last updated: {days_old} days ago | Priority: {task.priority}\n\n")
+        lines.append(next_page_note(next_cursor))
 
-        return [TextContent(type="text", text=result)]
+        return [TextContent(type="text", text="".join(lines))]
 
     elif name == "find_overdue_tasks":
-        tasks = get_all_tasks()
         today = datetime.now().date()
+        start_of_today = datetime.combine(today, datetime.min.time())
 
         overdue_tasks = [
             t
-            for t in tasks
-            if t.get("due_date")
-            and datetime.fromisoformat(t["due_date"]).date() < today
-            and t["status"] != "d"
+            for t in get_task_store(TASKS_DIR).date_range("due_date", end=start_of_today)
+            if t.status != "d"
         ]
 
+        try:
+            page, next_cursor = paginate(overdue_tasks, arguments, "due_date")
+        except ValueError as e:
+            return [TextContent(type="text", text=str(e))]
+
+        if arguments.get("format") == "json":
+            try:
+                fields = select_fields(
+                    arguments, TASK_JSON_FIELDS + ("days_overdue",),
+                    ("file", "title", "priority", "status", "due_date", "days_overdue"),
+                )
+            except ValueError as e:
+                return [TextContent(type="text", text=str(e))]
+            return json_response({
+                "count": len(overdue_tasks),
+                "tasks": [
+                    project_task(task, fields, {"days_overdue": (today - task.due).days})
+                    for task in page
+                ],
+                "next_cursor": next_cursor,
+            })
+
         if not overdue_tasks:
             return [TextContent(type="text", text="No overdue tasks found")]
 
-        result = f"Found {len(overdue_tasks)} overdue tasks:\n\n"
-        for task in overdue_tasks:
-            days_overdue = (today - datetime.fromisoformat(task["due_date"]).date()).days
-            result += f"- **{task['title']}** ({task['file']})\n"
-            result += f"  Due: {task['due_date']} ({days_overdue} days overdue) | Priority: {task['priority']} | Status: {task['status']}\n\n"
+        lines = [f"Found {len(overdue_tasks)} overdue tasks:\n\n"]
+        for task in page:
+            days_overdue = (today - task.due).days
+            lines.append(f"- **{task.title}** ({task.file})\n")
+            lines.append(f"  Due: {task.due_date} ({days_overdue} days overdue) | Priority: {task.priority} | Status: {task.status}\n\n")
+        lines.append(next_page_note(next_cursor))
 
-        return [TextContent(type="text", text=result)]
+        return [TextContent(type="text", text="".join(lines))]
 
     elif name == "prune_completed_tasks":
-        tasks = get_all_tasks()
         prune_after = config["task_aging"]["prune_completed_after"]
-        cutoff = datetime.now() - timedelta(days=prune_after)
+        now = datetime.now()
+        cutoff = now - timedelta(days=prune_after)
         dry_run = arguments.get("dry_run", False)
 
         completed_tasks = [
             t
-            for t in tasks
-            if t["status"] == "d"
-            and t.get("updated_date")
-            and datetime.fromisoformat(t["updated_date"]) < cutoff
+            for t in get_task_store(TASKS_DIR).date_range("updated_date", end=cutoff)
+            if t.status == "d"
         ]
 
         if not completed_tasks:
@@ -837,14 +1994,14 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
 
         result = f"{'Would delete' if dry_run else 'Deleting'} {len(completed_tasks)} completed tasks older than {prune_after} days:\n\n"
         for task in completed_tasks:
-            days_old = (
-                datetime.now() - datetime.fromisoformat(task["updated_date"])
-            ).days
-            result += f"- {task['title']} ({task['file']}) - completed {days_old} days ago\n"
+            days_old = (now - task.updated).days
+            result += f"- {task.title} ({task.file}) - completed {days_old} days ago\n"
 
-            if not dry_run:
-                task_file = TASKS_DIR / task["file"]
-                task_file.unlink()
+        if not dry_run:
+            # Delete them all or none
+            with TaskBatch(TASKS_DIR) as batch:
+                for task in completed_tasks:
+                    batch.delete(TASKS_DIR / task.file)
 
         if dry_run:
             result += f"\n(Dry run - no files deleted. Run without dry_run to delete)"
@@ -852,7 +2009,6 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
         return [TextContent(type="text", text=result)]
 
     elif name == "check_duplicates":
-        existing_tasks = get_all_tasks()
         threshold = config["deduplication"]["similarity_threshold"]
 
         proposed_task = {
@@ -861,12 +2017,41 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
             "category": arguments.get("category", ""),
         }
 
-        # Find similar tasks
-        similar_tasks = []
-        for task in existing_tasks:
-            similarity = calculate_similarity(proposed_task, task, config)
-            if similarity >= threshold:
-                similar_tasks.append((task, similarity))
+        # Find similar tasks, highest similarity first
+        similar_tasks = find_similar_tasks([proposed_task], config)[0]
+        similar_tasks.sort(key=lambda x: x[1], reverse=True)
+
+        proposed_keywords = set(k.lower() for k in arguments.get("keywords", []))
+        matches = []
+        for task, similarity in similar_tasks:
+            # Explain why it matched and suggest an action based on status
+            title_match = SequenceMatcher(None, arguments["title"].lower(), task.title.lower()).ratio()
+            shared_keywords = sorted(proposed_keywords & set(k.lower() for k in task.keywords))
+            suggestion = DUPLICATE_SUGGESTIONS.get(task.status, DEFAULT_DUPLICATE_SUGGESTION)
+            matches.append((task, similarity, title_match, shared_keywords, suggestion))
+
+        if arguments.get("format") == "json":
+            try:
+                fields = select_fields(
+                    arguments,
+                    TASK_JSON_FIELDS + ("similarity", "title_match", "shared_keywords", "suggestion"),
+                    ("file", "title", "priority", "status", "category", "similarity", "shared_keywords", "suggestion"),
+                )
+            except ValueError as e:
+                return [TextContent(type="text", text=str(e))]
+            return json_response({
+                "threshold": threshold,
+                "count": len(matches),
+                "matches": [
+                    project_task(task, fields, {
+                        "similarity": round(similarity, 4),
+                        "title_match": round(title_match, 4),
+                        "shared_keywords": shared_keywords,
+                        "suggestion": suggestion[0],
+                    })
+                    for task, similarity, title_match, shared_keywords, suggestion in matches
+                ],
+            })
 
         if not similar_tasks:
             return [
@@ -876,35 +2061,19 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
                 )
             ]
 
-        # Sort by similarity (highest first)
-        similar_tasks.sort(key=lambda x: x[1], reverse=True)
-
-        result = f"⚠️  Found {len(similar_tasks)} similar tasks (threshold: {threshold}):\n\n"
-        for task, similarity in similar_tasks:
-            result += f"**{task['title']}** ({task['file']})\n"
-            result += f"- Similarity: {similarity:.2f} ({int(similarity*100)}% match)\n"
-            result += f"- Priority: {task['priority']} | Status: {task['status']} | Category: {task['category']}\n"
-
-            # Explain why it matched
-            title_match = SequenceMatcher(None, arguments["title"].lower(), task["title"].lower()).ratio()
+        lines = [f"⚠️  Found {len(similar_tasks)} similar tasks (threshold: {threshold}):\n\n"]
+        for task, similarity, title_match, shared_keywords, suggestion in matches:
+            lines.append(f"**{task.title}** ({task.file})\n")
+            lines.append(f"- Similarity: {similarity:.2f} ({int(similarity*100)}% match)\n")
+            lines.append(f"- Priority: {task.priority} | Status: {task.status} | Category: {task.category}\n")
             if title_match > 0.7:
-                result += f"- Match reason: Very similar titles ({int(title_match*100)}% title match)\n"
-
-            keyword_overlap = set(k.lower() for k in arguments.get("keywords", [])) & set(k.lower() for k in task.get("keywords", []))
-            if keyword_overlap:
-                result += f"- Shared keywords: {', '.join(keyword_overlap)}\n"
-
-            # Suggest action based on status
-            if task["status"] == "d":
-                result += f"- **Suggestion:** This task is done. You may want to reopen it instead of creating new.\n"
-            elif task["status"] == "b":
-                result += f"- **Suggestion:** This task is blocked. Consider unblocking and updating it.\n"
-            else:
-                result += f"- **Suggestion:** Update existing task with new details instead of creating duplicate.\n"
-
-            result += "\n"
+                lines.append(f"- Match reason: Very similar titles ({int(title_match*100)}% title match)\n")
+            if shared_keywords:
+                lines.append(f"- Shared keywords: {', '.join(shared_keywords)}\n")
+            lines.append(f"- **Suggestion:** {suggestion[1]}\n")
+            lines.append("\n")
 
-        return [TextContent(type="text", text=result)]
+        return [TextContent(type="text", text="".join(lines))]
 
     elif name == "process_backlog":
         backlog_file = PROJECT_ROOT / "BACKLOG.md"
@@ -912,240 +2081,66 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
         if not backlog_file.exists():
             return [TextContent(type="text", text="No BACKLOG.md found")]
 
-        with open(backlog_file, "r") as f:
-            backlog_content = f.read().strip()
-
-        if not backlog_content or backlog_content == "":
-            return [TextContent(type="text", text="BACKLOG.md is empty")]
-
-        # Parse backlog items - supports two formats:
-        # 1. Structured: ## Title followed by description lines
-        # 2. Simple: bullet points (- item)
-        lines = backlog_content.split('\n')
-        items = []
-        current_item = None
-
-        for line in lines:
-            stripped = line.strip()
-
-            # Skip empty lines
-            if not stripped:
-                continue
-
-            # Skip top-level header (# Backlog, # Test Backlog, etc.)
-            if stripped.startswith('# ') and not stripped.startswith('## '):
-                continue
+        auto_create = arguments.get("auto_create", False)
+        state_file = PROJECT_ROOT / BACKLOG_STATE_FILENAME
+        previous = {} if arguments.get("force_full", False) else load_backlog_state(state_file)
+        # Status of every item in the backlog after this run, by content hash
+        statuses: dict[str, str] = {}
+        summary = BacklogSummary()
+
+        def new_items(items: Iterable[dict]) -> Iterator[tuple[str, dict]]:
+            """Classify items earlier runs did not handle, tagging each with its hash"""
+            for item in items:
+                key = backlog_item_hash(item)
+                status = previous.get(key)
+                # Tasks that were only previewed are picked up again to be created
+                if status is not None and not (auto_create and status == "task"):
+                    statuses[key] = status
+                    summary.skipped += 1
+                    continue
+                kind, details = classify_backlog_item(item, config)
+                details["key"] = key
+                yield kind, details
 
-            # New item: ## heading format
-            if stripped.startswith('## '):
-                # Save previous item if exists
-                if current_item:
-                    items.append(current_item)
-                # Start new item with title from heading
-                title = stripped[3:].strip()
-                current_item = {"title": title, "description": ""}
-
-            # Bullet point format (standalone items)
-            elif stripped.startswith(('- ', '* ', '+ ')) and current_item is None:
-                item_text = stripped.lstrip('- ').lstrip('* ').lstrip('+ ')
-                if len(item_text) >= 5:
-                    items.append({"title": item_text, "description": ""})
-
-            # Description line for current structured item
-            elif current_item is not None:
-                # Skip sub-bullets within meeting notes, etc.
-                if stripped.startswith(('- ', '* ', '+ ')):
-                    # This is a sub-item, add to description
-                    current_item["description"] += stripped + "\n"
-                else:
-                    # Regular description text
-                    if current_item["description"]:
-                        current_item["description"] += " " + stripped
-                    else:
-                        current_item["description"] = stripped
-
-        # Don't forget the last item
-        if current_item:
-            items.append(current_item)
-
-        if not items:
+        # Stream the file: parse items, classify, dedup, then add to the summary
+        with open(backlog_file, "r") as f:
+            lines = itertools.dropwhile(lambda line: not line.strip(), f)
+            first = next(lines, None)
+            if first is None:
+                return [TextContent(type="text", text="BACKLOG.md is empty")]
+
+            items = iter_backlog_items(itertools.chain([first], lines))
+            for kind, item in dedup_backlog_candidates(new_items(items), config):
+                statuses[item["key"]] = kind
+                summary.add(kind, item)
+
+        if not summary.total:
+            if summary.skipped:
+                save_backlog_state(state_file, statuses)
+                return [TextContent(
+                    type="text",
+                    text=f"No new items in BACKLOG.md ({summary.skipped} already processed). Pass force_full=true to reprocess them.",
+                )]
             return [TextContent(type="text", text="No actionable items found in BACKLOG.md")]
 
-        # Analyze each item
-        tasks_to_create = []
-        initiatives = []
-        references = []
-        notes_to_archive = []
-        ambiguous_items = []
-        duplicates = []
-
-        existing_tasks = get_all_tasks()
-
-        for item in items:
-            title = item["title"]
-            description = item.get("description", "")
-            full_text = f"{title} {description}".strip()
-
-            # Auto-categorize using both title and description
-            category = auto_categorize(title, description, config)
-
-            # 1. Check if it's a reference (has URL) - these don't need action verbs
-            url_pattern = r'https?://[^\s]+'
-            has_url = bool(re.search(url_pattern, full_text))
-            # Only classify as reference if it has a URL or explicit reference phrases
-            reference_phrases = ["found article", "found link", "read this", "source:", "reference:"]
-            has_reference_phrase = any(phrase in full_text.lower() for phrase in reference_phrases)
-            is_reference = has_url or has_reference_phrase
-
-            if is_reference:
-                references.append({
-                    "title": title,
-                    "description": description,
-                    "category": "reference"
-                })
-                continue
-
-            # 2. Check if it's notes to archive (meeting notes, random notes)
-            notes_keywords = ["notes", "meeting notes", "standup", "retrospective"]
-            is_notes = any(kw in title.lower() for kw in notes_keywords) and description.startswith("-")
-
-            if is_notes:
-                notes_to_archive.append({
-                    "title": title,
-                    "description": description
-                })
-                continue
-
-            # 3. Check if it's an initiative (strategic, user pain point, not immediately actionable)
-            # More specific: requires combination of user-related + pain point keywords
-            initiative_indicators = [
-                "explore", "investigate", "consider", "opportunity", "idea", "strategy",
-                "users complaining", "user feedback", "users want", "users requesting",
-                "performance issue", "slow startup", "slow loading"
-            ]
-            is_initiative = any(indicator in full_text.lower() for indicator in initiative_indicators)
-
-            if is_initiative:
-                initiatives.append({
-                    "title": title,
-                    "description": description,
-                    "category": category
-                })
-                continue
-
-            # 4. Check ambiguity only for items that look like tasks
-            is_amb, reason = is_ambiguous(full_text)
-            if is_amb:
-                questions = generate_clarification_questions(full_text)
-                ambiguous_items.append({
-                    "item": title,
-                    "description": description,
-                    "reason": reason,
-                    "questions": questions
-                })
-                continue
-
-            # Check for duplicates
-            proposed = {
-                "title": title,
-                "keywords": [],
-                "category": category
-            }
-
-            similar = []
-            for task in existing_tasks:
-                similarity = calculate_similarity(proposed, task, config)
-                if similarity >= config["deduplication"]["similarity_threshold"]:
-                    similar.append((task, similarity))
-
-            if similar:
-                duplicates.append({
-                    "item": title,
-                    "description": description,
-                    "similar": similar
-                })
-                continue
-
-            # This is a valid task
-            tasks_to_create.append({
-                "title": title,
-                "description": description,
-                "category": category,
-                "priority": "P2"  # Default to P2, user can adjust
-            })
-
-        # Build summary
-        result = f"# Backlog Processing Summary\n\n"
-        result += f"**Total items:** {len(items)}\n\n"
-
-        if tasks_to_create:
-            result += f"## ✓ Tasks to Create ({len(tasks_to_create)})\n\n"
-            for task in tasks_to_create:
-                result += f"- **{task['title']}**\n"
-                if task.get('description'):
-                    result += f"  {task['description'][:100]}{'...' if len(task['description']) > 100 else ''}\n"
-                result += f"  Category: {task['category'] or 'uncategorized'} | Priority: {task['priority']}\n\n"
-
-        if initiatives:
-            result += f"## 💡 Initiatives Identified ({len(initiatives)})\n\n"
-            for init in initiatives:
-                result += f"- **{init['title']}**\n"
-                if init.get('description'):
-                    result += f"  {init['description'][:100]}{'...' if len(init['description']) > 100 else ''}\n"
-                result += f"  Category: {init['category'] or 'uncategorized'}\n\n"
-
-        if references:
-            result += f"## 📚 References to Save ({len(references)})\n\n"
-            for ref in references:
-                result += f"- **{ref['title']}**\n"
-                if ref.get('description'):
-                    result += f"  {ref['description'][:100]}{'...' if len(ref['description']) > 100 else ''}\n"
-                result += "\n"
-
-        if notes_to_archive:
-            result += f"## 📝 Notes to Archive ({len(notes_to_archive)})\n\n"
-            for note in notes_to_archive:
-                result += f"- **{note['title']}**\n"
-                if note.get('description'):
-                    desc_preview = note['description'].replace('\n', ' ')[:80]
-                    result += f"  {desc_preview}{'...' if len(note['description']) > 80 else ''}\n"
-                result += "\n"
-
-        if ambiguous_items:
-            result += f"## ⚠️  Ambiguous Items Needing Clarification ({len(ambiguous_items)})\n\n"
-            for amb in ambiguous_items:
-                result += f"**Item:** {amb['item']}\n"
-                if amb.get('description'):
-                    result += f"**Description:** {amb['description'][:100]}{'...' if len(amb['description']) > 100 else ''}\n"
-                result += f"**Issue:** {amb['reason']}\n"
-                result += f"**Questions:**\n"
-                for q in amb['questions']:
-                    result += f"  - {q}\n"
-                result += "\n"
-
-        if duplicates:
-            result += f"## 🔄 Possible Duplicates ({len(duplicates)})\n\n"
-            for dup in duplicates:
-                result += f"**Item:** {dup['item']}\n"
-                if dup.get('description'):
-                    result += f"**Description:** {dup['description'][:100]}{'...' if len(dup['description']) > 100 else ''}\n"
-                result += f"**Similar to:**\n"
-                for task, sim in dup['similar'][:2]:  # Show top 2
-                    result += f"  - {task['title']} ({task['file']}) - {int(sim*100)}% match\n"
-                result += "\n"
+        tasks_to_create = summary.tasks_to_create
+        result = summary.render()
 
         # Auto-create if requested
-        if arguments.get("auto_create", False) and tasks_to_create:
-            result += f"\n## Creating Tasks...\n\n"
+        if auto_create and tasks_to_create:
+            result.append(f"\n## Creating Tasks...\n\n")
 
+            # Create all tasks as one journaled batch
+            batch = TaskBatch(TASKS_DIR)
+            messages = []
             for task_data in tasks_to_create:
                 # Generate filename
-                filename = re.sub(r"[^a-z0-9]+", "-", task_data["title"].lower())
-                filename = filename.strip("-") + ".md"
+                filename = task_filename(task_data["title"])
                 task_file = TASKS_DIR / filename
 
-                if task_file.exists():
-                    result += f"⚠️  Skipped {filename} (already exists)\n"
+                statuses[task_data["key"]] = CREATED
+                if task_file.exists() or filename in batch:
+                    messages.append(f"⚠️  Skipped {filename} (already exists)\n")
                     continue
 
                 # Create frontmatter
@@ -1167,12 +2162,17 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
                     task_data.get("description", "")
                 )
 
-                write_task_file(task_file, frontmatter, body)
-                result += f"✓ Created {filename}\n"
+                batch.write(task_file, frontmatter, body)
+                messages.append(f"✓ Created {filename}\n")
+
+            batch.commit()
+            result.extend(messages)
         else:
-            result += f"\n**Note:** Set auto_create=true to create tasks automatically.\n"
+            result.append(f"\n**Note:** Set auto_create=true to create tasks automatically.\n")
 
-        return [TextContent(type="text", text=result)]
+        save_backlog_state(state_file, statuses)
+
+        return [TextContent(type="text", text="".join(result))]
 
     elif name == "clear_backlog":
         backlog_file = PROJECT_ROOT / "BACKLOG.md"
@@ -1205,6 +2205,7 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
         # Clear backlog
         with open(backlog_file, "w") as f:
             f.write("")
+        (PROJECT_ROOT / BACKLOG_STATE_FILENAME).unlink(missing_ok=True)
 
         if archive:
             return [TextContent(
@@ -1219,8 +2220,29 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
 
 async def main():
     """Run the MCP server"""
-    async with stdio_server() as (read_stream, write_stream):
-        await app.run(read_stream, write_stream, app.create_initialization_options())
+    watcher = None
+    server_config = load_config().get("task_manager", {})
+    try:
+        get_task_store(TASKS_DIR).configure_scan(
+            server_config.get("scan_mode", "serial"),
+            server_config.get("scan_workers"),
+        )
+    except ValueError as e:
+        print(f"{e}; scanning serially", file=sys.stderr)
+    if server_config.get("watch_tasks", False):
+        watcher = start_task_watcher(
+            TASKS_DIR,
+            debounce=server_config.get("watch_debounce_ms", 50) / 1000,
+            poll_interval=server_config.get("watch_poll_interval", 1.0),
+        )
+
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await app.run(read_stream, write_stream, app.create_initialization_options())
+    finally:
+        if watcher is not None:
+            watcher.stop()
+        get_similarity_cache(TASKS_DIR).save()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,138 @@
+"""
+Memo of title ratios for duplicate detection.
+
+score_matrix() spends nearly all of its time in SequenceMatcher.ratio(), and
+repeated check_duplicates/process_backlog runs compare the same titles again
+and again. This cache remembers ratios across calls and server restarts.
+
+Entries are keyed by a 64-bit hash of the two normalized (lowercased) titles.
+Each title is hashed once per call and the pair key is mixed from the two
+title hashes, so a lookup costs about as much as a dict access.
+Only the title ratio is cached: keyword overlap and category match are cheap
+set operations, and the config weights are applied after the lookup, so
+neither a keyword edit nor a weight change makes an entry wrong. A task whose
+title changes hashes to new keys, and its old entries age out of the LRU.
+
+The cache is saved to tasks/.similarity-cache once enough new entries have
+accumulated and when the server shuts down. It is safe to delete.
+"""
+
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+from hashlib import blake2b
+from pathlib import Path
+from typing import Optional
+
+from task_journal import atomic_write
+
+CACHE_FILENAME = ".similarity-cache"
+DEFAULT_MAX_ENTRIES = 50_000
+# Save once this many entries were added since the last save
+SAVE_AFTER = 1_000
+
+_MAGIC = b"PMSC1" + (b"L" if sys.byteorder == "little" else b"B")
+_COUNT_SIZE = 8
+
+
+_MASK = (1 << 64) - 1
+_MIX = 0x9E3779B97F4A7C15
+
+
+def title_key(title: str) -> int:
+    """Stable 64-bit hash of a normalized title, computed once per title"""
+    return int.from_bytes(blake2b(title.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def pair_key(key_a: int, key_b: int) -> int:
+    """Cache key for the ratio of two titles (by title_key), in that order"""
+    return ((key_a * _MIX) ^ key_b) & _MASK
+
+
+class TitleRatioCache:
+    """Bounded LRU of SequenceMatcher title ratios, optionally backed by a file"""
+
+    def __init__(self, path: Optional[Path] = None, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._ratios: "OrderedDict[int, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loaded = path is None
+        self._unsaved = 0
+
+    def __len__(self) -> int:
+        return len(self._ratios)
+
+    def get(self, key: int) -> Optional[float]:
+        with self._lock:
+            self._load()
+            ratio = self._ratios.get(key)
+            if ratio is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._ratios.move_to_end(key)
+            return ratio
+
+    def put(self, key: int, ratio: float) -> None:
+        with self._lock:
+            self._load()
+            self._ratios[key] = ratio
+            self._ratios.move_to_end(key)
+            while len(self._ratios) > self.max_entries:
+                self._ratios.popitem(last=False)
+            self._unsaved += 1
+
+    def save(self, min_unsaved: int = 1) -> None:
+        """Write the cache to its file if at least min_unsaved entries are new"""
+        with self._lock:
+            if self.path is None or self._unsaved < min_unsaved:
+                return
+            keys = array("Q", self._ratios.keys())
+            ratios = array("d", self._ratios.values())
+            content = _MAGIC + len(keys).to_bytes(_COUNT_SIZE, "little") + keys.tobytes() + ratios.tobytes()
+            try:
+                # Not fsynced: a lost cache is only recomputed
+                atomic_write(self.path, content, sync=False)
+            except OSError as e:
+                print(f"Similarity cache not saved ({self.path}): {e}", file=sys.stderr)
+            self._unsaved = 0
+
+    def _load(self) -> None:
+        """Read the cache file once, on first use; a missing or bad file starts empty"""
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            data = self.path.read_bytes()
+        except OSError:
+            return
+        header = len(_MAGIC) + _COUNT_SIZE
+        if not data.startswith(_MAGIC) or len(data) < header:
+            return
+        count = int.from_bytes(data[len(_MAGIC):header], "little")
+        keys, ratios = array("Q"), array("d")
+        if len(data) != header + count * (keys.itemsize + ratios.itemsize):
+            return
+        split = header + count * keys.itemsize
+        keys.frombytes(data[header:split])
+        ratios.frombytes(data[split:])
+        # Keep the most recently used entries if the file is over the bound
+        start = max(0, count - self.max_entries)
+        self._ratios.update(zip(keys[start:], ratios[start:]))
+
+
+_caches: dict[Path, TitleRatioCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_similarity_cache(tasks_dir: Path) -> TitleRatioCache:
+    """Return the shared ratio cache for a tasks directory"""
+    with _caches_lock:
+        cache = _caches.get(tasks_dir)
+        if cache is None:
+            cache = _caches[tasks_dir] = TitleRatioCache(tasks_dir / CACHE_FILENAME)
+        return cache
@@ -0,0 +1,142 @@
+"""
+Candidate generation for duplicate detection.
+
+calculate_similarity() compares titles with difflib.SequenceMatcher, which is
+too slow to run against every task for every backlog item. This index
+shortlists the tasks whose title can possibly reach a given ratio against a
+query title. Every filter is an upper bound on SequenceMatcher.ratio(), so
+scoring only the shortlist finds exactly the tasks a full pass would:
+
+- Length: ratio <= 2 * min(la, lb) / (la + lb), so only titles within a length
+  window around the query can qualify.
+- Trigrams: SequenceMatcher's matching blocks are common substrings, and two
+  consecutive blocks are separated by at least one unmatched character, so
+  titles with ratio >= r share at least (2.5 * r - 2) * (la + lb) - 2 trigram
+  occurrences. For strict ratios a candidate must then contain one of the
+  query's rarest trigrams (prefix filtering), which is a handful of postings.
+- Characters: the character multiset bound that SequenceMatcher.quick_ratio()
+  uses, which is all that is left for lenient ratios where the trigram bound
+  is vacuous.
+
+Tasks sharing a keyword with the query are always returned, since keyword
+overlap can lift a weak title match over the threshold.
+"""
+
+import math
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+from typing import Iterable
+
+# Slack so that float rounding never prunes a title sitting exactly at the ratio
+_EPSILON = 1e-9
+
+
+def _trigrams(text: str) -> Counter:
+    return Counter(text[i:i + 3] for i in range(len(text) - 2))
+
+
+class SimilarityIndex:
+    """Title length, trigram and keyword indexes over lowercased task metadata"""
+
+    def __init__(self):
+        self._titles: dict[str, str] = {}
+        self._keywords: dict[str, frozenset[str]] = {}
+        # Sorted [(title length, filename)]
+        self._by_length: list[tuple[int, str]] = []
+        # trigram -> filename -> occurrences in that title
+        self._by_trigram: dict[str, dict[str, int]] = defaultdict(dict)
+        self._by_keyword: dict[str, set[str]] = defaultdict(set)
+
+    def add(self, filename: str, title: str, keywords: Iterable[str]) -> None:
+        title = title.lower()
+        keywords = frozenset(k.lower() for k in keywords)
+        self._titles[filename] = title
+        self._keywords[filename] = keywords
+        insort(self._by_length, (len(title), filename))
+        for gram, count in _trigrams(title).items():
+            self._by_trigram[gram][filename] = count
+        for keyword in keywords:
+            self._by_keyword[keyword].add(filename)
+
+    def remove(self, filename: str) -> None:
+        title = self._titles.pop(filename, None)
+        if title is None:
+            return
+        del self._by_length[bisect_left(self._by_length, (len(title), filename))]
+        for gram in _trigrams(title):
+            postings = self._by_trigram[gram]
+            del postings[filename]
+            if not postings:
+                del self._by_trigram[gram]
+        for keyword in self._keywords.pop(filename):
+            bucket = self._by_keyword[keyword]
+            bucket.discard(filename)
+            if not bucket:
+                del self._by_keyword[keyword]
+
+    def clear(self) -> None:
+        self._titles.clear()
+        self._keywords.clear()
+        self._by_length.clear()
+        self._by_trigram.clear()
+        self._by_keyword.clear()
+
+    def candidates(self, title: str, keywords: Iterable[str], min_ratio: float) -> set[str]:
+        """
+        Return filenames that share a keyword with the query or whose title
+        could have a SequenceMatcher ratio of at least min_ratio against it.
+        """
+        names: set[str] = set()
+        for keyword in {k.lower() for k in keywords}:
+            names.update(self._by_keyword.get(keyword, ()))
+        names.update(self._title_candidates(title.lower(), min_ratio - _EPSILON))
+        return names
+
+    def _title_candidates(self, query: str, ratio: float) -> Iterable[str]:
+        if ratio <= 0:
+            return self._titles.keys()
+        if ratio > 1:
+            return ()
+
+        la = len(query)
+        lo = math.ceil(la * ratio / (2 - ratio))
+        hi = math.floor(la * (2 - ratio) / ratio)
+        grams = _trigrams(query)
+
+        # Fewest shared trigram occurrences a title of length lb needs
+        def needed(lb: int) -> int:
+            return math.floor((2.5 * ratio - 2) * (la + lb) - 2)
+
+        if needed(lo) >= 1:
+            # A title sharing none of the first `total - needed + 1` rarest
+            # occurrences shares at most needed - 1
+            prefix = sum(grams.values()) - needed(lo) + 1
+            if prefix <= 0:
+                return ()
+            names: set[str] = set()
+            covered = 0
+            for gram in sorted(grams, key=lambda g: len(self._by_trigram.get(g, ()))):
+                names.update(self._by_trigram.get(gram, ()))
+                covered += grams[gram]
+                if covered >= prefix:
+                    break
+            window = []
+            for name in names:
+                length = len(self._titles[name])
+                if lo <= length <= hi and sum(
+                    min(count, self._by_trigram.get(gram, {}).get(name, 0))
+                    for gram, count in grams.items()
+                ) >= needed(length):
+                    window.append((length, name))
+        else:
+            start = bisect_left(self._by_length, (lo,))
+            end = bisect_left(self._by_length, (hi + 1,))
+            window = self._by_length[start:end]
+
+        chars = Counter(query)
+        matches = []
+        for length, name in window:
+            total = la + length
+            if total == 0 or 2.0 * sum((chars & Counter(self._titles[name])).values()) / total >= ratio:
+                matches.append(name)
+        return matches
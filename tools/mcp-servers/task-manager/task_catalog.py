@@ -0,0 +1,157 @@
+"""
+Persistent SQLite catalog mirroring task frontmatter.
+
+The catalog lives next to the task files (tasks/.index.sqlite) and records the
+frontmatter fields, body hash and file signature of every task. A freshly
+started server hydrates its in-memory index from it and only re-parses files
+whose signature no longer matches, so the first tool call of a session does
+not pay for parsing every task. Dates are stored as ISO strings and turned
+back into date/datetime objects on load, so a task hydrated from the catalog
+is the same as one parsed from its file.
+"""
+
+import hashlib
+import json
+import sqlite3
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+CATALOG_FILENAME = ".index.sqlite"
+SCHEMA_VERSION = 2
+
+# (signature, frontmatter) as recorded for one file
+CatalogRow = tuple[tuple[int, int, int], dict]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    file TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    title TEXT,
+    priority TEXT,
+    status TEXT,
+    category TEXT,
+    keywords TEXT,
+    due_date TEXT,
+    created_date TEXT,
+    updated_date TEXT,
+    body_hash TEXT,
+    date_types TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_priority ON tasks (priority);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status);
+CREATE INDEX IF NOT EXISTS tasks_due_date ON tasks (due_date);
+"""
+
+_FIELDS = ("title", "priority", "status", "category", "keywords",
+           "due_date", "created_date", "updated_date")
+_DATE_FIELDS = ("due_date", "created_date", "updated_date")
+
+
+def body_hash(body: str) -> str:
+    """Stable hash of a task body"""
+    return hashlib.sha1(body.encode("utf-8")).hexdigest()
+
+
+def _to_column(field: str, value: Any) -> Any:
+    if value is None:
+        return None
+    if field == "keywords":
+        return json.dumps(list(value) if isinstance(value, (list, tuple)) else value, default=str)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (int, float, str)):
+        return value
+    return str(value)
+
+
+def _from_column(field: str, value: Any) -> Any:
+    if field == "keywords":
+        return json.loads(value) if value is not None else []
+    return value
+
+
+def _date_types(task: Any) -> Optional[str]:
+    """Record which date fields were YAML dates or timestamps rather than strings"""
+    types = {}
+    for field in _DATE_FIELDS:
+        value = task.get(field)
+        if isinstance(value, datetime):
+            types[field] = "datetime"
+        elif isinstance(value, date):
+            types[field] = "date"
+    return json.dumps(types) if types else None
+
+
+def _restore_dates(frontmatter: dict, date_types: Optional[str]) -> None:
+    for field, kind in json.loads(date_types or "{}").items():
+        value = frontmatter.get(field)
+        if isinstance(value, str):
+            parsed = datetime.fromisoformat(value)
+            frontmatter[field] = parsed if kind == "datetime" else parsed.date()
+
+
+class TaskCatalog:
+    """SQLite mirror of task frontmatter, keyed by filename"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                conn.execute("DROP TABLE IF EXISTS tasks")
+                conn.executescript(_SCHEMA)
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+                conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def load(self) -> dict[str, CatalogRow]:
+        """Return every recorded file with its signature and frontmatter"""
+        if not self.path.parent.exists():
+            return {}
+        rows = self._connect().execute(
+            f"SELECT file, mtime_ns, size, inode, date_types, {', '.join(_FIELDS)} FROM tasks"
+        )
+        catalog = {}
+        for row in rows:
+            frontmatter = {
+                field: _from_column(field, value)
+                for field, value in zip(_FIELDS, row[5:])
+                if value is not None
+            }
+            _restore_dates(frontmatter, row[4])
+            catalog[row[0]] = ((row[1], row[2], row[3]), frontmatter)
+        return catalog
+
+    def sync(
+        self,
+        upserts: Iterable[tuple[str, tuple[int, int, int], dict, str]],
+        deletes: Iterable[str],
+    ) -> None:
+        """Apply (file, signature, task, body hash) upserts and deletions in one transaction"""
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO tasks VALUES ({', '.join('?' * 14)})",
+                [
+                    (filename, *signature,
+                     *(_to_column(field, task.get(field)) for field in _FIELDS),
+                     digest, _date_types(task))
+                    for filename, signature, task, digest in upserts
+                ],
+            )
+            conn.executemany(
+                "DELETE FROM tasks WHERE file = ?", [(filename,) for filename in deletes]
+            )
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -0,0 +1,202 @@
+"""
+Crash-safe writes for task files.
+
+A single file is replaced atomically: the new content is written to a hidden
+temp file in the same directory, fsynced and renamed over the original, so
+readers see either the old file or the new one, never a truncated mix. Temp
+files are named after the writing process and a random suffix, so writers in
+different processes never share one.
+
+Several changes are committed as one unit through a write-ahead journal
+(tasks/.journal-*, one per batch and named after the writing process). The
+journal is written and fsynced first; once it is in place the batch is
+committed. Each new file is then fsynced and renamed into place, the
+directory is fsynced once, and only then is the journal removed. If a process
+dies while applying a batch, the next process to open the tasks directory
+replays the journal, so a batch is either fully applied or not applied at all.
+Journals and temp files of processes that are still running are left alone,
+so several servers can share one project.
+"""
+
+import itertools
+import json
+import os
+import re
+import secrets
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+JOURNAL_PREFIX = ".journal"
+JOURNAL_VERSION = 1
+TEMP_SUFFIX = ".tmp"
+
+# One change in a batch: (filename, new content), content None for a delete
+JournalEntry = tuple[str, Optional[str]]
+
+# Identifies this process's journals even if a crashed process had the same pid
+_PROCESS_TOKEN = secrets.token_hex(4)
+
+# .journal-<time>-<pid>-<token>-<n>, and .<name>.<pid>-<random>.tmp
+_JOURNAL_OWNER_RE = re.compile(r"-\d+-(\d+)-([0-9a-f]+)-\d+$")
+_TEMP_OWNER_RE = re.compile(r"\.(\d+)-[0-9a-f]+" + re.escape(TEMP_SUFFIX) + "$")
+
+
+def _temp_path(path: Path) -> Path:
+    # Hidden and not ending in .md, so the store and watcher ignore it
+    return path.with_name(f".{path.name}.{os.getpid()}-{secrets.token_hex(4)}{TEMP_SUFFIX}")
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    if os.name != "posix":
+        # os.kill would terminate the process on Windows; treat it as gone
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _fsync_dir(directory: Path) -> None:
+    """Persist renames and unlinks in directory, where the platform allows it"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _replace(path: Path, content: Union[str, bytes], sync: bool) -> None:
+    """Write content to a temp file and rename it over path"""
+    temp = _temp_path(path)
+    try:
+        with open(temp, "wb" if isinstance(content, bytes) else "w") as f:
+            f.write(content)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp, path)
+    except BaseException:
+        temp.unlink(missing_ok=True)
+        raise
+
+
+def atomic_write(path: Path, content: Union[str, bytes], sync: bool = True) -> None:
+    """
+    Replace path with content (text or bytes) via a temp file and rename.
+
+    With sync=False nothing is fsynced, for callers that can afford to lose the
+    change in a crash (caches, bookkeeping that is rebuilt when missing).
+    """
+    _replace(path, content, sync)
+    if sync:
+        _fsync_dir(path.parent)
+
+
+def _apply(directory: Path, entries: list[JournalEntry]) -> None:
+    """Apply a batch and make it durable, so its journal can be removed"""
+    for filename, content in entries:
+        path = directory / filename
+        if content is None:
+            path.unlink(missing_ok=True)
+        else:
+            _replace(path, content, sync=True)
+    _fsync_dir(directory)
+
+
+_journal_ids = itertools.count()
+
+
+def _journal_path(directory: Path) -> Path:
+    # Sorts in commit order, unique across threads and processes
+    name = f"{JOURNAL_PREFIX}-{time.time_ns():020d}-{os.getpid()}-{_PROCESS_TOKEN}-{next(_journal_ids)}"
+    return directory / name
+
+
+def _is_journal(name: str) -> bool:
+    return name.startswith(JOURNAL_PREFIX) and not name.endswith(TEMP_SUFFIX)
+
+
+def _journal_abandoned(name: str) -> bool:
+    """Whether the process that wrote a journal is gone"""
+    match = _JOURNAL_OWNER_RE.search(name)
+    if match is None:
+        # Written before journals carried their owner
+        return True
+    pid, token = match.groups()
+    if token == _PROCESS_TOKEN:
+        return False
+    return not _pid_alive(int(pid))
+
+
+def _temp_abandoned(name: str) -> bool:
+    """Whether the process that wrote a temp file is gone"""
+    match = _TEMP_OWNER_RE.search(name)
+    return match is None or not _pid_alive(int(match.group(1)))
+
+
+def commit_batch(directory: Path, entries: list[JournalEntry]) -> None:
+    """Apply writes and deletes in directory as one journaled unit"""
+    if not entries:
+        return
+    journal = _journal_path(directory)
+    record = {"version": JOURNAL_VERSION, "entries": entries}
+    atomic_write(journal, json.dumps(record))
+    _apply(directory, entries)
+    journal.unlink()
+
+
+def recover(directory: Path) -> list[str]:
+    """
+    Finish batches left behind by crashed processes and remove their temp files.
+
+    Journals are replayed in commit order. Journals and temp files of running
+    processes are left alone. Returns the filenames the replayed batches
+    touched.
+    """
+    touched: list[str] = []
+    try:
+        journals = sorted(
+            name for name in os.listdir(directory)
+            if _is_journal(name) and _journal_abandoned(name)
+        )
+    except FileNotFoundError:
+        journals = []
+
+    for name in journals:
+        journal = directory / name
+        try:
+            record = json.loads(journal.read_text())
+        except FileNotFoundError:
+            continue
+        except ValueError:
+            # Only a complete journal is ever renamed into place
+            record = {"entries": []}
+
+        entries = [(filename, content) for filename, content in record.get("entries", [])]
+        _apply(directory, entries)
+        journal.unlink()
+        touched.extend(filename for filename, _ in entries)
+
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                if (
+                    entry.name.startswith(".")
+                    and entry.name.endswith(TEMP_SUFFIX)
+                    and _temp_abandoned(entry.name)
+                ):
+                    Path(entry.path).unlink(missing_ok=True)
+    except FileNotFoundError:
+        pass
+    return touched
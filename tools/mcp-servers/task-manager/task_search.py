@@ -0,0 +1,351 @@
+"""
+Full-text search over task files.
+
+The task store only reads frontmatter, so searching task bodies needs an index
+of its own. TaskSearchIndex keeps an SQLite FTS5 table of every task's title,
+keywords and body in tasks/.search.sqlite and brings it up to date lazily,
+before each search: the store's file signatures are compared with the ones
+recorded in the index, and only new or changed files are read and re-indexed.
+The first search against a fresh index reads every body once; later searches
+only pay for what changed, and nothing at all when the store has not changed.
+
+Results are ranked by BM25 with title matches weighted above keyword matches
+and keyword matches above body matches. Text is tokenized with the porter
+stemmer, so "bugs" finds "bug". Priority, status and category are indexed as
+facet tokens in a column of their own (weight 0), so a filter is one more term
+of the full-text query rather than a check on every matching row. Each
+field/value pair is one token, so a filter matches the whole value exactly.
+
+Snippets are cut from the stored text of the returned tasks only. FTS5's
+snippet() needs the position lists of every query term, which for common
+words costs more than the rest of the query.
+"""
+
+import re
+import sqlite3
+import sys
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+from task_store import FileSignature, Task, TaskStore
+
+SEARCH_INDEX_FILENAME = ".search.sqlite"
+SCHEMA_VERSION = 2
+
+# BM25 column weights: title, keywords, body (facets never count)
+TITLE_WEIGHT = 10.0
+KEYWORDS_WEIGHT = 5.0
+BODY_WEIGHT = 1.0
+
+# Words around each match in a snippet
+SNIPPET_WORDS = 16
+
+FILTER_FIELDS = ("priority", "status", "category")
+
+_SCHEMA = f"""
+CREATE TABLE files (
+    doc INTEGER PRIMARY KEY,
+    file TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    inode INTEGER NOT NULL
+);
+CREATE VIRTUAL TABLE task_text USING fts5(
+    title, keywords, body, facets,
+    tokenize = 'porter unicode61'
+);
+INSERT INTO task_text (task_text, rank)
+    VALUES ('rank', 'bm25({TITLE_WEIGHT}, {KEYWORDS_WEIGHT}, {BODY_WEIGHT}, 0.0)');
+"""
+
+_WORD_RE = re.compile(r"\w+")
+_SPACE_RE = re.compile(r"\s+")
+# Suffixes dropped when matching words for snippet highlights
+_SUFFIXES = ("ing", "ed", "es", "s")
+
+
+@dataclass
+class SearchHit:
+    file: str
+    # Higher is better (negated BM25)
+    score: float
+    # Best matching passage, matches wrapped in **
+    snippet: str
+
+
+def _facet(field: str, value: str) -> str:
+    # One token per field and value: the value's bytes as 3-digit decimals
+    # after a 0, so the tokenizer cannot split it and the stemmer leaves it be
+    return field + "0" + "".join(f"{byte:03d}" for byte in str(value).encode())
+
+
+def _quote(text: str) -> str:
+    return '"' + text.replace('"', '""') + '"'
+
+
+def query_words(query: str) -> list[str]:
+    """Return the words of a search query, raising ValueError if there are none"""
+    words = _WORD_RE.findall(query)
+    if not words:
+        raise ValueError("Search query must contain at least one word")
+    return words
+
+
+def match_expression(
+    query: str,
+    filters: Optional[dict[str, str]] = None,
+    columns: Sequence[str] = ("title", "keywords", "body"),
+) -> str:
+    """
+    Turn free text into an FTS5 query for rows containing every word in columns.
+
+    Words are quoted, so FTS5 syntax in the input (AND, NEAR, column filters,
+    quotes) is searched for literally instead of being interpreted. filters
+    maps priority, status or category to the required value. Raises
+    ValueError for a query without words or an unknown filter.
+    """
+    words = query_words(query)
+    expression = "{" + " ".join(columns) + "} : (" + " ".join(_quote(word) for word in words) + ")"
+    for field, value in (filters or {}).items():
+        if field not in FILTER_FIELDS:
+            raise ValueError(f"Cannot filter search results by {field}")
+        expression += f" AND facets : {_quote(_facet(field, value))}"
+    return expression
+
+
+@lru_cache(maxsize=64)
+def highlight_pattern(words: tuple[str, ...]) -> re.Pattern:
+    """
+    Match the query words and their inflected forms, as a rough stand-in for
+    the index's porter stemmer: a word matches if it is a query word, or a
+    query word without an inflection suffix, plus an optional suffix.
+    """
+    forms = set()
+    for word in words:
+        word = word.lower()
+        forms.add(word)
+        forms.update(
+            word[:-len(suffix)]
+            for suffix in _SUFFIXES
+            if word.endswith(suffix) and len(word) - len(suffix) >= 3
+        )
+    alternatives = "|".join(sorted(map(re.escape, forms), key=len, reverse=True))
+    return re.compile(rf"\b(?:{alternatives})(?:{'|'.join(_SUFFIXES)})?\b", re.IGNORECASE)
+
+
+def make_snippet(text: str, words: Iterable[str], size: int = SNIPPET_WORDS) -> str:
+    """
+    Return the `size`-word passage of text with the most query words, matches in **.
+
+    The odd word the index matched through stemming may go unhighlighted.
+    Returns "" if no word matches.
+    """
+    hits_at = [m.start() for m in highlight_pattern(tuple(words)).finditer(text)]
+    if not hits_at:
+        return ""
+    spans = [m.span() for m in _WORD_RE.finditer(text)]
+    starts = [span[0] for span in spans]
+    hits = [bisect_left(starts, position) for position in hits_at]
+
+    # Window start with the most hits among the next `size` words
+    best, best_count, j = hits[0], 0, 0
+    for i, start in enumerate(hits):
+        while j < len(hits) and hits[j] < start + size:
+            j += 1
+        if j - i > best_count:
+            best, best_count = start, j - i
+    start = max(0, min(best - 2, len(spans) - size))
+    end = min(len(spans), start + size)
+
+    parts = ["…" if start > 0 else ""]
+    cursor = spans[start][0] if start > 0 else 0
+    for i in hits:
+        if start <= i < end:
+            word_start, word_end = spans[i]
+            parts += [text[cursor:word_start], "**", text[word_start:word_end], "**"]
+            cursor = word_end
+    if end < len(spans):
+        parts += [text[cursor:spans[end - 1][1]], "…"]
+    else:
+        parts.append(text[cursor:])
+    return _SPACE_RE.sub(" ", "".join(parts)).strip()
+
+
+class TaskSearchIndex:
+    """FTS5 index of task text, synced from a TaskStore by file signature"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # file -> (doc id, signature) as recorded in the index
+        self._docs: Optional[dict[str, tuple[int, FileSignature]]] = None
+        self._store_version: Optional[int] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            try:
+                version = conn.execute("PRAGMA user_version").fetchone()[0]
+            except sqlite3.DatabaseError:
+                # Not a database: start over
+                conn.close()
+                self.path.unlink(missing_ok=True)
+                conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+                version = 0
+            if version != SCHEMA_VERSION:
+                conn.executescript("DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS task_text;")
+                conn.executescript(_SCHEMA)
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+                conn.commit()
+            self._conn = conn
+            self._docs = {
+                file: (doc, (mtime_ns, size, inode))
+                for doc, file, mtime_ns, size, inode in conn.execute("SELECT * FROM files")
+            }
+        return self._conn
+
+    def sync(self, store: TaskStore) -> int:
+        """
+        Re-index tasks that changed in store since the last sync.
+
+        Returns the number of files (re)indexed or removed.
+        """
+        with self._lock:
+            conn = self._connect()
+            version, entries = store.snapshot(since=self._store_version)
+            if entries is None:
+                return 0
+
+            docs = self._docs
+            changed = [
+                (filename, signature, task)
+                for filename, (signature, task) in entries.items()
+                if docs.get(filename, (None, None))[1] != signature
+            ]
+            removed = [filename for filename in docs if filename not in entries]
+
+            try:
+                with conn:
+                    for filename in removed:
+                        doc, _ = docs.pop(filename)
+                        conn.execute("DELETE FROM task_text WHERE rowid = ?", (doc,))
+                        conn.execute("DELETE FROM files WHERE doc = ?", (doc,))
+                    for filename, signature, task in changed:
+                        self._index(conn, filename, signature, task)
+            except sqlite3.Error:
+                # The transaction was rolled back; reload what the file holds next time
+                self._close()
+                raise
+            self._store_version = version
+            return len(changed) + len(removed)
+
+    def _index(self, conn: sqlite3.Connection, filename: str, signature: FileSignature, task: Task) -> None:
+        known = self._docs.get(filename)
+        if known is None:
+            doc = conn.execute(
+                "INSERT INTO files (file, mtime_ns, size, inode) VALUES (?, ?, ?, ?)",
+                (filename, *signature),
+            ).lastrowid
+        else:
+            doc = known[0]
+            conn.execute("DELETE FROM task_text WHERE rowid = ?", (doc,))
+            conn.execute(
+                "UPDATE files SET mtime_ns = ?, size = ?, inode = ? WHERE doc = ?",
+                (*signature, doc),
+            )
+        # A file changing between the stat and this read is indexed under the
+        # older signature and simply re-read on the next sync
+        facets = " ".join(_facet(field, getattr(task, field)) for field in FILTER_FIELDS)
+        conn.execute(
+            "INSERT INTO task_text (rowid, title, keywords, body, facets) VALUES (?, ?, ?, ?, ?)",
+            (doc, task.title, " ".join(task.keywords), task.body, facets),
+        )
+        self._docs[filename] = (doc, signature)
+
+    def search(
+        self, query: str, filters: Optional[dict[str, str]] = None, limit: int = 20
+    ) -> tuple[int, list[SearchHit]]:
+        """
+        Return the number of matching tasks and the best `limit` of them.
+
+        filters maps priority, status or category to the required value.
+        Raises ValueError for a query without words.
+        """
+        expression = match_expression(query, filters)
+        words = query_words(query)
+
+        with self._lock:
+            conn = self._connect()
+            total = conn.execute(
+                "SELECT count(*) FROM task_text WHERE task_text MATCH ?", (expression,)
+            ).fetchone()[0]
+            # FTS5 sorts by rank itself, so only the returned rows' text is read
+            rows = conn.execute(
+                "SELECT rowid, rank, title, keywords, body FROM task_text "
+                "WHERE task_text MATCH ? ORDER BY rank LIMIT ?",
+                (expression, limit),
+            ).fetchall()
+            docs = [row[0] for row in rows]
+            files = dict(conn.execute(
+                f"SELECT doc, file FROM files WHERE doc IN ({', '.join('?' * len(docs))})", docs
+            ))
+
+        hits = []
+        for doc, rank, title, keywords, body in rows:
+            snippet = make_snippet(body, words) or make_snippet(title, words) or make_snippet(keywords, words)
+            hits.append(SearchHit(files[doc], round(-rank, 4), snippet))
+        return total, hits
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        self._docs = None
+        self._store_version = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+
+_indexes: dict[Path, TaskSearchIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_search_index(tasks_dir: Path) -> TaskSearchIndex:
+    """Return the shared search index for a tasks directory"""
+    with _indexes_lock:
+        index = _indexes.get(tasks_dir)
+        if index is None:
+            index = _indexes[tasks_dir] = TaskSearchIndex(tasks_dir / SEARCH_INDEX_FILENAME)
+        return index
+
+
+def search_tasks(store: TaskStore, query: str, filters: Optional[dict[str, str]] = None,
+                 limit: int = 20) -> tuple[int, list[tuple[Task, SearchHit]]]:
+    """
+    Sync the search index for store's directory and run a query against it.
+
+    Hits whose task disappeared since the sync are left out.
+    """
+    if not store.tasks_dir.exists():
+        match_expression(query)
+        return 0, []
+    index = get_search_index(store.tasks_dir)
+    try:
+        index.sync(store)
+    except sqlite3.Error as e:
+        # Searching a slightly stale index beats failing the call
+        print(f"Search index not updated ({index.path}): {e}", file=sys.stderr)
+    total, hits = index.search(query, filters, limit)
+    results = []
+    for hit in hits:
+        task = store.get(hit.file)
+        if task is not None:
+            results.append((task, hit))
+    return total, results
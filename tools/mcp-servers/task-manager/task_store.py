@@ -0,0 +1,694 @@
+"""
+In-process task store for the task-manager MCP server.
+
+Parsed task files are kept in memory for the lifetime of the server process
+as compact Task records, keyed by filename. Dates are parsed once, when a file
+is loaded. Each refresh stats the tasks directory and re-parses only
+files whose mtime, size or inode changed since the previous scan, so repeated
+tool calls stay cheap regardless of how many tasks exist.
+
+The store also maintains secondary indexes: an inverted index per categorical
+field (priority, status, category) and a sorted index per date field
+(created, updated, due), so filtering and date-based queries are set lookups
+and range scans instead of full passes over every task. A similarity index
+(see similarity_index.py) shortlists duplicate candidates the same way.
+
+When a watcher is attached (see task_watcher.py) the store stops scanning the
+directory on reads; the watcher pushes changed filenames in instead.
+
+Only frontmatter is parsed when a file is indexed; the body is hashed for the
+catalog and dropped. Task bodies are read from disk again when a caller
+actually accesses them, so the index never holds the markdown bodies.
+
+Parsed frontmatter is mirrored to a SQLite catalog (see task_catalog.py) so a
+new server process can hydrate the index without re-parsing unchanged files.
+
+Task files are written atomically, and TaskBatch commits many changes as one
+journaled unit (see task_journal.py).
+
+Large scans (a cold start without a catalog, a git checkout touching thousands
+of files) can parse frontmatter on a thread or process pool; see
+configure_scan().
+"""
+
+import multiprocessing
+import os
+import sqlite3
+import sys
+import threading
+from bisect import bisect_left, insort
+from collections import defaultdict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime, time
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+import yaml
+
+from frontmatter import parse_yaml_frontmatter, read_task_body
+from similarity_index import SimilarityIndex
+from task_catalog import CATALOG_FILENAME, TaskCatalog, body_hash
+from task_journal import JournalEntry, atomic_write, commit_batch, recover
+
+
+# A file is re-parsed only when this signature changes
+FileSignature = tuple[int, int, int]
+
+INDEXED_FIELDS = ("priority", "status", "category")
+DATE_FIELDS = ("created_date", "updated_date", "due_date")
+
+SCAN_MODES = ("serial", "threads", "processes")
+# Below this many files to parse, handing them to a pool costs more than it saves
+PARALLEL_SCAN_MIN_FILES = 200
+
+
+def render_task_file(frontmatter: dict, body: str) -> str:
+    """Return the file content for a task: YAML frontmatter followed by the body"""
+    yaml_str = yaml.dump(frontmatter, default_flow_style=False, sort_keys=False)
+    return f"---\n{yaml_str}---\n\n{body}\n"
+
+
+def write_task_file(file_path: Path, frontmatter: dict, body: str):
+    """Atomically write task file with YAML frontmatter"""
+    atomic_write(file_path, render_task_file(frontmatter, body))
+    notify_changed(file_path)
+
+
+class TaskBatch:
+    """
+    Task file writes and deletes committed together on exit.
+
+        with TaskBatch(TASKS_DIR) as batch:
+            batch.write(path, frontmatter, body)
+            batch.delete(other_path)
+
+    Nothing touches disk until the block exits without an exception; the
+    changes are then applied as one journaled unit, so a crash leaves either
+    all of them or none.
+    """
+
+    def __init__(self, tasks_dir: Path):
+        self.tasks_dir = tasks_dir
+        self._entries: dict[str, Optional[str]] = {}
+
+    def __enter__(self) -> "TaskBatch":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.commit()
+
+    def __contains__(self, filename: str) -> bool:
+        return filename in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def write(self, file_path: Path, frontmatter: dict, body: str) -> None:
+        self._entries[file_path.name] = render_task_file(frontmatter, body)
+
+    def delete(self, file_path: Path) -> None:
+        self._entries[file_path.name] = None
+
+    def commit(self) -> None:
+        entries: list[JournalEntry] = list(self._entries.items())
+        self._entries = {}
+        commit_batch(self.tasks_dir, entries)
+        for filename, _ in entries:
+            notify_changed(self.tasks_dir / filename)
+
+
+def read_task_metadata(file_path: Path) -> tuple[dict, str]:
+    """Parse a task file's frontmatter and hash its body, reading the file once"""
+    frontmatter, body = parse_yaml_frontmatter(file_path)
+    return frontmatter, body_hash(body)
+
+
+def parse_date(value: Any) -> Optional[datetime]:
+    """
+    Normalize a frontmatter date to a naive datetime.
+
+    Accepts ISO strings as well as the date/datetime objects YAML produces for
+    unquoted dates. Returns None for missing or unparseable values.
+    """
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    elif isinstance(value, str) and value:
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    else:
+        return None
+
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+def _intern(value: Any, default: str) -> str:
+    """Intern a categorical value so every task holding it shares one string"""
+    if value is None:
+        return default
+    return sys.intern(value if isinstance(value, str) else str(value))
+
+
+def _keywords(value: Any) -> tuple[str, ...]:
+    if value is None:
+        return ()
+    if not isinstance(value, (list, tuple)):
+        value = [value]
+    return tuple(sys.intern(k if isinstance(k, str) else str(k)) for k in value)
+
+
+# Keys readable through Task's mapping interface
+TASK_KEYS = frozenset({
+    "file", "path", "title", "priority", "status", "category", "keywords",
+    "due_date", "created_date", "updated_date", "body",
+})
+
+
+@dataclass(slots=True, eq=False)
+class Task:
+    """
+    Metadata of one task file.
+
+    The frontmatter dates are kept as written (for display) alongside their
+    parsed forms `due`, `created` and `updated`, which handlers use for date
+    arithmetic. The body is read from disk on access unless it was supplied
+    when the task was built.
+
+    Tasks also support read-only mapping access (`task["title"]`,
+    `task.get("keywords")`) so they can be passed where a task dict is expected.
+    """
+
+    file: str
+    path: str
+    title: str = ""
+    priority: str = "P3"
+    status: str = "n"
+    category: str = ""
+    keywords: tuple[str, ...] = ()
+    due_date: Any = None
+    created_date: Any = None
+    updated_date: Any = None
+    due: Optional[date] = None
+    created: Optional[datetime] = None
+    updated: Optional[datetime] = None
+    _body: Optional[str] = field(default=None, repr=False)
+
+    @classmethod
+    def from_frontmatter(
+        cls, task_file: Path, frontmatter: dict, body: Optional[str] = None
+    ) -> "Task":
+        """
+        Build a task from parsed frontmatter.
+
+        Without a body the task reads it lazily from task_file on access.
+        """
+        title = frontmatter.get("title")
+        due = parse_date(frontmatter.get("due_date"))
+        return cls(
+            file=task_file.name,
+            path=str(task_file),
+            title="" if title is None else str(title),
+            priority=_intern(frontmatter.get("priority"), "P3"),
+            status=_intern(frontmatter.get("status"), "n"),
+            category=_intern(frontmatter.get("category"), ""),
+            keywords=_keywords(frontmatter.get("keywords")),
+            due_date=frontmatter.get("due_date"),
+            created_date=frontmatter.get("created_date"),
+            updated_date=frontmatter.get("updated_date"),
+            due=due.date() if due is not None else None,
+            created=parse_date(frontmatter.get("created_date")),
+            updated=parse_date(frontmatter.get("updated_date")),
+            _body=body,
+        )
+
+    @property
+    def body(self) -> str:
+        """The markdown body, read from disk unless supplied up front"""
+        if self._body is not None:
+            return self._body
+        try:
+            return read_task_body(Path(self.path))
+        except FileNotFoundError:
+            return ""
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in TASK_KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in TASK_KEYS
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in TASK_KEYS else default
+
+
+def _date_key(task: Task, field: str) -> Optional[datetime]:
+    """Return a task's parsed date for a DATE_FIELDS entry as a datetime"""
+    if field == "due_date":
+        return datetime.combine(task.due, time()) if task.due is not None else None
+    return task.created if field == "created_date" else task.updated
+
+
+def file_signature(stat: os.stat_result) -> FileSignature:
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def _is_task_file(name: str) -> bool:
+    return name.endswith(".md") and name != "README.md"
+
+
+class TaskStore:
+    """
+    Long-lived index of parsed task files for one tasks directory.
+
+    Task records returned by the store are shared between callers and must be
+    treated as read-only; write changes to disk and the next refresh picks
+    them up.
+
+    Without a watcher every read rescans the directory by signature. While a
+    watcher is attached, reads only apply filenames marked dirty by the
+    watcher or by notify_changed().
+    """
+
+    def __init__(self, tasks_dir: Path, catalog: Optional[TaskCatalog] = None):
+        self.tasks_dir = tasks_dir
+        self.catalog = catalog
+        self._catalog_rows: Optional[dict] = None
+        self._catalog_upserts: dict[str, tuple[FileSignature, Task, str]] = {}
+        self._catalog_deletes: set[str] = set()
+        self._lock = threading.RLock()
+        self._watching = False
+        self._dirty: set[str] = set()
+        self._entries: dict[str, tuple[FileSignature, Task]] = {}
+        self._ordered: Optional[list[Task]] = None
+        # Bumped whenever a task is loaded or dropped (see snapshot())
+        self._version = 0
+        # field -> value -> filenames
+        self._by_field: dict[str, dict[Any, set[str]]] = {
+            field: defaultdict(set) for field in INDEXED_FIELDS
+        }
+        # field -> sorted [(datetime, filename)], plus field -> filename -> datetime
+        self._by_date: dict[str, list[tuple[datetime, str]]] = {
+            field: [] for field in DATE_FIELDS
+        }
+        self._dates: dict[str, dict[str, datetime]] = {
+            field: {} for field in DATE_FIELDS
+        }
+        self._similarity = SimilarityIndex()
+        self._scan_mode = "serial"
+        self._scan_workers: Optional[int] = None
+        self._scan_pool: Optional[Executor] = None
+
+    def _index(self, filename: str, task: Task) -> None:
+        for field in INDEXED_FIELDS:
+            self._by_field[field][getattr(task, field)].add(filename)
+        for field in DATE_FIELDS:
+            parsed = _date_key(task, field)
+            if parsed is not None:
+                self._dates[field][filename] = parsed
+                insort(self._by_date[field], (parsed, filename))
+        self._similarity.add(filename, task.title, task.keywords)
+
+    def _unindex(self, filename: str, task: Task) -> None:
+        for field in INDEXED_FIELDS:
+            key = getattr(task, field)
+            bucket = self._by_field[field][key]
+            bucket.discard(filename)
+            if not bucket:
+                del self._by_field[field][key]
+        for field in DATE_FIELDS:
+            parsed = self._dates[field].pop(filename, None)
+            if parsed is not None:
+                entries = self._by_date[field]
+                del entries[bisect_left(entries, (parsed, filename))]
+        self._similarity.remove(filename)
+
+    def _load(
+        self, filename: str, signature: FileSignature, parsed: Optional[tuple[dict, str]] = None
+    ) -> Task:
+        """
+        Parse a task file's frontmatter and cache it under its current signature.
+
+        parsed, if given, is the file's already read (frontmatter, body hash).
+        """
+        task_file = self.tasks_dir / filename
+        row = self._catalog_rows.pop(filename, None) if self._catalog_rows else None
+        if row is not None and row[0] == signature:
+            # Unchanged since a previous process recorded it: skip the file entirely
+            task = Task.from_frontmatter(task_file, row[1])
+        else:
+            frontmatter, digest = parsed if parsed is not None else read_task_metadata(task_file)
+            task = Task.from_frontmatter(task_file, frontmatter)
+            if self.catalog is not None:
+                self._catalog_deletes.discard(filename)
+                self._catalog_upserts[filename] = (signature, task, digest)
+        cached = self._entries.get(filename)
+        if cached is not None:
+            self._unindex(filename, cached[1])
+        self._entries[filename] = (signature, task)
+        self._index(filename, task)
+        self._ordered = None
+        self._version += 1
+        return task
+
+    def _load_many(self, changed: list[tuple[str, FileSignature]]) -> None:
+        """Load changed files in filename order, parsing them on the scan pool if enabled"""
+        changed.sort()
+        rows = self._catalog_rows or {}
+        to_parse = [
+            filename
+            for filename, signature in changed
+            if filename not in rows or rows[filename][0] != signature
+        ]
+        parsed = dict(zip(to_parse, self._read_metadata(to_parse)))
+        for filename, signature in changed:
+            self._load(filename, signature, parsed.get(filename))
+
+    def _read_metadata(self, filenames: list[str]) -> list[tuple[dict, str]]:
+        paths = [self.tasks_dir / filename for filename in filenames]
+        if self._scan_mode == "serial" or len(paths) < PARALLEL_SCAN_MIN_FILES:
+            return [read_task_metadata(path) for path in paths]
+        pool = self._get_scan_pool()
+        # Large chunks keep inter-process traffic down; map() preserves order
+        chunksize = max(1, len(paths) // (4 * (self._scan_workers or os.cpu_count() or 1)))
+        return list(pool.map(read_task_metadata, paths, chunksize=chunksize))
+
+    def _get_scan_pool(self) -> Executor:
+        if self._scan_pool is None:
+            workers = self._scan_workers or os.cpu_count() or 1
+            if self._scan_mode == "processes":
+                # spawn, not fork: the server runs other threads (tool calls, watcher)
+                self._scan_pool = ProcessPoolExecutor(
+                    workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._scan_pool = ThreadPoolExecutor(workers, thread_name_prefix="task-scan")
+        return self._scan_pool
+
+    def configure_scan(self, mode: str = "serial", workers: Optional[int] = None) -> None:
+        """
+        Choose how scans parse changed files.
+
+        "serial" parses in the calling thread. "threads" and "processes" parse
+        batches of PARALLEL_SCAN_MIN_FILES or more files on a pool of `workers`
+        (default: CPU count). Threads only help when most files go through
+        libyaml; processes suit large cold scans. Every mode loads files in
+        filename order and builds the same index. Raises ValueError for an
+        unknown mode.
+        """
+        if mode not in SCAN_MODES:
+            raise ValueError(f"Invalid scan mode: {mode}. Use one of: {', '.join(SCAN_MODES)}")
+        with self._lock:
+            if self._scan_pool is not None:
+                self._scan_pool.shutdown(wait=False, cancel_futures=True)
+                self._scan_pool = None
+            self._scan_mode = mode
+            self._scan_workers = workers
+
+    def _drop(self, filename: str) -> None:
+        cached = self._entries.pop(filename, None)
+        if cached is None:
+            return
+        self._unindex(filename, cached[1])
+        self._ordered = None
+        self._version += 1
+        if self.catalog is not None:
+            self._catalog_upserts.pop(filename, None)
+            self._catalog_deletes.add(filename)
+
+    def _hydrate(self) -> None:
+        """Load catalog rows once, before the first scan"""
+        if self.catalog is None or self._catalog_rows is not None:
+            return
+        try:
+            self._catalog_rows = self.catalog.load()
+        except sqlite3.Error as e:
+            self._disable_catalog(e)
+
+    def _flush_catalog(self) -> None:
+        """Write pending catalog changes in one transaction"""
+        if self.catalog is None or not (self._catalog_upserts or self._catalog_deletes):
+            return
+        try:
+            self.catalog.sync(
+                [(name, *row) for name, row in self._catalog_upserts.items()],
+                self._catalog_deletes,
+            )
+        except sqlite3.Error as e:
+            self._disable_catalog(e)
+        self._catalog_upserts.clear()
+        self._catalog_deletes.clear()
+
+    def _disable_catalog(self, error: Exception) -> None:
+        print(f"Task catalog disabled ({self.catalog.path}): {error}", file=sys.stderr)
+        self.catalog.close()
+        self.catalog = None
+        self._catalog_rows = None
+
+    def _apply(self, filenames: Iterable[str]) -> None:
+        """Bring the given filenames in line with the files on disk"""
+        changed = []
+        for filename in filenames:
+            if not _is_task_file(filename):
+                continue
+            try:
+                signature = file_signature((self.tasks_dir / filename).stat())
+            except (FileNotFoundError, NotADirectoryError):
+                self._drop(filename)
+                continue
+            cached = self._entries.get(filename)
+            if cached is None or cached[0] != signature:
+                changed.append((filename, signature))
+        self._load_many(changed)
+
+    def rescan(self) -> None:
+        """Stat the whole tasks directory and re-parse only changed files"""
+        with self._lock:
+            self._dirty.clear()
+            if not self.tasks_dir.exists():
+                self.clear()
+                return
+
+            self._hydrate()
+
+            seen = set()
+            changed = []
+            with os.scandir(self.tasks_dir) as it:
+                for entry in it:
+                    if not _is_task_file(entry.name):
+                        continue
+                    try:
+                        signature = file_signature(entry.stat())
+                    except FileNotFoundError:
+                        continue
+                    seen.add(entry.name)
+                    cached = self._entries.get(entry.name)
+                    if cached is None or cached[0] != signature:
+                        changed.append((entry.name, signature))
+            self._load_many(changed)
+
+            for filename in self._entries.keys() - seen:
+                self._drop(filename)
+
+            if self._catalog_rows:
+                # Recorded by a previous process but no longer on disk
+                self._catalog_deletes.update(self._catalog_rows.keys() - seen)
+            self._catalog_rows = {}
+            self._flush_catalog()
+
+    def refresh(self) -> None:
+        """Bring the store up to date before a read"""
+        with self._lock:
+            if not self._watching:
+                self.rescan()
+                return
+            dirty, self._dirty = self._dirty, set()
+            self._apply(dirty)
+            self._flush_catalog()
+
+    def apply_changes(self, filenames: Iterable[str]) -> None:
+        """Re-stat the given filenames and update or drop their entries"""
+        with self._lock:
+            filenames = list(filenames)
+            self._dirty.difference_update(filenames)
+            self._apply(filenames)
+            self._flush_catalog()
+
+    def mark_dirty(self, filename: str) -> None:
+        """Have the next read re-check a file the server itself changed"""
+        with self._lock:
+            self._dirty.add(filename)
+
+    def start_watching(self) -> None:
+        """Switch to watcher-driven updates after one full scan"""
+        with self._lock:
+            self.rescan()
+            self._watching = True
+
+    def stop_watching(self) -> None:
+        """Return to rescanning the directory on every read"""
+        with self._lock:
+            self._watching = False
+
+    def all(self) -> list[Task]:
+        """Return all tasks ordered by filename, re-parsing changed files"""
+        with self._lock:
+            self.refresh()
+            if self._ordered is None:
+                self._ordered = [self._entries[name][1] for name in sorted(self._entries)]
+            # A copy, so callers can sort or filter it without touching the cache
+            return list(self._ordered)
+
+    def find(self, **criteria: Any) -> list[Task]:
+        """
+        Return tasks matching every field=value criterion, ordered by filename.
+
+        Criteria must be indexed fields (priority, status, category).
+        """
+        with self._lock:
+            self.refresh()
+            if not criteria:
+                return self.all()
+
+            buckets = sorted(
+                (self._by_field[field].get(value, set()) for field, value in criteria.items()),
+                key=len,
+            )
+            matches = set(buckets[0]).intersection(*buckets[1:])
+            return [self._entries[name][1] for name in sorted(matches)]
+
+    def count(self, field: str, value: Any) -> int:
+        """Count tasks whose indexed field equals value"""
+        with self._lock:
+            self.refresh()
+            return len(self._by_field[field].get(value, ()))
+
+    def value_counts(self, field: str) -> dict[Any, int]:
+        """Count tasks per distinct value of an indexed field"""
+        with self._lock:
+            self.refresh()
+            return {value: len(names) for value, names in self._by_field[field].items()}
+
+    def date_range(
+        self,
+        field: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> list[Task]:
+        """
+        Return tasks whose date field falls in start <= date < end, oldest first.
+
+        Tasks with a missing or unparseable date are never included.
+        """
+        with self._lock:
+            self.refresh()
+            entries = self._by_date[field]
+            lo = bisect_left(entries, (start,)) if start is not None else 0
+            hi = bisect_left(entries, (end,)) if end is not None else len(entries)
+            return [self._entries[name][1] for _, name in entries[lo:hi]]
+
+    def similarity_candidates(
+        self, queries: Iterable[tuple[str, Iterable[str]]], min_title_ratio: float
+    ) -> list[list[Task]]:
+        """
+        Return possible duplicates for each (title, keywords) query, ordered by filename.
+
+        A task is returned for a query if it shares one of the keywords or if
+        its title could reach min_title_ratio (SequenceMatcher ratio,
+        lowercased) against the query title. See similarity_index.py.
+        """
+        with self._lock:
+            self.refresh()
+            return [
+                [
+                    self._entries[name][1]
+                    for name in sorted(self._similarity.candidates(title, keywords, min_title_ratio))
+                ]
+                for title, keywords in queries
+            ]
+
+    def snapshot(
+        self, since: Optional[int] = None
+    ) -> tuple[int, Optional[dict[str, tuple[FileSignature, Task]]]]:
+        """
+        Return a change counter and every task with its file signature.
+
+        The counter moves whenever a task is loaded or dropped. If it still
+        equals since, no entries are copied and None is returned in their place.
+        """
+        with self._lock:
+            self.refresh()
+            if self._version == since:
+                return self._version, None
+            return self._version, dict(self._entries)
+
+    def get(self, filename: str) -> Optional[Task]:
+        """Return a single task, re-parsing it only if it changed on disk"""
+        with self._lock:
+            self._hydrate()
+            task_file = self.tasks_dir / filename
+            try:
+                signature = file_signature(task_file.stat())
+            except (FileNotFoundError, NotADirectoryError):
+                self._drop(filename)
+                return None
+
+            cached = self._entries.get(filename)
+            if cached is not None and cached[0] == signature:
+                return cached[1]
+
+            if task_file.parent == self.tasks_dir and _is_task_file(filename):
+                task = self._load(filename, signature)
+                self._flush_catalog()
+                return task
+
+            # Files outside the indexed set are parsed but not cached
+            frontmatter, body = parse_yaml_frontmatter(task_file)
+            return Task.from_frontmatter(task_file, frontmatter, body)
+
+    def clear(self) -> None:
+        """Forget every cached task"""
+        with self._lock:
+            self._entries.clear()
+            self._ordered = None
+            self._version += 1
+            for field in INDEXED_FIELDS:
+                self._by_field[field].clear()
+            for field in DATE_FIELDS:
+                self._by_date[field].clear()
+                self._dates[field].clear()
+            self._similarity.clear()
+
+
+_stores: dict[Path, TaskStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_task_store(tasks_dir: Path) -> TaskStore:
+    """Return the shared store for a tasks directory, creating it on first use"""
+    store = _stores.get(tasks_dir)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(tasks_dir)
+            if store is None:
+                # Finish any batch a crashed process left half-applied
+                if tasks_dir.exists():
+                    recover(tasks_dir)
+                catalog = TaskCatalog(tasks_dir / CATALOG_FILENAME)
+                store = _stores[tasks_dir] = TaskStore(tasks_dir, catalog)
+    return store
+
+
+def notify_changed(file_path: Path) -> None:
+    """Tell the store for file_path's directory that the server changed it"""
+    store = _stores.get(file_path.parent)
+    if store is not None:
+        store.mark_dirty(file_path.name)
@@ -0,0 +1,208 @@
+"""
+Filesystem watcher that pushes task file changes into the task store.
+
+Uses inotify on Linux (called through ctypes, so no extra dependency) and falls
+back to polling the directory on other platforms or when inotify is
+unavailable. Events are debounced so a burst such as a `git checkout` touching
+hundreds of files is applied to the store as a single batch.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from task_store import TaskStore, get_task_store
+
+# inotify event flags (see inotify(7))
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+)
+
+# struct inotify_event { int wd; uint32_t mask; uint32_t cookie; uint32_t len; char name[]; }
+_EVENT_HEADER = struct.Struct("iIII")
+
+DEFAULT_DEBOUNCE = 0.05
+DEFAULT_POLL_INTERVAL = 1.0
+# Upper bound on how long a continuous stream of events can delay a flush
+MAX_DEBOUNCE_FACTOR = 10
+
+
+def _load_libc() -> Optional[ctypes.CDLL]:
+    """Return libc if it exposes the inotify API, else None"""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class TaskWatcher:
+    """
+    Background thread keeping a TaskStore in sync with its directory.
+
+    While running, the store no longer rescans the directory on reads; changed
+    filenames are applied from this thread after `debounce` seconds of quiet.
+    """
+
+    def __init__(
+        self,
+        store: TaskStore,
+        debounce: float = DEFAULT_DEBOUNCE,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        use_inotify: bool = True,
+    ):
+        self.store = store
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.mode: Optional[str] = None
+        self._stop = threading.Event()
+        self._started = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "TaskWatcher":
+        """Start watching; returns once the initial scan has completed"""
+        self._thread = threading.Thread(
+            target=self._run, name="task-watcher", daemon=True
+        )
+        self._thread.start()
+        self._started.wait()
+        return self
+
+    def stop(self) -> None:
+        """Stop the thread and return the store to rescanning on reads"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.store.stop_watching()
+
+    def _ready(self, mode: str) -> None:
+        self.mode = mode
+        self.store.start_watching()
+        self._started.set()
+
+    def _run(self) -> None:
+        try:
+            libc = _load_libc() if self.use_inotify else None
+            if libc is None or not self._run_inotify(libc):
+                self._run_polling()
+        finally:
+            # Never leave start() waiting if the thread dies early
+            self._started.set()
+
+    def _run_inotify(self, libc: ctypes.CDLL) -> bool:
+        """Watch with inotify; returns False if it could not be set up"""
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return False
+        try:
+            if libc.inotify_add_watch(fd, os.fsencode(self.store.tasks_dir), WATCH_MASK) < 0:
+                return False
+
+            self._ready("inotify")
+            pending: set[str] = set()
+            first_event = last_event = 0.0
+
+            while not self._stop.is_set():
+                timeout = self.debounce if pending else self.poll_interval
+                readable, _, _ = select.select([fd], [], [], timeout)
+                now = time.monotonic()
+
+                if readable:
+                    names, rescan, gone = self._read_events(fd)
+                    if gone:
+                        # Directory deleted or moved away: keep going by polling
+                        self.store.rescan()
+                        self.mode = "polling"
+                        self._poll_loop()
+                        return True
+                    if rescan:
+                        pending.clear()
+                        self.store.rescan()
+                    elif names:
+                        if not pending:
+                            first_event = now
+                        pending.update(names)
+                        last_event = now
+
+                if pending and (
+                    now - last_event >= self.debounce
+                    or now - first_event >= self.debounce * MAX_DEBOUNCE_FACTOR
+                ):
+                    batch, pending = pending, set()
+                    self.store.apply_changes(batch)
+            return True
+        finally:
+            os.close(fd)
+
+    def _read_events(self, fd: int) -> tuple[set[str], bool, bool]:
+        """Drain the inotify fd into (filenames, needs_rescan, dir_gone)"""
+        names: set[str] = set()
+        rescan = gone = False
+        while True:
+            try:
+                data = os.read(fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+
+                if mask & IN_Q_OVERFLOW:
+                    rescan = True
+                elif mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                    gone = True
+                elif name:
+                    names.add(os.fsdecode(name))
+        return names, rescan, gone
+
+    def _run_polling(self) -> None:
+        self._ready("polling")
+        self._poll_loop()
+
+    def _poll_loop(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            self.store.rescan()
+
+
+def start_task_watcher(
+    tasks_dir: Path,
+    debounce: float = DEFAULT_DEBOUNCE,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    use_inotify: bool = True,
+) -> TaskWatcher:
+    """Attach a running watcher to the shared store for tasks_dir"""
+    watcher = TaskWatcher(
+        get_task_store(tasks_dir),
+        debounce=debounce,
+        poll_interval=poll_interval,
+        use_inotify=use_inotify,
+    )
+    return watcher.start()
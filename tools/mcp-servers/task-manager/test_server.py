@@ -8,12 +8,17 @@ Tests cover:
 - Task content generation (all categories)
 - Similarity calculation
 - Auto-categorization
+- Frontmatter parsing
 - Helper functions
 
 Run with: python3 -m pytest test_server.py -v
 """
 
 import pytest
+import yaml
+
+from category_matcher import get_category_matcher
+from frontmatter import load_frontmatter, parse_flat_frontmatter, read_frontmatter
 from server import (
     is_ambiguous,
     generate_clarification_questions,
@@ -331,6 +336,29 @@ class TestAutoCategorization:
         category = auto_categorize("FIX the BUG", "API is broken", self.config)
         assert category == "technical"
 
+    def test_compiled_matcher_matches_keyword_scan(self):
+        """The compiled matcher counts hits exactly like scanning every keyword"""
+        category_keywords = {
+            "a": ["Call", "all", "call"],
+            "b": ["recall", "", "ALL"],
+            "c": ["zzz"],
+            "d": ["she", "he", "hers", "his"],
+        }
+        matcher = get_category_matcher(category_keywords)
+        for text in ["recall the call", "a ball", "nothing", "", "ushers", "ahishers"]:
+            expected = {
+                category: count
+                for category, keywords in category_keywords.items()
+                if (count := sum(1 for k in keywords if k.lower() in text)) > 0
+            }
+            assert matcher.counts(text) == expected
+
+    def test_matcher_reused_until_keywords_change(self):
+        """The matcher is compiled once per distinct keyword table"""
+        first = get_category_matcher({"technical": ["api"]})
+        assert get_category_matcher({"technical": ["api"]}) is first
+        assert get_category_matcher({"technical": ["api", "bug"]}) is not first
+
 
 class TestConfigLoading:
     """Test configuration loading"""
@@ -397,5 +425,66 @@ class TestEdgeCases:
         assert category == ""
 
 
+class TestFrontmatterParsing:
+    """Test the fast frontmatter parser against PyYAML"""
+
+    @pytest.mark.parametrize("text", [
+        yaml.dump({
+            "title": 'Task with "quotes" and colons:',
+            "priority": "P1",
+            "status": "s",
+            "category": "technical",
+            "keywords": ["auth", "it's", "yes"],
+            "created_date": "2024-01-15T10:00:00.123456",
+            "due_date": "2024-02-01",
+        }, default_flow_style=False, sort_keys=False),
+        "title: Plain title\nkeywords: []\ndue_date: 2024-02-01\n",
+        "title: Fix bug\nkeywords:\n  - api\n  - 'db'\ncount: 3\ndone: yes\nowner: ~\n",
+        "title: \"Double quoted\"\nempty:\n",
+    ])
+    def test_matches_yaml(self, text):
+        """Flat schema parses exactly as PyYAML does"""
+        assert parse_flat_frontmatter(text) == yaml.safe_load(text)
+
+    @pytest.mark.parametrize("text", [
+        "title: Fix bug # comment\n",
+        "title: |\n  multi\n  line\n",
+        "meta:\n  owner: sam\n",
+        "title: Fix\n  continued\n",
+        "ratio: 0.5\n",
+        "yes: value\n",
+        "keywords: [a, b]\n",
+    ])
+    def test_falls_back_outside_schema(self, text):
+        """Anything outside the flat schema is left to PyYAML"""
+        assert parse_flat_frontmatter(text) is None
+        assert load_frontmatter(text) == yaml.safe_load(text)
+
+    @pytest.mark.parametrize("text", [
+        "title:\tFix bug\n",
+        "keywords:\n  -\tapi\n",
+        "keywords:\n\t- api\n",
+    ])
+    def test_tabs_not_parsed_as_flat(self, text):
+        """Tabs YAML rejects are not accepted by the fast path"""
+        with pytest.raises(yaml.YAMLError):
+            yaml.safe_load(text)
+        assert parse_flat_frontmatter(text) is None
+
+    def test_read_frontmatter_stops_at_delimiter(self, tmp_path):
+        """Metadata-only reads ignore the body"""
+        task_file = tmp_path / "task.md"
+        task_file.write_text("---\ntitle: Task\npriority: P2\n---\n\n---\nnot: yaml: [\n")
+
+        assert read_frontmatter(task_file) == {"title": "Task", "priority": "P2"}
+
+    def test_read_frontmatter_without_delimiters(self, tmp_path):
+        """Files without frontmatter have no metadata"""
+        task_file = tmp_path / "task.md"
+        task_file.write_text("# Just markdown\n")
+
+        assert read_frontmatter(task_file) == {}
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,66 @@
+"""
+Locking between concurrently running tool calls.
+
+Tool calls run in worker threads (see call_tool in server.py). Read-only tools
+take no lock: the task store has its own lock and task files are replaced
+atomically, so readers always see whole files. Mutating tools lock the files
+they change, so edits to different tasks run in parallel while two edits of
+the same task are serialized. Tools that change many tasks at once (pruning,
+backlog processing) take the whole tasks directory exclusively.
+
+All names a call needs are acquired together, so calls cannot deadlock on
+each other's locks. A waiting directory lock holds back new file locks so it
+is not starved.
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class TaskLocks:
+    """Per-file locks nested inside a shared/exclusive lock on the directory"""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._held: set[str] = set()
+        self._file_holders = 0
+        self._exclusive = False
+        self._exclusive_waiting = 0
+
+    @contextmanager
+    def files(self, *names: str) -> Iterator[None]:
+        """Hold the given names exclusively, alongside other file lock holders"""
+        wanted = set(names)
+        with self._cond:
+            self._cond.wait_for(
+                lambda: not self._exclusive
+                and not self._exclusive_waiting
+                and not (wanted & self._held)
+            )
+            self._held |= wanted
+            self._file_holders += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._held -= wanted
+                self._file_holders -= 1
+                self._cond.notify_all()
+
+    @contextmanager
+    def directory(self) -> Iterator[None]:
+        """Hold the whole directory, waiting for every file lock to be released"""
+        with self._cond:
+            self._exclusive_waiting += 1
+            try:
+                self._cond.wait_for(lambda: not self._exclusive and not self._file_holders)
+            finally:
+                self._exclusive_waiting -= 1
+            self._exclusive = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._exclusive = False
+                self._cond.notify_all()
@@ -0,0 +1,85 @@
+"""
+Shared, cached access to the project's config.yaml.
+
+Used by the task-manager MCP server and the integrations. The file is parsed
+once and re-read only when its mtime, size or inode changes, so a config
+lookup costs one stat() rather than a YAML parse. Structures derived from the
+config (compiled matchers, lookup tables) can be cached alongside it with
+derived() and are rebuilt only when the file changes.
+
+The parsed config is shared between callers and must be treated as
+read-only.
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Optional, TypeVar
+
+import yaml
+
+# Config file location (project root)
+CONFIG_FILE = Path(__file__).parent.parent / "config.yaml"
+
+T = TypeVar("T")
+
+
+class ProjectConfig:
+    """A YAML config file, parsed once per version of the file"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._signature: Optional[tuple[int, int, int]] = None
+        self._data: Any = None
+        self._derived: dict[str, Any] = {}
+
+    @property
+    def data(self) -> Any:
+        """The most recently loaded config, without checking the file"""
+        return self._data
+
+    def load(self) -> Any:
+        """
+        Return the parsed config, re-reading the file only if it changed.
+
+        Returns None if the file does not exist. Raises yaml.YAMLError or
+        OSError if it cannot be read; the next call tries again.
+        """
+        with self._lock:
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                self._reset(None, None)
+                return None
+
+            signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+            if signature != self._signature:
+                with open(self.path, "r") as f:
+                    data = yaml.safe_load(f)
+                self._reset(signature, data)
+            return self._data
+
+    def derived(self, name: str, build: Callable[[Any], T]) -> T:
+        """Return build(config), computed once per version of the file"""
+        with self._lock:
+            data = self.load()
+            if name not in self._derived:
+                self._derived[name] = build(data)
+            return self._derived[name]
+
+    def _reset(self, signature: Optional[tuple[int, int, int]], data: Any) -> None:
+        self._signature = signature
+        self._data = data
+        self._derived.clear()
+
+
+_configs: dict[Path, ProjectConfig] = {}
+
+
+def get_project_config(path: Path = CONFIG_FILE) -> ProjectConfig:
+    """Return the shared cached config for path, creating it on first use"""
+    config = _configs.get(path)
+    if config is None:
+        config = _configs.setdefault(path, ProjectConfig(path))
+    return config